@@ -1,13 +1,19 @@
+import asyncio
+import hashlib
 import logging
-from typing import Any
+import time
+from typing import Any, Dict, Optional, Tuple
 
-import requests
+import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 
+from backend.core.cache import TTLCache
 from backend.core.config import settings
 from backend.core.messages import ErrorMessages, LogMessages
+from backend.core.tracing import span
 from backend.services.auth_service import AuthService
 from backend.services.session_manager import SessionManager
 from backend.services.project_service import ProjectService
@@ -20,26 +26,115 @@ SUPABASE_BASE_URL = settings.SUPABASE_URL
 JWKS_URL = f"{SUPABASE_BASE_URL}/auth/v1/.well-known/jwks.json"
 AUDIENCE = "authenticated"
 
-_jwks_cache = None
 
-def get_jwks():
-    """Fetches public keys from Supabase JWKS endpoint"""
-    global _jwks_cache
-    if _jwks_cache is None:
+class JWKSCache:
+    """
+    Public keys from the Supabase JWKS endpoint, pre-built per kid.
+
+    Refreshes are async and single-flight. Once keys are older than the TTL
+    they are still served while a background refresh runs
+    (stale-while-revalidate). Forced refetches for unknown kids are
+    rate-limited so a burst of forged tokens cannot cause a refetch storm,
+    and after a failed fetch no refetch starts for min_refresh_interval.
+    """
+
+    def __init__(self, url: str, ttl: float, min_refresh_interval: float):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+
+        # kid -> (key, algorithm named by the JWK)
+        self._keys: Dict[str, Tuple[Key, str]] = {}
+        self._fetched_at = 0.0
+        self._last_forced_refresh = float("-inf")
+        self._failed_at = float("-inf")
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: str, alg: str) -> Optional[Key]:
+        if not self._keys:
+            if self._backing_off():
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=ErrorMessages.AUTHENTICATION_FAILED
+                )
+            await self._refresh()
+        elif time.monotonic() - self._fetched_at > self.ttl and not self._backing_off():
+            self._start_refresh()
+
+        entry = self._keys.get(kid)
+        if entry is None and self._may_force_refresh():
+            self._last_forced_refresh = time.monotonic()
+            await self._refresh()
+            entry = self._keys.get(kid)
+
+        if entry is None:
+            return None
+        key, key_alg = entry
+        if alg and key_alg != alg:
+            return None
+        return key
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() - self._failed_at < self.min_refresh_interval
+
+    def _may_force_refresh(self) -> bool:
+        # Keys fetched moments ago would not know the kid either
+        last = max(self._last_forced_refresh, self._fetched_at, self._failed_at)
+        return time.monotonic() - last >= self.min_refresh_interval
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        return self._refresh_task
+
+    async def _refresh(self) -> None:
+        # shield so one cancelled request does not abort the shared fetch
+        await asyncio.shield(self._start_refresh())
+
+    async def _fetch(self) -> None:
         try:
-            response = requests.get(JWKS_URL, timeout=5)
-            response.raise_for_status()
-            _jwks_cache = response.json()
+            async with httpx.AsyncClient(timeout=5) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                self._load(response.json())
         except Exception as e:
+            self._failed_at = time.monotonic()
             logger.error(f"Could not fetch JWKS: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=ErrorMessages.AUTHENTICATION_FAILED
-            )
-    return _jwks_cache
+            if not self._keys:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=ErrorMessages.AUTHENTICATION_FAILED
+                )
+
+    def _load(self, jwks: Dict[str, Any]) -> None:
+        keys: Dict[str, Tuple[Key, str]] = {}
+        for key_data in jwks.get("keys", []):
+            kid = key_data.get("kid")
+            if kid:
+                alg = key_data.get("alg", "ES256")
+                keys[kid] = (jwk.construct(key_data, alg), alg)
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+
+_jwks_cache = JWKSCache(
+    JWKS_URL,
+    ttl=settings.JWKS_CACHE_TTL,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL,
+)
 
-def validate_jwt_token(token: str) -> str:
+# Verified user ids keyed by token digest, each entry expiring with its token
+_token_cache: TTLCache[str] = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_ENTRIES, ttl=0)
+
+
+async def validate_jwt_token(token: str) -> str:
     """Verifies the ES256 JWT against Supabase Public Keys"""
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(digest)
+    if cached:
+        return cached
+
     try:
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
@@ -48,22 +143,13 @@ def validate_jwt_token(token: str) -> str:
         if not kid:
             raise JWTError("Missing 'kid' in token header")
 
-
-        jwks = get_jwks()
-        key_data = next((key for key in jwks["keys"] if key["kid"] == kid), None)
-        
-        if not key_data:
-            global _jwks_cache
-            _jwks_cache = None
-            jwks = get_jwks()
-            key_data = next((key for key in jwks["keys"] if key["kid"] == kid), None)
-            
-            if not key_data:
-                raise JWTError("Could not find matching public key for kid")
+        key = await _jwks_cache.get_key(kid, alg)
+        if key is None:
+            raise JWTError("Could not find matching public key for kid")
 
         payload: dict[str, Any] = jwt.decode(
             token,
-            key_data, 
+            key,
             algorithms=[alg], # type: ignore
             audience=AUDIENCE,
             options={
@@ -81,6 +167,10 @@ def validate_jwt_token(token: str) -> str:
                 detail=ErrorMessages.INVALID_TOKEN_MISSING_USER,
             )
 
+        ttl = float(payload["exp"]) - time.time()
+        if ttl > 0:
+            _token_cache.set(digest, str(user_id), ttl=ttl)
+
         return str(user_id)
 
     except JWTError as err:
@@ -95,7 +185,8 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> str:
     """Dependency to get the current user ID"""
-    return validate_jwt_token(credentials.credentials)
+    with span("auth"):
+        return await validate_jwt_token(credentials.credentials)
 
 
 
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
 from backend.api.dependencies import get_current_user, get_project_service
 from backend.core.messages import ErrorMessages
 from backend.models.project import ProjectCreate, ProjectResponse, ProjectUpdate
@@ -62,10 +62,29 @@ async def delete_project(
 
 @router.get("/", response_model=List[ProjectResponse])
 async def list_projects(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=settings.PROJECT_PAGE_SIZE, ge=1, le=settings.PROJECT_MAX_PAGE_SIZE),
+    include_total: bool = True,
     user_id: str = Depends(get_current_user),
     service: ProjectService = Depends(get_project_service)
 ):
-    return await service.get_all_projects(user_id)
+    """
+    List the user's projects newest first. The cursor for the next page is
+    returned in X-Next-Cursor and, unless include_total=false, the total in X-Total-Count.
+    """
+    try:
+        projects, next_cursor, total = await service.get_all_projects(
+            user_id, cursor=cursor, limit=limit, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return projects
 
 @router.get("/available-models")
 async def get_available_models():
@@ -1,17 +1,35 @@
 import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from backend.api.dependencies import get_session_manager, get_current_user, get_project_service
 from backend.services.session_manager import SessionManager
 from backend.services.project_service import ProjectService
 from backend.models.chat import ChatRequest, ChatResponse, SessionCreate, SessionResponse, SessionUpdate
 from backend.core.messages import ErrorMessages
+from backend.core.admission import AdmissionRejected, Ticket, get_admission_controller
+from backend.core.config import settings
+from backend.core.sse import SSEEncoder
+from backend.core.tracing import current_trace, record, span
 
 router = APIRouter()
 
 
+async def _admit(user_id: str, project_id: str) -> Ticket:
+    """Wait for a chat slot, or answer 429 with Retry-After when shedding load."""
+    try:
+        return await get_admission_controller().acquire(user_id, project_id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ErrorMessages.CHAT_OVERLOADED,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
 
 @router.post("/", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
@@ -25,10 +43,12 @@ async def create_session(
     if not project:
         raise HTTPException(status_code=404, detail=ErrorMessages.PROJECT_NOT_FOUND)
 
-    session_id, _ = cbot.create_session(
+    session_id, _ = await cbot.create_session(
         project_id=session_data.project_id,
+        user_id=user_id,
         enable_db=True,
-        chat_model = session_data.chat_model
+        chat_model = session_data.chat_model,
+        memory_strategy=project.memory_strategy.value
     )
     
     return SessionResponse(
@@ -41,24 +61,48 @@ async def create_session(
 
 @router.get("/", response_model=List[SessionResponse])
 async def list_sessions(
+    response: Response,
     project_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=settings.SESSION_LIST_PAGE_SIZE, ge=1, le=settings.SESSION_LIST_MAX_PAGE_SIZE),
+    include_counts: bool = False,
+    include_preview: bool = False,
     user_id: str = Depends(get_current_user),
     cbot: SessionManager = Depends(get_session_manager)
 ):
-    """List all sessions for the user, optionally filtered by project."""
-    return cbot.get_user_sessions(project_id)
+    """
+    List the user's sessions newest first, optionally filtered by project.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        sessions, next_cursor = await cbot.get_user_sessions(
+            user_id,
+            project_id=project_id,
+            cursor=cursor,
+            limit=limit,
+            with_counts=include_counts,
+            with_preview=include_preview,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sessions
 
 
 @router.post("/{session_id}/chat", response_model=ChatResponse)
 async def chat_message(
     request: ChatRequest,
+    http_response: Response,
     user_id: str = Depends(get_current_user),
     cbot: SessionManager = Depends(get_session_manager),
     project_service: ProjectService = Depends(get_project_service)
 ):
     """Send a message to the bot."""
 
-    chatbot = cbot.get_session(request.session_id)
+    with span("session"):
+        chatbot = await cbot.get_session(request.session_id)
     if not chatbot:
         raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
 
@@ -66,28 +110,44 @@ async def chat_message(
         raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
 
     system_prompt = ""
+    use_cache = False
+    allow_fallback = False
     if chatbot.project_id:
         try:
-            project = await project_service.get_project(chatbot.project_id, user_id)
+            with span("project"):
+                project = await project_service.get_project(chatbot.project_id, user_id)
             if project and project.system_prompt:
                 system_prompt = project.system_prompt
+            use_cache = bool(project and project.enable_response_cache)
+            allow_fallback = bool(project and project.allow_model_fallback)
                 
         except Exception as e:
             raise ValueError(f"Error fetching project prompt: {e}")
     
-    response = await chatbot.chat(request.message, system_prompt=system_prompt)
+    ticket = await _admit(user_id, chatbot.project_id)
+    record("queue", ticket.wait_seconds)
+    try:
+        response = await chatbot.chat(
+            request.message, system_prompt=system_prompt, use_cache=use_cache, allow_fallback=allow_fallback
+        )
+    finally:
+        ticket.release()
+
+    http_response.headers["X-Queue-Wait-Ms"] = str(round(ticket.wait_seconds * 1000))
     return ChatResponse(response=response)
 
 
 @router.post("/{session_id}/chat/stream")
 async def chat_message_stream(
     request: ChatRequest,
+    http_request: Request,
     user_id: str = Depends(get_current_user),
     cbot: SessionManager = Depends(get_session_manager),
     project_service: ProjectService = Depends(get_project_service)
 ):
     """Stream chat response in real-time using Server-Sent Events."""
-    chatbot = cbot.get_session(request.session_id)
+    with span("session"):
+        chatbot = await cbot.get_session(request.session_id)
     if not chatbot:
         raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
 
@@ -96,45 +156,111 @@ async def chat_message_stream(
         raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
 
     system_prompt = ""
+    use_cache = False
+    allow_fallback = False
     if chatbot.project_id:
         try:
-            project = await project_service.get_project(chatbot.project_id, user_id)
+            with span("project"):
+                project = await project_service.get_project(chatbot.project_id, user_id)
             if project and project.system_prompt:
                 system_prompt = project.system_prompt
+            use_cache = bool(project and project.enable_response_cache)
+            allow_fallback = bool(project and project.allow_model_fallback)
         except Exception as e:
             raise ValueError(f"Error fetching project prompt: {e}")
 
-    async def generate():
-        async for token in chatbot.chat_stream(request.message, system_prompt=system_prompt):
-            yield f"data: {token}\n\n"
-        yield "data: [DONE]\n\n"
+    ticket = await _admit(user_id, chatbot.project_id)
+    record("queue", ticket.wait_seconds)
+    encoder = SSEEncoder()
+
+    def stream_timing() -> Optional[str]:
+        # Headers went out before the answer, so its spans travel in the stream
+        trace = current_trace()
+        return json.dumps(trace.to_dict()) if trace is not None else None
+
+    async def frames():
+        # The slot is held until the stream ends, however it ends
+        try:
+            async for frame in encoder.stream(
+                chatbot.chat_stream(
+                    request.message,
+                    system_prompt=system_prompt,
+                    use_cache=use_cache,
+                    allow_fallback=allow_fallback,
+                ),
+                is_disconnected=http_request.is_disconnected,
+                trailer=stream_timing,
+            ):
+                yield frame
+        finally:
+            ticket.release()
 
     return StreamingResponse(
-        generate(),
+        frames(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+            "X-Accel-Buffering": "no",
+            "X-Queue-Wait-Ms": str(round(ticket.wait_seconds * 1000)),
+        },
+        # Covers a response that is never iterated
+        background=BackgroundTask(ticket.release),
     )
 
 
 @router.get("/{session_id}/history")
 async def get_history(
     session_id: str,
+    response: Response,
+    cursor: Optional[int] = Query(default=None, description="seq of the last message of the previous page"),
+    limit: int = Query(default=settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    order: Literal["desc", "asc"] = "desc",
     user_id: str = Depends(get_current_user),
     cbot: SessionManager = Depends(get_session_manager)
 ):
-    """Get chat history."""
-    chatbot = cbot.get_session(session_id)
+    """
+    Get one page of chat history, newest first by default.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    chatbot = await cbot.get_session(session_id)
     if not chatbot:
         raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
         
     if chatbot.user_id and chatbot.user_id != user_id:
         raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
             
-    return cbot.get_session_history(session_id)
+    messages, next_cursor = await cbot.get_session_history(
+        session_id, cursor=cursor, limit=limit, descending=order == "desc"
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return messages
+
+
+@router.get("/{session_id}/history/export")
+async def export_history(
+    session_id: str,
+    user_id: str = Depends(get_current_user),
+    cbot: SessionManager = Depends(get_session_manager)
+):
+    """Stream the full chat history as NDJSON, oldest first."""
+    chatbot = await cbot.get_session(session_id)
+    if not chatbot:
+        raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
+
+    if chatbot.user_id and chatbot.user_id != user_id:
+        raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
+
+    async def lines():
+        async for row in cbot.iter_session_history(session_id):
+            yield json.dumps(row, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="session-{session_id}.ndjson"'}
+    )
 
 @router.patch("/{session_id}", response_model=SessionResponse)
 async def update_session(
@@ -145,13 +271,13 @@ async def update_session(
 ):
     """Update session title."""
 
-    chatbot = cbot.get_session(session_id)
+    chatbot = await cbot.get_session(session_id)
     if not chatbot:
         raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
     if chatbot.user_id and chatbot.user_id != user_id:
         raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
     
-    result = cbot.update_session(session_id, update_data.title)
+    result = await cbot.update_session(session_id, update_data.title, user_id=user_id)
     if not result:
         raise HTTPException(status_code=500, detail=ErrorMessages.SESSION_UPDATE_FAILED)
     
@@ -166,11 +292,13 @@ async def delete_session(
     """Delete a session."""
 
     # check ownership before deleting
-    chatbot = cbot.get_session(session_id)
-    if chatbot and chatbot.user_id and chatbot.user_id != user_id:
+    chatbot = await cbot.get_session(session_id)
+    if not chatbot:
+        raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
+    if chatbot.user_id != user_id:
         raise HTTPException(status_code=403, detail=ErrorMessages.SESSION_UNAUTHORIZED)
 
-    success = cbot.end_session(session_id)
+    success = await cbot.end_session(session_id, user_id=user_id)
     if not success:
-        raise HTTPException(status_code=404, detail=ErrorMessages.SESSION_NOT_FOUND)
+        raise HTTPException(status_code=500, detail=ErrorMessages.SESSION_DELETE_FAILED)
     return None
\ No newline at end of file
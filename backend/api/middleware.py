@@ -0,0 +1,103 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.metrics import HTTP_REQUEST_DURATION
+from backend.core.tracing import end_trace, should_sample, start_trace, write_trace
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template until the response starts.
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses and
+    disconnect detection pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        recorded = False
+
+        def record(status: int) -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            HTTP_REQUEST_DURATION.observe(
+                time.monotonic() - started,
+                method=scope["method"],
+                route=self._route(scope),
+                status=str(status),
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            record(500)
+            raise
+
+    def _route(self, scope: Scope) -> str:
+        # Route templates, not raw paths, keep label cardinality bounded
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unknown")
+        return "unmatched"
+
+
+class TracingMiddleware:
+    """
+    Starts a trace for sampled requests and returns the spans recorded so far
+    in a Server-Timing header. Unsampled requests pass straight through, and
+    span() is a no-op for them. The full trace, including spans recorded while
+    a response streams, goes to the trace log once the response ends.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = any(name == b"x-trace" and value == b"1" for name, value in scope.get("headers", []))
+        if not should_sample(forced):
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_trace(token)
+            write_trace({
+                **trace.to_dict(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+            })
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark of the JWT auth path, without network.
+
+    python -m backend.benchmarks.auth --iterations 20000
+
+Signs ES256 tokens with a throwaway key, loads its public JWK into the
+JWKS cache, then times validate_jwt_token for:
+
+    verify    every call misses the token cache (header parse + ES256 check)
+    cached    one token, answered from the token cache
+    distinct  a pool of tokens, one per user, cycled through the token cache
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from backend.benchmarks.run import percentile
+from backend.benchmarks.serve import BENCH_ENVIRONMENT
+
+KID = "bench-key"
+
+
+def signing_key() -> Any:
+    # python-jose's pure-python EC backend, installed alongside it
+    from ecdsa import NIST256p, SigningKey
+    from jose import jwk
+
+    pem = SigningKey.generate(curve=NIST256p).to_pem()
+    return jwk.construct(pem, "ES256")
+
+
+def sign(key: Any, user_id: str, ttl: int = 3600) -> str:
+    from jose import jwt
+
+    claims = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + ttl}
+    return jwt.encode(claims, key.to_pem().decode(), algorithm="ES256", headers={"kid": KID})
+
+
+async def measure(name: str, iterations: int, call: Callable[[int], Awaitable[Any]]) -> Dict[str, Any]:
+    samples: List[float] = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        begin = time.perf_counter()
+        await call(index)
+        samples.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        "ops_per_sec": round(iterations / elapsed, 1),
+        "p50_us": round(percentile(samples, 50) * 1e6, 1),
+        "p99_us": round(percentile(samples, 99) * 1e6, 1),
+    }
+    print(f"{name:<10} " + "  ".join(f"{field}={value}" for field, value in summary.items()), flush=True)
+    return summary
+
+
+async def run(args: argparse.Namespace) -> None:
+    from backend.api import dependencies
+
+    key = signing_key()
+    public = key.public_key().to_dict()
+    dependencies._jwks_cache._load({"keys": [{**public, "kid": KID, "alg": "ES256"}]})
+
+    single = sign(key, "00000000-0000-4000-8000-000000000000")
+    pool = [sign(key, f"00000000-0000-4000-8000-{index:012d}") for index in range(args.users)]
+
+    async def verify(index: int) -> None:
+        dependencies._token_cache.clear()
+        await dependencies.validate_jwt_token(single)
+
+    async def cached(index: int) -> None:
+        await dependencies.validate_jwt_token(single)
+
+    async def distinct(index: int) -> None:
+        await dependencies.validate_jwt_token(pool[index % len(pool)])
+
+    # Verification is orders of magnitude slower, so it gets fewer iterations
+    await measure("verify", max(args.iterations // 20, 1), verify)
+    await measure("cached", args.iterations, cached)
+    await measure("distinct", args.iterations, distinct)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark of JWT validation")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000, help="distinct tokens in the pool")
+    args = parser.parse_args()
+
+    for name, value in BENCH_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    # Importing the API builds services backed by Supabase
+    from backend.benchmarks.fake_supabase import install
+    install()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "the service answers every question with a short and friendly reply that "
+    "streams one token at a time so latency can be measured end to end"
+).split()
+
+
+class FakeCompletions:
+    """
+    OpenAI-compatible /chat/completions with a fixed latency profile: ttft
+    seconds before the first token, inter_token seconds between tokens, and
+    a rate_429 chance of answering 429 with a Retry-After header instead.
+    """
+
+    def __init__(self, ttft: float, inter_token: float, tokens: int, rate_429: float, retry_after: float):
+        self.ttft = ttft
+        self.inter_token = inter_token
+        self.tokens = tokens
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+
+        self.requests = 0
+        self.throttled = 0
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/health")
+        async def health() -> Dict[str, Any]:
+            return {"status": "healthy", "requests": self.requests, "throttled": self.throttled}
+
+        @app.post("/v1/chat/completions")
+        async def completions(request: Request):
+            body = await request.json()
+            self.requests += 1
+
+            if self.rate_429 and random.random() < self.rate_429:
+                self.throttled += 1
+                return JSONResponse(
+                    {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error", "code": 429}},
+                    status_code=429,
+                    headers={"Retry-After": f"{self.retry_after:g}"},
+                )
+
+            model = body.get("model", "fake-model")
+            count = max(1, min(self.tokens, int(body.get("max_tokens") or self.tokens)))
+            if body.get("stream"):
+                return StreamingResponse(self._stream(model, count), media_type="text/event-stream")
+
+            await asyncio.sleep(self.ttft + self.inter_token * (count - 1))
+            return self._completion(model, count)
+
+        return app
+
+    def _token(self, index: int) -> str:
+        return WORDS[index % len(WORDS)] + " "
+
+    def _completion(self, model: str, count: int) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(self._token(i) for i in range(count))},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": count, "total_tokens": count},
+        }
+
+    async def _stream(self, model: str, count: int) -> AsyncIterator[str]:
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, str], finish_reason=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(self.ttft)
+        yield chunk({"role": "assistant", "content": self._token(0)})
+        for index in range(1, count):
+            await asyncio.sleep(self.inter_token)
+            yield chunk({"content": self._token(index)})
+        yield chunk({}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--inter-token", type=float, default=0.02, help="seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=64, help="tokens per completion")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    args = parser.parse_args()
+
+    fake = FakeCompletions(args.ttft, args.inter_token, args.tokens, args.rate_429, args.retry_after)
+    uvicorn.run(fake.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
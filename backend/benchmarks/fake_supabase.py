@@ -0,0 +1,378 @@
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+# (table, embedded table) -> (local column, foreign column, to-many)
+RELATIONS: Dict[Tuple[str, str], Tuple[str, str, bool]] = {
+    ("sessions", "Projects"): ("project_id", "id", False),
+    ("sessions", "messages"): ("id", "session_id", True),
+    ("Projects", "sessions"): ("id", "project_id", True),
+}
+
+# Column defaults from the schema in README.md
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "Projects": {
+        "system_prompt": "",
+        "enable_response_cache": False,
+        "memory_strategy": "summarization",
+        "allow_model_fallback": False,
+    },
+    "sessions": {"title": "New Chat"},
+}
+TIMESTAMP_COLUMNS = {
+    "Projects": "created_at",
+    "sessions": "created_at",
+    "messages": "timestamp",
+    "summaries": "created_at",
+    "session_snapshots": "updated_at",
+}
+
+# Secondary index per table, standing in for the (session_id, seq) indexes
+INDEXED = {"messages": "session_id", "summaries": "session_id", "session_snapshots": "session_id"}
+
+_EMBED = re.compile(r"^(?:(\w+):)?(\w+)(!inner)?\((.*)\)$")
+
+Predicate = Callable[[Any], bool]
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    previous = ""
+    for char in text:
+        if char == '"' and previous != "\\":
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        previous = char
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _compare(op: str, value: Any) -> Predicate:
+    def check(actual: Any) -> bool:
+        if actual is None:
+            return op == "eq" and value is None
+        target = type(actual)(value) if isinstance(actual, (int, float)) and isinstance(value, str) else value
+        if op == "eq":
+            return actual == target
+        if op == "neq":
+            return actual != target
+        if op == "lt":
+            return actual < target
+        if op == "lte":
+            return actual <= target
+        if op == "gt":
+            return actual > target
+        if op == "gte":
+            return actual >= target
+        raise ValueError(f"Unsupported operator: {op}")
+
+    return check
+
+
+def _parse_logic(expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Parse a PostgREST or=(...) body, e.g. 'a.lt."x",and(a.eq."x",b.lt.1)'."""
+    terms: List[Callable[[Dict[str, Any]], bool]] = []
+    for term in _split_top_level(expression):
+        if term.startswith("and(") and term.endswith(")"):
+            inner = [_parse_logic(part) for part in _split_top_level(term[4:-1])]
+            terms.append(lambda row, inner=inner: all(check(row) for check in inner))
+        elif term.startswith("or(") and term.endswith(")"):
+            terms.append(_parse_logic(term[3:-1]))
+        else:
+            column, op, value = term.split(".", 2)
+            predicate = _compare(op, _unquote(value))
+            terms.append(lambda row, column=column, predicate=predicate: predicate(row.get(column)))
+    return lambda row: any(check(row) for check in terms)
+
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    # NULLs sort apart from values and never compare against them
+    return (value is not None, value if value is not None else 0)
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeStore:
+    """Tables as lists of row dicts. Queries run on the database thread pool, so access is locked."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.indexes: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {}
+        self.lock = threading.Lock()
+
+    def rows(self, table: str, eq_filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        column = INDEXED.get(table)
+        if column and column in eq_filters:
+            return self.indexes.get(table, {}).get(eq_filters[column], [])
+        return self.tables.get(table, [])
+
+    def insert(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        self.tables.setdefault(table, []).extend(rows)
+        column = INDEXED.get(table)
+        if column:
+            index = self.indexes.setdefault(table, {})
+            for row in rows:
+                index.setdefault(row.get(column), []).append(row)
+
+    def remove(self, table: str, doomed: List[Dict[str, Any]]) -> None:
+        ids = {id(row) for row in doomed}
+        self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in ids]
+        self.reindex(table)
+
+    def reindex(self, table: str) -> None:
+        column = INDEXED.get(table)
+        if column:
+            index: Dict[Any, List[Dict[str, Any]]] = {}
+            for row in self.tables.get(table, []):
+                index.setdefault(row.get(column), []).append(row)
+            self.indexes[table] = index
+
+
+class FakeQuery:
+    """
+    The subset of the postgrest query builder the repositories use: select
+    with embedded resources and count="exact", insert/upsert/update/delete,
+    eq, gt, lt, in_, or_, order and limit (also on an embedded resource),
+    single.
+    """
+
+    def __init__(self, store: FakeStore, table: str):
+        self.store = store
+        self.table = table
+        self.path = f"/{table}"
+        self.http_method = "GET"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._filters: List[Tuple[str, Predicate]] = []
+        self._eq: Dict[str, Any] = {}
+        self._logic: List[Callable[[Dict[str, Any]], bool]] = []
+        self._orders: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._embedded: Dict[str, Dict[str, Any]] = {}
+        self._single = False
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "FakeQuery":
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, data: Any) -> "FakeQuery":
+        self.http_method = "POST"
+        self._payload = data
+        return self
+
+    def upsert(self, data: Any, on_conflict: str = "id") -> "FakeQuery":
+        self.http_method = "POST"
+        self._payload = data
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, data: Dict[str, Any]) -> "FakeQuery":
+        self.http_method = "PATCH"
+        self._payload = data
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self.http_method = "DELETE"
+        return self
+
+    def _filter(self, column: str, predicate: Predicate) -> "FakeQuery":
+        self._filters.append((column, predicate))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        if "." not in column:
+            self._eq[column] = value
+        return self._filter(column, _compare("eq", value))
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, _compare("gt", value))
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, _compare("lt", value))
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        allowed = set(values)
+        return self._filter(column, lambda actual: actual in allowed)
+
+    def or_(self, expression: str) -> "FakeQuery":
+        self._logic.append(_parse_logic(expression))
+        return self
+
+    def order(self, column: str, desc: bool = False, foreign_table: Optional[str] = None) -> "FakeQuery":
+        if foreign_table:
+            self._embedded.setdefault(foreign_table, {}).setdefault("order", []).append((column, desc))
+        else:
+            self._orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, foreign_table: Optional[str] = None) -> "FakeQuery":
+        if foreign_table:
+            self._embedded.setdefault(foreign_table, {})["limit"] = size
+        else:
+            self._limit = size
+        return self
+
+    def single(self) -> "FakeQuery":
+        self._single = True
+        return self
+
+    def execute(self) -> FakeResponse:
+        with self.store.lock:
+            if self.http_method == "POST":
+                return FakeResponse(self._insert())
+
+            matched = self._match()
+            if self.http_method == "PATCH":
+                for row in matched:
+                    row.update(self._payload)
+                self.store.reindex(self.table)
+                return FakeResponse([dict(row) for row in matched])
+            if self.http_method == "DELETE":
+                self.store.remove(self.table, matched)
+                return FakeResponse([dict(row) for row in matched])
+
+            rows = [self._project(row) for row in matched]
+            rows = [row for row in rows if self._embedded_filters_pass(row)]
+            count = len(rows) if self._count == "exact" else None
+            rows = self._sort(rows, self._orders)
+            if self._limit is not None:
+                rows = rows[: self._limit]
+
+        if self._single:
+            if len(rows) != 1:
+                raise APIError({"message": "JSON object requested, multiple (or no) rows returned", "code": "PGRST116"})
+            return FakeResponse(rows[0], count)
+        return FakeResponse(rows, count)
+
+    def _insert(self) -> List[Dict[str, Any]]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        now = datetime.now(timezone.utc).isoformat()
+        rows, written = [], []
+        for data in payload:
+            if self._on_conflict:
+                key = self._on_conflict
+                existing = [r for r in self.store.rows(self.table, {key: data.get(key)}) if r.get(key) == data.get(key)]
+                if existing:
+                    existing[0].update(data)
+                    written.append(existing[0])
+                    continue
+
+            row = {**DEFAULTS.get(self.table, {}), **data}
+            row.setdefault("id", str(uuid.uuid4()))
+            stamp = TIMESTAMP_COLUMNS.get(self.table)
+            if stamp:
+                row.setdefault(stamp, now)
+            rows.append(row)
+            written.append(row)
+        self.store.insert(self.table, rows)
+        return [dict(row) for row in written]
+
+    def _match(self) -> List[Dict[str, Any]]:
+        local = [(column, predicate) for column, predicate in self._filters if "." not in column]
+        return [
+            row for row in self.store.rows(self.table, self._eq)
+            if all(predicate(row.get(column)) for column, predicate in local)
+            and all(check(row) for check in self._logic)
+        ]
+
+    def _embedded_filters_pass(self, row: Dict[str, Any]) -> bool:
+        # Filters on an embedded column drop the parent row, as with !inner joins
+        for column, predicate in self._filters:
+            if "." not in column:
+                continue
+            alias, field = column.split(".", 1)
+            related = row.get(alias)
+            if isinstance(related, list):
+                if not any(predicate(item.get(field)) for item in related):
+                    return False
+            elif not related or not predicate(related.get(field)):
+                return False
+        return True
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for item in _split_top_level(self._columns):
+            match = _EMBED.match(item)
+            if match is None:
+                if item == "*":
+                    result.update(row)
+                else:
+                    result[item] = row.get(item)
+                continue
+
+            alias, table, _, columns = match.groups()
+            alias = alias or table
+            result[alias] = self._embed(row, table, alias, [c.strip() for c in columns.split(",")])
+        return result
+
+    def _embed(self, row: Dict[str, Any], table: str, alias: str, columns: List[str]) -> Any:
+        local, foreign, many = RELATIONS[(self.table, table)]
+        related = [
+            item for item in self.store.rows(table, {foreign: row.get(local)})
+            if item.get(foreign) == row.get(local)
+        ]
+        if columns == ["count"]:
+            return [{"count": len(related)}]
+
+        options = self._embedded.get(alias, {})
+        related = self._sort(related, options.get("order", []))
+        if "limit" in options:
+            related = related[: options["limit"]]
+
+        projected = [{column: item.get(column) for column in columns} for item in related]
+        if many:
+            return projected
+        return projected[0] if projected else None
+
+    @staticmethod
+    def _sort(rows: List[Dict[str, Any]], orders: List[Tuple[str, bool]]) -> List[Dict[str, Any]]:
+        # Stable sorts applied last key first give a multi-column order
+        for column, desc in reversed(orders):
+            rows = sorted(rows, key=lambda row: _sort_key(row.get(column)), reverse=desc)
+        return rows
+
+
+class FakeSupabaseClient:
+    """In-process stand-in for supabase.Client, table API only."""
+
+    def __init__(self, store: Optional[FakeStore] = None):
+        self.store = store or FakeStore()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.store, name)
+
+
+def install(client: Optional[FakeSupabaseClient] = None) -> FakeSupabaseClient:
+    """Make get_supabase_client() return the fake. Call before the app is imported."""
+    from backend.core import supabase_client
+
+    client = client or FakeSupabaseClient()
+    supabase_client._supabase_client = client  # type: ignore
+    return client
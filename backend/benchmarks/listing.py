@@ -0,0 +1,95 @@
+"""
+Benchmark of the project listing against a user with many projects.
+
+    python -m backend.benchmarks.listing --projects 10000
+
+Seeds one user with --projects projects through the SQLite project
+repository, which has the same (user_id, created_at DESC, id DESC) index
+as the Supabase schema, then times list_page for:
+
+    first+total   first page with the exact count (X-Total-Count)
+    first         first page without the count
+    deep          the last page, reached by its keyset cursor
+    walk          every page in turn, as 'Load more' would
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.benchmarks.run import percentile
+
+
+async def measure(name: str, repeat: int, call: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+
+    summary = {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+    print(f"{name:<13} " + "  ".join(f"{field}={value}" for field, value in summary.items()), flush=True)
+    return summary
+
+
+async def run(args: argparse.Namespace) -> None:
+    from backend.repositories.storage import get_project_repository
+
+    projects = get_project_repository()
+    user_id = str(uuid.uuid4())
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    started = time.perf_counter()
+    for index in range(args.projects):
+        await projects.insert({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "project_name": f"bench-{index}",
+            "created_at": (base + timedelta(seconds=index)).isoformat(),
+        })
+    print(f"seeded {args.projects} projects in {time.perf_counter() - started:.1f}s", flush=True)
+
+    # Cursor of the row just before the last page
+    rows, _ = await projects.list_page(user_id, limit=max(args.projects - args.page_size, 1))
+    last_cursor: Optional[Tuple[str, str]] = (rows[-1]["created_at"], rows[-1]["id"]) if rows else None
+
+    async def walk() -> None:
+        after: Optional[Tuple[str, str]] = None
+        while True:
+            page, _ = await projects.list_page(user_id, after=after, limit=args.page_size)
+            if len(page) < args.page_size:
+                return
+            after = (page[-1]["created_at"], page[-1]["id"])
+
+    await measure("first+total", args.repeat, lambda: projects.list_page(user_id, limit=args.page_size, with_total=True))
+    await measure("first", args.repeat, lambda: projects.list_page(user_id, limit=args.page_size))
+    await measure("deep", args.repeat, lambda: projects.list_page(user_id, after=last_cursor, limit=args.page_size))
+    await measure("walk", max(args.repeat // 50, 1), walk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Project listing benchmark for a user with many projects")
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--sqlite-path", help="database file (default: a fresh temporary file)")
+    args = parser.parse_args()
+
+    # Read when settings load, so set before the repositories are imported.
+    # The fake Supabase scans every row, so its timings would say nothing here.
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = args.sqlite_path or os.path.join(tempfile.mkdtemp(), "listing.db")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.core.messages import ErrorMessages
+
+WORKLOADS = ("create_session", "chat", "stream", "history")
+
+PROMPTS = [
+    "What does this project do?",
+    "Summarize our conversation so far.",
+    "Give me three ideas for the next release.",
+    "Explain the last answer in simpler words.",
+]
+
+
+class TurnFailed(Exception):
+    """A chat turn answered with 200 whose content is the API's failure message."""
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Result:
+    """Latencies and failures of one workload."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.ttfts: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.elapsed = 0.0
+
+    def error(self, reason: str) -> None:
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        count = len(self.latencies)
+        summary: Dict[str, Any] = {
+            "requests": count,
+            "errors": sum(self.errors.values()),
+            "error_breakdown": self.errors,
+            "throughput_rps": round(count / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+        for pct in (50, 90, 99):
+            summary[f"p{pct}_ms"] = round(percentile(self.latencies, pct) * 1000, 1)
+        summary["max_ms"] = round(max(self.latencies, default=0.0) * 1000, 1)
+        if self.ttfts:
+            for pct in (50, 90, 99):
+                summary[f"ttft_p{pct}_ms"] = round(percentile(self.ttfts, pct) * 1000, 1)
+        return summary
+
+
+class Harness:
+    """
+    Starts the fake upstream and the API (against the fake Supabase) as
+    subprocesses, seeds one project per user, then runs each workload for
+    a fixed duration with a fixed number of concurrent clients.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.upstream_port = free_port()
+        self.api_port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.api_port}/api/v1"
+        self.processes: List[subprocess.Popen] = []
+        # (user id, session id) pairs, one per client
+        self.sessions: List[Tuple[str, str]] = []
+        self.projects: Dict[str, str] = {}
+
+    def start(self) -> None:
+        self.processes.append(subprocess.Popen([
+            sys.executable, "-m", "backend.benchmarks.fake_openai",
+            "--port", str(self.upstream_port),
+            "--ttft", str(self.args.ttft),
+            "--inter-token", str(self.args.inter_token),
+            "--tokens", str(self.args.tokens),
+            "--rate-429", str(self.args.rate_429),
+        ]))
+        self.processes.append(subprocess.Popen([
+            sys.executable, "-m", "backend.benchmarks.serve",
+            "--port", str(self.api_port),
+            "--upstream", f"http://127.0.0.1:{self.upstream_port}/v1",
+        ], env=os.environ.copy()))
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    async def wait_ready(self, client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        urls = [f"http://127.0.0.1:{self.upstream_port}/health", f"http://127.0.0.1:{self.api_port}/health"]
+        for url in urls:
+            while True:
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not become ready")
+                await asyncio.sleep(0.2)
+
+    @staticmethod
+    def headers(user_id: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {user_id}"}
+
+    async def seed(self, client: httpx.AsyncClient) -> None:
+        for index in range(self.args.users):
+            user_id = f"00000000-0000-4000-8000-{index:012d}"
+            response = await client.post(
+                f"{self.base_url}/project/",
+                json={"project_name": f"bench-{index}", "system_prompt": "You are a helpful assistant."},
+                headers=self.headers(user_id),
+            )
+            response.raise_for_status()
+            self.projects[user_id] = response.json()["id"]
+
+        users = list(self.projects)
+        for index in range(self.args.concurrency):
+            user_id = users[index % len(users)]
+            self.sessions.append((user_id, await self.create_session(client, user_id)))
+
+    async def create_session(self, client: httpx.AsyncClient, user_id: str) -> str:
+        response = await client.post(
+            f"{self.base_url}/sessions/",
+            json={"project_id": self.projects[user_id]},
+            headers=self.headers(user_id),
+        )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def op_create_session(self, client: httpx.AsyncClient, worker: int, result: Result) -> None:
+        await self.create_session(client, self.sessions[worker][0])
+
+    async def op_chat(self, client: httpx.AsyncClient, worker: int, result: Result) -> None:
+        user_id, session_id = self.sessions[worker]
+        response = await client.post(
+            f"{self.base_url}/sessions/{session_id}/chat",
+            json={"session_id": session_id, "message": PROMPTS[worker % len(PROMPTS)]},
+            headers=self.headers(user_id),
+        )
+        response.raise_for_status()
+        if response.json().get("response", "").startswith(ErrorMessages.LLM_RESPONSE_FAILED):
+            raise TurnFailed()
+
+    async def op_stream(self, client: httpx.AsyncClient, worker: int, result: Result) -> None:
+        user_id, session_id = self.sessions[worker]
+        started = time.monotonic()
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/sessions/{session_id}/chat/stream",
+            json={"session_id": session_id, "message": PROMPTS[worker % len(PROMPTS)]},
+            headers=self.headers(user_id),
+        ) as response:
+            response.raise_for_status()
+            event = None
+            first_at: Optional[float] = None
+            frame: List[str] = []
+            text: List[str] = []
+            async for line in response.aiter_lines():
+                if not line:
+                    if frame and event is None:
+                        text.append("\n".join(frame))
+                    event, frame = None, []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:") and event is None:
+                    if first_at is None:
+                        first_at = time.monotonic()
+                    frame.append(line[6:] if line.startswith("data: ") else line[5:])
+
+        # Failures are streamed as an ordinary data frame, possibly after some tokens
+        if ErrorMessages.LLM_RESPONSE_FAILED in "".join(text):
+            raise TurnFailed()
+        if first_at is not None:
+            result.ttfts.append(first_at - started)
+
+    async def op_history(self, client: httpx.AsyncClient, worker: int, result: Result) -> None:
+        user_id, session_id = self.sessions[worker]
+        response = await client.get(
+            f"{self.base_url}/sessions/{session_id}/history",
+            params={"limit": 50},
+            headers=self.headers(user_id),
+        )
+        response.raise_for_status()
+
+    async def run_workload(self, client: httpx.AsyncClient, name: str) -> Result:
+        op: Callable[[httpx.AsyncClient, int, Result], Awaitable[None]] = getattr(self, f"op_{name}")
+        result = Result(name)
+        deadline = time.monotonic() + self.args.duration
+
+        async def worker(index: int) -> None:
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    await op(client, index, result)
+                except httpx.HTTPStatusError as e:
+                    result.error(str(e.response.status_code))
+                    continue
+                except TurnFailed:
+                    result.error("llm_failed")
+                    continue
+                except httpx.HTTPError as e:
+                    result.error(type(e).__name__)
+                    continue
+                result.latencies.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(index) for index in range(self.args.concurrency)))
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def run(self) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.args.concurrency * 2, max_keepalive_connections=self.args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.args.timeout) as client:
+            await self.wait_ready(client)
+            await self.seed(client)
+
+            report: Dict[str, Any] = {
+                "config": {
+                    key: getattr(self.args, key)
+                    for key in ("concurrency", "users", "duration", "ttft", "inter_token", "tokens", "rate_429")
+                },
+                "workloads": {},
+            }
+            for name in self.args.workloads:
+                result = await self.run_workload(client, name)
+                report["workloads"][name] = result.summary()
+                print_summary(name, report["workloads"][name])
+            return report
+
+
+def print_summary(name: str, summary: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    fields = ["throughput_rps", "p50_ms", "p90_ms", "p99_ms", "max_ms", "ttft_p50_ms", "ttft_p99_ms"]
+    parts = [f"{name:<15} n={summary['requests']:<6} err={summary['errors']:<4}"]
+    for field in fields:
+        if field not in summary:
+            continue
+        text = f"{field}={summary[field]}"
+        if baseline and baseline.get(field):
+            change = (summary[field] - baseline[field]) / baseline[field] * 100
+            text += f" ({change:+.1f}%)"
+        parts.append(text)
+    print("  ".join(parts), flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test against local fakes of OpenRouter and Supabase")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"comma-separated, from {', '.join(WORKLOADS)}")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per workload")
+    parser.add_argument("--users", type=int, default=8, help="distinct users the clients are spread over")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per workload")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--ttft", type=float, default=0.3, help="fake upstream seconds to first token")
+    parser.add_argument("--inter-token", type=float, default=0.02, help="fake upstream seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=64, help="fake upstream tokens per completion")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of upstream requests answered with 429")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--compare", help="JSON report of an earlier run to diff against")
+    args = parser.parse_args()
+
+    args.workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    harness = Harness(args)
+    harness.start()
+    try:
+        report = asyncio.run(harness.run())
+    finally:
+        harness.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare}:")
+        for name, summary in report["workloads"].items():
+            print_summary(name, summary, baseline.get("workloads", {}).get(name))
+
+
+if __name__ == "__main__":
+    main()
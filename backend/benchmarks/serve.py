@@ -0,0 +1,54 @@
+import argparse
+import os
+
+import uvicorn
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# Applied before settings load; anything already in the environment wins.
+# Upstream rate limits are lifted so the fake's latency profile, not the
+# governor, is what gets measured.
+BENCH_ENVIRONMENT = {
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "bench",
+    "OPENROUTER_API_KEY": "bench",
+    "OPENROUTER_URL": "http://127.0.0.1:8200/v1",
+    "RATE_LIMIT_MODEL_RPM": "1000000",
+    "RATE_LIMIT_MODEL_BURST": "100000",
+    "RATE_LIMIT_KEY_RPM": "1000000",
+    "RATE_LIMIT_KEY_BURST": "100000",
+}
+
+bearer = HTTPBearer()
+
+
+async def bearer_user(credentials: HTTPAuthorizationCredentials = Depends(bearer)) -> str:
+    """Benchmark auth: the bearer token is the user id, no JWKS round trip."""
+    return credentials.credentials
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API against the fake Supabase and a fake upstream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--upstream", default=None, help="base URL of the fake completion server")
+    args = parser.parse_args()
+
+    if args.upstream:
+        os.environ["OPENROUTER_URL"] = args.upstream
+    for name, value in BENCH_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    # Both imports read settings, so they come after the environment is set
+    from backend.benchmarks.fake_supabase import install
+    install()
+
+    from backend.api.dependencies import get_current_user
+    from backend.main import app
+
+    app.dependency_overrides[get_current_user] = bearer_user
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of SSE framing, without network.
+
+    python -m backend.benchmarks.sse --tokens 20000 --inter-token 0
+
+Feeds the same token stream through one frame per token (format_event for
+every token, as the stream was encoded before coalescing) and through
+SSEEncoder, and reports frames, bytes and throughput of each. With
+--inter-token above zero the source is paced like an upstream model, which
+shows how many frames coalescing saves at a realistic token rate.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict
+
+from backend.benchmarks.serve import BENCH_ENVIRONMENT
+
+WORDS = ["The", " quick", " brown", " fox", " jumps", " over", " the", " lazy", " dog", ".\n"]
+
+
+async def token_source(count: int, inter_token: float) -> AsyncIterator[str]:
+    for index in range(count):
+        if inter_token:
+            await asyncio.sleep(inter_token)
+        yield WORDS[index % len(WORDS)]
+
+
+def report(name: str, frames: int, size: int, elapsed: float, tokens: int) -> Dict[str, Any]:
+    summary = {
+        "frames": frames,
+        "bytes": size,
+        "frames_per_sec": round(frames / elapsed, 1) if elapsed else 0.0,
+        "tokens_per_sec": round(tokens / elapsed, 1) if elapsed else 0.0,
+        "bytes_per_token": round(size / tokens, 1) if tokens else 0.0,
+    }
+    print(f"{name:<10} " + "  ".join(f"{field}={value}" for field, value in summary.items()), flush=True)
+    return summary
+
+
+async def per_token(args: argparse.Namespace) -> Dict[str, Any]:
+    from backend.core.sse import DONE_SENTINEL, format_event
+
+    frames = size = 0
+    started = time.perf_counter()
+    async for token in token_source(args.tokens, args.inter_token):
+        frames += 1
+        size += len(format_event(token, event_id=frames).encode())
+    size += len(format_event(DONE_SENTINEL, event_id=frames + 1, event="done").encode())
+    return report("per-token", frames + 1, size, time.perf_counter() - started, args.tokens)
+
+
+async def coalesced(args: argparse.Namespace) -> Dict[str, Any]:
+    from backend.core.sse import SSEEncoder
+
+    encoder = SSEEncoder()
+    size = 0
+    started = time.perf_counter()
+    async for frame in encoder.stream(token_source(args.tokens, args.inter_token)):
+        size += len(frame.encode())
+    return report("coalesced", encoder.frames_sent, size, time.perf_counter() - started, encoder.tokens_sent)
+
+
+async def run(args: argparse.Namespace) -> None:
+    await per_token(args)
+    await coalesced(args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark of SSE frame coalescing")
+    parser.add_argument("--tokens", type=int, default=20000, help="tokens in the stream")
+    parser.add_argument("--inter-token", type=float, default=0.0, help="seconds between source tokens")
+    args = parser.parse_args()
+
+    # SSE limits come from settings, which need the base environment to load
+    for name, value in BENCH_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
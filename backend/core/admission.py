@@ -0,0 +1,226 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from backend.core.config import settings
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued or waited too long."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A granted slot. release() is idempotent so every exit path may call it."""
+
+    def __init__(self, controller: "AdmissionController", user_id: str, project_id: str, waited: float):
+        self._controller = controller
+        self.user_id = user_id
+        self.project_id = project_id
+        self.wait_seconds = waited
+        self.granted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+
+class _Waiter:
+    def __init__(self, user_id: str, project_id: str):
+        self.user_id = user_id
+        self.project_id = project_id
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    """
+    Concurrency caps for LLM calls per user, per project and overall.
+
+    A request over its caps waits in its user's queue. When a slot frees,
+    users are served round-robin, so one tenant with a deep backlog cannot
+    starve the others. Queues are bounded per user and overall, and a wait
+    is capped at max_wait; past either limit the request is rejected with an
+    estimated Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = settings.ADMISSION_MAX_INFLIGHT,
+        max_per_user: int = settings.ADMISSION_MAX_PER_USER,
+        max_per_project: int = settings.ADMISSION_MAX_PER_PROJECT,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        max_queued_per_user: int = settings.ADMISSION_MAX_QUEUED_PER_USER,
+        max_wait: float = settings.ADMISSION_MAX_WAIT,
+    ):
+        self.max_inflight = max_inflight
+        self.max_per_user = max_per_user
+        self.max_per_project = max_per_project
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.max_wait = max_wait
+
+        self._inflight = 0
+        self._per_user: Dict[str, int] = {}
+        self._per_project: Dict[str, int] = {}
+        # Round-robin order over users with queued requests
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queued = 0
+
+        # Smoothed time a slot is held, for Retry-After estimates
+        self._hold_ewma = 1.0
+
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, project_id: str = "") -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(user_id, project_id)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    async def acquire(self, user_id: str, project_id: str = "") -> Ticket:
+        if not self._queues and self._can_run(user_id, project_id):
+            return self._grant(user_id, project_id, 0.0)
+
+        queue = self._queues.get(user_id)
+        if self._queued >= self.max_queue or (queue and len(queue) >= self.max_queued_per_user):
+            self.rejected += 1
+            raise AdmissionRejected("Too many requests in flight", self.retry_after())
+
+        waiter = _Waiter(user_id, project_id)
+        if queue is None:
+            queue = deque()
+            self._queues[user_id] = queue
+        queue.append(waiter)
+        self._queued += 1
+        self.queued_total += 1
+        self._dispatch()
+
+        try:
+            return await asyncio.wait_for(waiter.future, self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted in the same tick the timeout fired
+                return waiter.future.result()
+            self._discard(waiter)
+            self.timed_out += 1
+            raise AdmissionRejected("Timed out waiting for capacity", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                waiter.future.result().release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free for a new arrival."""
+        backlog = (self._queued + 1) / max(self.max_inflight, 1)
+        return max(1, math.ceil(self._hold_ewma * backlog))
+
+    def _can_run(self, user_id: str, project_id: str) -> bool:
+        return (
+            self._inflight < self.max_inflight
+            and self._per_user.get(user_id, 0) < self.max_per_user
+            and (not project_id or self._per_project.get(project_id, 0) < self.max_per_project)
+        )
+
+    def _grant(self, user_id: str, project_id: str, waited: float) -> Ticket:
+        self._inflight += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        if project_id:
+            self._per_project[project_id] = self._per_project.get(project_id, 0) + 1
+
+        self.admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return Ticket(self, user_id, project_id, waited)
+
+    def _release(self, ticket: Ticket) -> None:
+        self._inflight -= 1
+        self._decrement(self._per_user, ticket.user_id)
+        if ticket.project_id:
+            self._decrement(self._per_project, ticket.project_id)
+
+        held = time.monotonic() - ticket.granted_at
+        self._hold_ewma = 0.8 * self._hold_ewma + 0.2 * held
+        self._dispatch()
+
+    @staticmethod
+    def _decrement(counts: Dict[str, int], key: str) -> None:
+        remaining = counts.get(key, 0) - 1
+        if remaining > 0:
+            counts[key] = remaining
+        else:
+            counts.pop(key, None)
+
+    def _dispatch(self) -> None:
+        """Grant queued requests round-robin across users while capacity lasts."""
+        progressed = True
+        while progressed and self._queues and self._inflight < self.max_inflight:
+            progressed = False
+            for user_id in list(self._queues):
+                queue = self._queues[user_id]
+                waiter = queue[0]
+                if not self._can_run(waiter.user_id, waiter.project_id):
+                    continue
+
+                queue.popleft()
+                self._queued -= 1
+                if queue:
+                    # Served: go to the back of the rotation
+                    self._queues.move_to_end(user_id)
+                else:
+                    del self._queues[user_id]
+
+                waited = time.monotonic() - waiter.enqueued_at
+                waiter.future.set_result(self._grant(waiter.user_id, waiter.project_id, waited))
+                progressed = True
+                break
+
+    def _discard(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.user_id)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[waiter.user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": self._inflight,
+            "queued": self._queued,
+            "queued_users": len(self._queues),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": self._wait_total / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self._wait_max,
+        }
+
+
+_admission: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the shared admission controller."""
+    global _admission
+
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
@@ -1,4 +1,4 @@
-from typing import ClassVar, List
+from typing import ClassVar, Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,13 +13,152 @@ class Settings(BaseSettings):
 
     OPENROUTER_API_KEY: str = ""
     OPENROUTER_URL: str = "https://openrouter.ai/api/v1"
-    
+
+    # Storage for projects, sessions, messages and summaries: "supabase", or
+    # "sqlite" to run on one box with the database file at SQLITE_PATH
+    STORAGE_BACKEND: str = "supabase"
+    SQLITE_PATH: str = "chatbot.db"
+
+    # Conversation state shared across workers: "local" (single worker, not
+    # shared), "memory" (an in-process store) or "tcp" for a session state
+    # server at SESSION_STATE_ADDRESS (host:port)
+    SESSION_STATE_BACKEND: str = "local"
+    SESSION_STATE_ADDRESS: str = "127.0.0.1:8765"
+    SESSION_STATE_POOL_SIZE: int = 8
+    SESSION_STATE_TTL: int = 1800
+    SESSION_STATE_MAX_ENTRIES: int = 10000
+    SESSION_STATE_MAX_RETRIES: int = 5
+    # How long one worker may hold a session's summarization before another can take over
+    SUMMARY_LEASE_SECONDS: float = 120.0
+
+    # Threads used to run blocking storage calls off the event loop
+    DB_MAX_WORKERS: int = 16
+
+    # Bounds for live chat sessions kept in RAM per worker
+    SESSION_CACHE_MAX_SESSIONS: int = 1000
+    SESSION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SESSION_CACHE_IDLE_TTL: int = 1800
+    SESSION_NEGATIVE_CACHE_TTL: int = 10
+    SESSION_NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+
+    # Shared write-behind queue for chat messages
+    MESSAGE_WRITER_BATCH_SIZE: int = 100
+    MESSAGE_WRITER_FLUSH_INTERVAL: float = 0.05
+    MESSAGE_WRITER_QUEUE_SIZE: int = 10000
+
+    # Background summarization: concurrency cap, and how long a summary
+    # defers while this many interactive chat calls are in flight
+    SUMMARY_MAX_CONCURRENCY: int = 2
+    SUMMARY_INTERACTIVE_THRESHOLD: int = 8
+    SUMMARY_MAX_DEFER: float = 10.0
+
+    # Project listing pages
+    PROJECT_PAGE_SIZE: int = 20
+    PROJECT_MAX_PAGE_SIZE: int = 100
+
+    # Per-process cache of project lookups on the chat path
+    PROJECT_CACHE_TTL: int = 60
+    PROJECT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Exact-match chat response cache for projects with enable_response_cache
+    RESPONSE_CACHE_TTL: int = 3600
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+
+    # Retrieval memory: turns sent verbatim, relevant older turns added per
+    # message, the hashed n-gram embedding size, and the rows read per batch
+    # when a session's full history is indexed on load
+    RETRIEVAL_RECENT_TURNS: int = 3
+    RETRIEVAL_TOP_K: int = 4
+    RETRIEVAL_MIN_SCORE: float = 0.1
+    RETRIEVAL_EMBEDDING_DIM: int = 1024
+    RETRIEVAL_HYDRATE_BATCH_SIZE: int = 500
+
+    # Admission control for chat calls: concurrency caps per user, project
+    # and overall, and the bounded fair-share queue in front of them
+    ADMISSION_MAX_INFLIGHT: int = 64
+    ADMISSION_MAX_PER_USER: int = 2
+    ADMISSION_MAX_PER_PROJECT: int = 8
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_MAX_QUEUED_PER_USER: int = 4
+    ADMISSION_MAX_WAIT: float = 15.0
+
+    # Upstream governor: token buckets per model and per API key (requests
+    # per minute), bounded wait queue, and retry backoff for 429/5xx
+    RATE_LIMIT_MODEL_RPM: float = 20
+    RATE_LIMIT_MODEL_BURST: int = 5
+    RATE_LIMIT_KEY_RPM: float = 60
+    RATE_LIMIT_KEY_BURST: int = 10
+    RATE_LIMIT_MAX_WAITERS: int = 200
+    RATE_LIMIT_MAX_WAIT: float = 10.0
+    RATE_LIMIT_MAX_RETRIES: int = 3
+    RATE_LIMIT_BACKOFF_BASE: float = 0.5
+    RATE_LIMIT_BACKOFF_MAX: float = 8.0
+
+    # Connection pool of the shared OpenRouter client
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 60.0
+
+    # Model router: rolling TTFT/error window per model, circuit breaker
+    # thresholds, and the TTFT percentile after which a fallback is hedged
+    ROUTER_WINDOW: int = 50
+    ROUTER_MIN_SAMPLES: int = 5
+    ROUTER_FAILURE_THRESHOLD: int = 3
+    ROUTER_ERROR_RATE_THRESHOLD: float = 0.5
+    ROUTER_CIRCUIT_COOLDOWN: float = 30.0
+    ROUTER_HEDGE_PERCENTILE: float = 90.0
+    ROUTER_HEDGE_MIN_DELAY: float = 1.0
+    ROUTER_HEDGE_MAX_DELAY: float = 8.0
+    ROUTER_DECISION_LOG_SIZE: int = 500
+
+    # JWT verification caches
+    JWKS_CACHE_TTL: int = 600
+    JWKS_MIN_REFRESH_INTERVAL: int = 30
+    TOKEN_CACHE_MAX_ENTRIES: int = 50000
+
     # 3 Working free models on OpenRouter (2026)
     FREE_MODELS: ClassVar[List[str]] = [
         'meta-llama/llama-3.3-70b-instruct:free',   # Llama 3.3 70B -
         'google/gemma-3-27b-it:free',                # Google Gemma 3 27B 
         'google/gemini-2.0-flash-exp:free',          # Gemini 2.0 Flash
     ]
+
+    # Context window sizes (tokens) used to budget the prompt per model
+    MODEL_CONTEXT_WINDOWS: ClassVar[Dict[str, int]] = {
+        'meta-llama/llama-3.3-70b-instruct:free': 131072,
+        'google/gemma-3-27b-it:free': 96000,
+        'google/gemini-2.0-flash-exp:free': 1048576,
+    }
+    DEFAULT_CONTEXT_WINDOW: int = 8192
+
+    # Completion cap per chat turn and ceiling on memory context in the prompt
+    CHAT_MAX_TOKENS: int = 1000
+    MEMORY_CONTEXT_MAX_TOKENS: int = 6000
+
+    # Session sidebar pages and the per-user cache in front of them
+    SESSION_LIST_PAGE_SIZE: int = 20
+    SESSION_LIST_MAX_PAGE_SIZE: int = 100
+    SESSION_LIST_CACHE_TTL: int = 30
+    SESSION_LIST_CACHE_MAX_ENTRIES: int = 5000
+    SESSION_PREVIEW_CHARS: int = 120
+
+    # Chat history pages, and batch size when streaming a full export
+    HISTORY_PAGE_SIZE: int = 50
+    HISTORY_MAX_PAGE_SIZE: int = 200
+    HISTORY_EXPORT_BATCH_SIZE: int = 500
+
+    # SSE framing: coalesce tokens per frame by size or time, heartbeat when idle
+    SSE_MAX_FRAME_BYTES: int = 1024
+    SSE_FLUSH_INTERVAL: float = 0.03
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    SSE_DISCONNECT_POLL_INTERVAL: float = 0.5
+
+    # Per-request timing spans: fraction of requests traced (an "X-Trace: 1"
+    # request header forces it), and an optional JSON-lines trace log
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_LOG_PATH: str = ""
     
     model_config = SettingsConfigDict(
         env_file=".env", 
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.core.config import settings
+from backend.core.metrics import DB_QUERY_DURATION
+from backend.core.tracing import record
+
+T = TypeVar("T")
+
+# postgrest builders only expose the HTTP verb
+_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+# Bounded pool for the blocking supabase-py calls so they never run on the event loop
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get the shared offload pool for database calls."""
+    global _db_executor
+
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.DB_MAX_WORKERS,
+            thread_name_prefix="db",
+        )
+    return _db_executor
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the database pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+
+async def run_timed(table: str, operation: str, func: Callable[..., T], *args: Any) -> T:
+    """run_sync, recorded in the query latency metric and the request trace."""
+    started = time.monotonic()
+    try:
+        return await run_sync(func, *args)
+    finally:
+        elapsed = time.monotonic() - started
+        DB_QUERY_DURATION.observe(elapsed, table=table, operation=operation)
+        record("db", elapsed)
+
+
+async def run_query(query: Any) -> Any:
+    """Execute a prepared supabase query builder without blocking the event loop."""
+    table = str(getattr(query, "path", "unknown")).strip("/") or "unknown"
+    operation = _OPERATIONS.get(str(getattr(query, "http_method", "")).upper(), "other")
+    return await run_timed(table, operation, query.execute)
+
+
+def shutdown_db_executor() -> None:
+    """Stop the offload pool, waiting for in-flight queries to finish."""
+    global _db_executor
+
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
@@ -3,6 +3,24 @@
 
 from backend.core.interfaces.base_llm_manager import BaseLLMManager
 from backend.core.interfaces.base_memory_manager import BaseMemoryStrategy
+from backend.core.interfaces.base_session_state import BaseSessionStateStore
+from backend.core.interfaces.base_storage import (
+    BaseMessageRepository,
+    BaseProjectRepository,
+    BaseSessionRepository,
+    BaseSnapshotRepository,
+    BaseSummaryRepository,
+)
 from backend.core.interfaces.base_summarizer_memory import BaseSummarizer
 
-__all__ = ["BaseLLMManager", "BaseMemoryStrategy", "BaseSummarizer"]
+__all__ = [
+    "BaseLLMManager",
+    "BaseMemoryStrategy",
+    "BaseMessageRepository",
+    "BaseProjectRepository",
+    "BaseSessionRepository",
+    "BaseSessionStateStore",
+    "BaseSnapshotRepository",
+    "BaseSummarizer",
+    "BaseSummaryRepository",
+]
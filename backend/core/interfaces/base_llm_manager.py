@@ -22,12 +22,14 @@ class BaseLLMManager(ABC):
         pass
     
     @abstractmethod
-    async def chat(self,message:str,system_prompt:str = "")->str:
+    async def chat(self,message:str,system_prompt:str = "",use_cache:bool = False,allow_fallback:bool = False)->str:
         """ Normal Chat"""
         pass
 
     @abstractmethod
-    async def chat_stream(self, message: str, system_prompt: str = "") -> AsyncGenerator[str, None]:
+    async def chat_stream(
+        self, message: str, system_prompt: str = "", use_cache: bool = False, allow_fallback: bool = False
+    ) -> AsyncGenerator[str, None]:
         """Stream chat response token by token."""
         yield ""
 
@@ -1,6 +1,6 @@
 
 import abc
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class BaseMemoryStrategy(abc.ABC):
@@ -14,11 +14,19 @@ class BaseMemoryStrategy(abc.ABC):
         pass
     
     @abc.abstractmethod
-    def get_context(self) -> str:
+    def get_context(self, max_tokens: Optional[int] = None, query: Optional[str] = None) -> str:
         """
-        Retrieve and format relevant context from memory for the LLM.
+        Retrieve and format relevant context from memory for the LLM,
+        trimmed to max_tokens when given. query is the incoming user
+        message, for strategies that select context by relevance.
         """
         pass
+
+    def get_context_tokens(self) -> int:
+        """
+        Estimated token count of the context last returned by get_context.
+        """
+        return 0
     
     @abc.abstractmethod
     def clear(self) -> None:
@@ -26,7 +34,27 @@ class BaseMemoryStrategy(abc.ABC):
         Reset the memory storage, useful for starting new conversations.
         """
         pass
-    
+
+    async def load_memory(self) -> None:
+        """
+        Hydrate the memory from persistent storage. No-op for in-memory strategies.
+        """
+        pass
+
+    async def flush(self) -> bool:
+        """
+        Wait until pending writes to persistent storage have completed.
+        Returns False if any of them failed.
+        """
+        return True
+
+    async def sync(self) -> None:
+        """
+        Catch up with state written by other workers. No-op for strategies
+        whose state is local to the process.
+        """
+        pass
+
     def get_memory_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the current memory usage.
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+
+class BaseSessionStateStore(ABC):
+    """
+    Conversation state shared by every worker, with optimistic versioning.
+
+    Each key holds a JSON-serializable dict and a version that grows on
+    every successful write and is never reused, also after the key expires
+    or is deleted; an absent key has version 0. A writer passes the version
+    it read, and the write is refused if anyone wrote since.
+    """
+
+    # False for a store that keeps nothing, leaving each worker's copy as the only one
+    shared = True
+
+    @abstractmethod
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """The state and its version, or (None, 0) if absent."""
+        pass
+
+    @abstractmethod
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        """Store state if the current version is expected_version; returns the new version, or None on conflict."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class BaseProjectRepository(ABC):
+    """Storage for projects. Rows are plain dicts keyed by column name."""
+
+    @abstractmethod
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert one project; returns the stored row."""
+        pass
+
+    @abstractmethod
+    async def update(self, project_id: str, user_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update the user's project; returns the updated rows (empty if none matched)."""
+        pass
+
+    @abstractmethod
+    async def delete(self, project_id: str, user_id: str) -> List[Dict[str, Any]]:
+        """Delete the user's project; returns the deleted rows."""
+        pass
+
+    @abstractmethod
+    async def list_page(
+        self,
+        user_id: str,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_total: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One keyset page of a user's projects ordered by (created_at, id)
+        descending, starting after the given (created_at, id). The total is
+        returned when with_total, otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's project, or None."""
+        pass
+
+    @abstractmethod
+    async def get_owner(self, project_id: str) -> Optional[str]:
+        """user_id of the project's owner, or None."""
+        pass
+
+
+class BaseSessionRepository(ABC):
+    """Storage for chat sessions."""
+
+    @abstractmethod
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def get_with_owner(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        The session's project_id and model, with user_id and memory_strategy
+        from its project, or None.
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def list_page(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_counts: bool = False,
+        with_preview: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of a user's sessions ordered by (created_at, id)
+        descending. Rows have id, title, created_at, model and project_id,
+        plus message_count (int) when with_counts and last_message (content
+        of the highest-seq message, or None) when with_preview.
+        """
+        pass
+
+    @abstractmethod
+    async def update(self, session_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        pass
+
+
+class BaseMessageRepository(ABC):
+    """Storage for chat messages, ordered within a session by seq."""
+
+    @abstractmethod
+    async def insert(self, data: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows in one round trip, keeping their order."""
+        pass
+
+    @abstractmethod
+    async def after_seq(self, session_id: str, seq: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest user/assistant messages with a seq above seq, newest first."""
+        pass
+
+    @abstractmethod
+    async def page(
+        self,
+        session_id: str,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+        descending: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of user/assistant messages (role, content, seq,
+        timestamp) ordered by seq. cursor is the seq of the previous page's
+        last row and is excluded.
+        """
+        pass
+
+    async def iter_all(self, session_id: str, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Every user/assistant message oldest first, fetched batch_size rows at a time."""
+        cursor = None
+        while True:
+            rows = await self.page(session_id, cursor=cursor, limit=batch_size, descending=False)
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            cursor = rows[-1]["seq"]
+
+    @abstractmethod
+    async def delete_for_session(self, session_id: str) -> None:
+        pass
+
+
+class BaseSummaryRepository(ABC):
+    """Storage for conversation summaries, each covering a range of message seqs."""
+
+    @abstractmethod
+    async def insert(self, data: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def latest(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The summary with the highest to_seq (content, from_seq, to_seq), or None."""
+        pass
+
+    @abstractmethod
+    async def delete_for_session(self, session_id: str) -> None:
+        pass
+
+
+class BaseSnapshotRepository(ABC):
+    """
+    One compact row per session with everything needed to rebuild its
+    memory: summary, summary_seq, next_seq and recent (the unsummarized
+    turns as a list of role/content/seq dicts).
+    """
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or replace one snapshot per session in one round trip."""
+        pass
+
+    @abstractmethod
+    async def delete_for_session(self, session_id: str) -> None:
+        pass
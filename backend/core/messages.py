@@ -20,6 +20,8 @@ class ErrorMessages:
     LLM_INVALID_MESSAGE_FORMAT = "Invalid message format provided"
     LLM_API_ERROR = "Error communicating with AI service"
     LLM_EMPTY_RESPONSE = "AI returned an empty response"
+    LLM_MODEL_UNAVAILABLE = "Model is temporarily unavailable, try again shortly"
+    CHAT_OVERLOADED = "Too many chat requests right now, please retry shortly"
 
     # Session Service Errors
     SESSION_NOT_FOUND = "Session not found"
@@ -33,6 +35,8 @@ class ErrorMessages:
     # Memory Errors
     MEMORY_LOAD_FAILED = "Failed to load conversation memory"
     MEMORY_SAVE_FAILED = "Failed to save message to database"
+    SESSION_STATE_FAILED = "Shared session state unavailable"
+    SESSION_STATE_CONFLICT = "Gave up on shared session state after repeated conflicts"
     MEMORY_SUMMARIZE_FAILED = "Failed to summarize conversation"
 
 
@@ -1,5 +1,6 @@
-from typing import Optional
-from openai import AsyncOpenAI
+from typing import Any, Dict, Optional
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 _openai_client: Optional[AsyncOpenAI] = None
 
@@ -13,6 +14,49 @@ def get_openai_client() -> AsyncOpenAI:
         _openai_client = AsyncOpenAI(
             base_url=settings.OPENROUTER_URL,
             api_key=settings.OPENROUTER_API_KEY,
+            # Retries are handled by the rate-limit governor
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    settings.OPENAI_READ_TIMEOUT,
+                    connect=settings.OPENAI_CONNECT_TIMEOUT,
+                ),
+            ),
         )
     
-    return _openai_client
\ No newline at end of file
+    return _openai_client
+
+
+def get_openai_pool_stats() -> Dict[str, Any]:
+    """Connection pool usage of the shared client, if it has been created."""
+    from backend.core.config import settings
+
+    stats: Dict[str, Any] = {
+        "max_connections": settings.OPENAI_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    }
+    if _openai_client is None:
+        return stats
+
+    # httpx does not expose pool state publicly; read httpcore's pool if present
+    pool = getattr(getattr(_openai_client._client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is not None:
+        stats["connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        stats["pending_requests"] = len(getattr(pool, "_requests", []))
+    return stats
+
+
+async def close_openai_client() -> None:
+    """Close the shared client's connection pool."""
+    global _openai_client
+
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream statuses worth retrying; everything else is returned to the caller
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimitedError(Exception):
+    """Raised when a call cannot be admitted within the governor's wait budget."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at rate tokens/second up to capacity.
+    A Retry-After from upstream blocks the bucket until that time.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available; 0 when it is available now."""
+        self._refill(now)
+        blocked = max(self.blocked_until - now, 0.0)
+        if self.tokens >= 1:
+            return blocked
+        return max(blocked, (1 - self.tokens) / self.rate)
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimitGovernor:
+    """
+    Shared admission and retry policy for upstream LLM calls.
+
+    Every call takes a token from its model's bucket and from the API key's
+    bucket, waiting up to max_wait seconds. At most max_waiters calls may be
+    waiting at once; beyond that, calls are rejected right away instead of
+    piling up. Retryable failures are retried with full-jitter exponential
+    backoff, and a Retry-After from upstream is honored and applied to the
+    model's bucket so other callers back off too.
+    """
+
+    def __init__(
+        self,
+        model_rpm: float = settings.RATE_LIMIT_MODEL_RPM,
+        model_burst: int = settings.RATE_LIMIT_MODEL_BURST,
+        key_rpm: float = settings.RATE_LIMIT_KEY_RPM,
+        key_burst: int = settings.RATE_LIMIT_KEY_BURST,
+        max_waiters: int = settings.RATE_LIMIT_MAX_WAITERS,
+        max_wait: float = settings.RATE_LIMIT_MAX_WAIT,
+        max_retries: int = settings.RATE_LIMIT_MAX_RETRIES,
+        backoff_base: float = settings.RATE_LIMIT_BACKOFF_BASE,
+        backoff_max: float = settings.RATE_LIMIT_BACKOFF_MAX,
+    ):
+        self.model_rate = model_rpm / 60
+        self.model_burst = model_burst
+        self.key_rate = key_rpm / 60
+        self.key_burst = key_burst
+        self.max_waiters = max_waiters
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._models: Dict[str, TokenBucket] = {}
+        self._keys: Dict[str, TokenBucket] = {}
+        self._waiting = 0
+
+        self.admitted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.retries = 0
+        self.upstream_429 = 0
+        self._wait_total = 0.0
+
+    def _model_bucket(self, model: str) -> TokenBucket:
+        bucket = self._models.get(model)
+        if bucket is None:
+            bucket = TokenBucket(self.model_rate, self.model_burst)
+            self._models[model] = bucket
+        return bucket
+
+    def _key_bucket(self, api_key: str) -> TokenBucket:
+        # Keyed by digest so the secret itself never shows up in stats
+        key_id = hashlib.sha256(api_key.encode()).hexdigest()[:8]
+        bucket = self._keys.get(key_id)
+        if bucket is None:
+            bucket = TokenBucket(self.key_rate, self.key_burst)
+            self._keys[key_id] = bucket
+        return bucket
+
+    async def acquire(self, model: str, api_key: str = settings.OPENROUTER_API_KEY) -> float:
+        """Wait for a slot for model; returns the seconds spent waiting."""
+        model_bucket = self._model_bucket(model)
+        key_bucket = self._key_bucket(api_key)
+
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        queued = False
+        try:
+            while True:
+                now = time.monotonic()
+                wait = max(model_bucket.wait_time(now), key_bucket.wait_time(now))
+                if wait <= 0:
+                    model_bucket.consume()
+                    key_bucket.consume()
+                    self.admitted += 1
+                    waited = now - started
+                    self._wait_total += waited
+                    return waited
+
+                if now + wait > deadline:
+                    self.rejected += 1
+                    raise RateLimitedError(f"Rate limit for {model} exceeded", retry_after=wait)
+
+                if not queued:
+                    if self._waiting >= self.max_waiters:
+                        self.rejected += 1
+                        raise RateLimitedError(f"Too many requests waiting for {model}", retry_after=wait)
+                    self._waiting += 1
+                    self.throttled += 1
+                    queued = True
+
+                # Small jitter so waiters released together do not stampede
+                await asyncio.sleep(wait + random.uniform(0, 0.05))
+        finally:
+            if queued:
+                self._waiting -= 1
+
+    async def call(self, model: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func under the model's limits, retrying retryable upstream errors."""
+        attempt = 0
+        while True:
+            await self.acquire(model)
+            try:
+                return await func()
+            except (openai.APIConnectionError, openai.APIStatusError) as e:
+                status = getattr(e, "status_code", None)
+                if status is not None and status not in RETRYABLE_STATUS:
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+
+                retry_after = self._retry_after(e)
+                if status == 429:
+                    self.upstream_429 += 1
+                    if retry_after is not None:
+                        self._model_bucket(model).block(retry_after)
+
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if delay > self.max_wait:
+                    raise
+
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"Retrying {model} in {delay:.2f}s after {status or type(e).__name__}")
+                await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "waiting": self._waiting,
+            "max_waiters": self.max_waiters,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "upstream_429": self.upstream_429,
+            "avg_wait_seconds": self._wait_total / self.admitted if self.admitted else 0.0,
+            "models": {
+                model: {
+                    "tokens": round(bucket.tokens, 2),
+                    "blocked_for": max(bucket.blocked_until - now, 0.0),
+                }
+                for model, bucket in self._models.items()
+            },
+        }
+
+
+_governor: Optional[RateLimitGovernor] = None
+
+
+def get_rate_limit_governor() -> RateLimitGovernor:
+    """Get the shared upstream rate-limit governor."""
+    global _governor
+
+    if _governor is None:
+        _governor = RateLimitGovernor()
+    return _governor
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from backend.core.config import settings
+
+DONE_SENTINEL = "[DONE]"
+HEARTBEAT_FRAME = ": ping\n\n"
+
+
+def format_event(data: str, event_id: Optional[int] = None, event: Optional[str] = None) -> str:
+    """
+    Encode one SSE event. Multi-line data is split into one data field per
+    line, which clients join back with newlines.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    for line in data.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+class SSEEncoder:
+    """
+    Turns a stream of text tokens into coalesced SSE frames.
+
+    The first token is sent at once to keep time-to-first-token low. After
+    that, tokens are batched until the frame reaches max_frame_bytes or
+    flush_interval has passed since the batch started. While the upstream is
+    silent, a comment heartbeat is sent every heartbeat_interval seconds to
+    keep proxies from closing the connection.
+    """
+
+    def __init__(
+        self,
+        max_frame_bytes: int = settings.SSE_MAX_FRAME_BYTES,
+        flush_interval: float = settings.SSE_FLUSH_INTERVAL,
+        heartbeat_interval: float = settings.SSE_HEARTBEAT_INTERVAL,
+        disconnect_poll_interval: float = settings.SSE_DISCONNECT_POLL_INTERVAL,
+    ):
+        self.max_frame_bytes = max_frame_bytes
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self._next_id = 0
+        self.disconnected = False
+
+        self.frames_sent = 0
+        self.tokens_sent = 0
+
+    def event(self, data: str, event: Optional[str] = None) -> str:
+        self._next_id += 1
+        self.frames_sent += 1
+        return format_event(data, event_id=self._next_id, event=event)
+
+    async def stream(
+        self,
+        tokens: AsyncIterator[str],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        trailer: Optional[Callable[[], Optional[str]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield encoded frames for the token stream. When is_disconnected is
+        given, the client is polled every disconnect_poll_interval seconds and
+        the token source is cancelled as soon as it has gone away. trailer is
+        called once the source is exhausted; its result, if any, is sent as a
+        "timing" event just before the done event.
+        """
+        # Unbounded on purpose: the upstream is capped by max_tokens, and a
+        # bounded queue could block the producer's final marker forever
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def produce():
+            try:
+                async for token in tokens:
+                    queue.put_nowait(token)
+            finally:
+                queue.put_nowait(finished)
+
+        producer = asyncio.create_task(produce())
+        pending: List[str] = []
+        pending_bytes = 0
+        batch_started = 0.0
+        last_sent = time.monotonic()
+        next_poll = last_sent + self.disconnect_poll_interval
+        first = True
+
+        async def client_gone() -> bool:
+            nonlocal next_poll
+            if is_disconnected is None or time.monotonic() < next_poll:
+                return False
+            next_poll = time.monotonic() + self.disconnect_poll_interval
+            return await is_disconnected()
+
+        try:
+            while True:
+                if pending:
+                    deadline = batch_started + self.flush_interval
+                else:
+                    deadline = last_sent + self.heartbeat_interval
+                wake_at = min(deadline, next_poll) if is_disconnected else deadline
+
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(wake_at - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    if await client_gone():
+                        self.disconnected = True
+                        return
+                    if time.monotonic() >= deadline:
+                        if pending:
+                            yield self.event("".join(pending))
+                            pending, pending_bytes = [], 0
+                        else:
+                            yield HEARTBEAT_FRAME
+                        last_sent = time.monotonic()
+                    continue
+
+                if item is finished:
+                    break
+
+                self.tokens_sent += 1
+                if not pending:
+                    batch_started = time.monotonic()
+                pending.append(item)
+                pending_bytes += len(item.encode())
+
+                if first or pending_bytes >= self.max_frame_bytes:
+                    first = False
+                    yield self.event("".join(pending))
+                    pending, pending_bytes = [], 0
+                    last_sent = time.monotonic()
+
+                if await client_gone():
+                    self.disconnected = True
+                    return
+
+            if pending:
+                yield self.event("".join(pending))
+            # Surface errors raised by the token source
+            await producer
+            if trailer is not None:
+                data = trailer()
+                if data:
+                    yield self.event(data, event="timing")
+            yield self.event(DONE_SENTINEL, event="done")
+        finally:
+            # Cancelling the producer cancels the token source, closing the upstream
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
@@ -0,0 +1,19 @@
+from backend.core.config import settings
+
+# Average characters per token for English text on BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+# Chat-format framing tokens added per message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; avoids shipping a tokenizer per model."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def get_context_window(model: str) -> int:
+    """Context window size in tokens for a model."""
+    return settings.MODEL_CONTEXT_WINDOWS.get(model, settings.DEFAULT_CONTEXT_WINDOW)
@@ -0,0 +1,137 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+import uuid
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.config import settings
+
+# Returned by span() when the request is not sampled: no allocation, no clock reads
+_NOOP = nullcontext()
+
+
+class Trace:
+    """Spans recorded for one request, as (name, start offset, duration) in seconds."""
+
+    __slots__ = ("trace_id", "started", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def add(self, name: str, duration: float, start: Optional[float] = None) -> None:
+        offset = (start if start is not None else time.perf_counter() - duration) - self.started
+        self.spans.append((name, offset, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value; repeated span names are summed."""
+        totals: Dict[str, float] = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        totals["total"] = self.elapsed()
+        return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in totals.items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "spans": [
+                {"name": name, "start_ms": round(offset * 1000, 2), "dur_ms": round(duration * 1000, 2)}
+                for name, offset, duration in self.spans
+            ],
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.trace.add(self.name, time.perf_counter() - self.start, self.start)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def span(name: str):
+    """Time a block as a span of the current request's trace, if it is sampled."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+def record(name: str, duration: float) -> None:
+    """Add a span measured elsewhere, e.g. a queue wait or time-to-first-token."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, duration)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def should_sample(forced: bool = False) -> bool:
+    return forced or (settings.TRACE_SAMPLE_RATE > 0 and random.random() < settings.TRACE_SAMPLE_RATE)
+
+
+def start_trace() -> Tuple[Trace, Token]:
+    trace = Trace()
+    return trace, _current.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _current.reset(token)
+
+
+# JSON lines are handed to a background thread so the event loop never writes to disk
+_trace_logger: Optional[logging.Logger] = None
+_trace_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def write_trace(entry: Dict[str, Any]) -> None:
+    """Append one trace as a JSON line to TRACE_LOG_PATH, when configured."""
+    global _trace_logger, _trace_listener
+
+    if not settings.TRACE_LOG_PATH:
+        return
+
+    if _trace_logger is None:
+        records: queue.Queue = queue.Queue(-1)
+        file_handler = logging.FileHandler(settings.TRACE_LOG_PATH)
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        _trace_listener = logging.handlers.QueueListener(records, file_handler)
+        _trace_listener.start()
+
+        _trace_logger = logging.getLogger("backend.trace")
+        _trace_logger.setLevel(logging.INFO)
+        _trace_logger.propagate = False
+        _trace_logger.addHandler(logging.handlers.QueueHandler(records))
+
+    _trace_logger.info(json.dumps(entry, default=str))
+
+
+def shutdown_trace_log() -> None:
+    """Flush and stop the trace log writer thread."""
+    global _trace_listener
+
+    if _trace_listener is not None:
+        _trace_listener.stop()
+        _trace_listener = None
@@ -1,18 +1,49 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
+from .api.dependencies import get_project_service, get_session_manager
+from .api.middleware import MetricsMiddleware, TracingMiddleware
 from .api.router import api_router
+from .core.admission import get_admission_controller
 from .core.config import settings
+from .core.database import shutdown_db_executor
+from .core.metrics import CONTENT_TYPE, gauges, get_registry
+from .core.openai_client import close_openai_client, get_openai_pool_stats
+from .core.tracing import shutdown_trace_log
+from .core.rate_limiter import get_rate_limit_governor
+from .services.llm.openai_service import cancellation_stats
+from .services.llm.response_cache import get_response_cache
+from .services.llm.router import get_model_router
+from .services.memory.message_writer import get_message_writer
+from .services.memory.session_state import close_session_state_store, get_session_state_store
+from .services.memory.summarization_scheduler import get_summarization_scheduler
 
 # Simple error-only logging
 logging.basicConfig(level=logging.ERROR)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_message_writer().start()
+    yield
+    await get_summarization_scheduler().stop()
+    await get_session_manager().shutdown()
+    await get_message_writer().stop()
+    await close_openai_client()
+    await close_session_state_store()
+    shutdown_db_executor()
+    shutdown_trace_log()
+
+
 app = FastAPI(
     title="ChatBot Platform",
     description="Ai chatbot",
     version="2.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -31,11 +62,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Queue-Wait-Ms", "Server-Timing"],
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
+
+def _collect_pipeline_stats():
+    """Gauges read from the stats() of each pipeline component at scrape time."""
+    session_stats = get_session_manager().get_cache_stats()
+    listings = session_stats.pop("listings", {})
+    yield from gauges("session_cache", "Live session cache", session_stats)
+    yield from gauges("session_listing_cache", "Session listing cache", listings)
+    yield from gauges("project_cache", "Project lookup cache", get_project_service().get_cache_stats())
+    yield from gauges("response_cache", "Chat response cache", get_response_cache().stats())
+    yield from gauges("message_writer", "Background message writes", get_message_writer().stats())
+    yield from gauges("summarization", "Summarization scheduler", get_summarization_scheduler().stats())
+    yield from gauges("admission", "Chat admission control", get_admission_controller().stats())
+    yield from gauges("rate_limit", "Upstream rate-limit governor", get_rate_limit_governor().stats())
+    yield from gauges("openai_pool", "OpenRouter connection pool", get_openai_pool_stats())
+    yield from gauges("stream_cancellation", "Streams cancelled by client disconnect", cancellation_stats.stats())
+    yield from gauges("session_state", "Shared session state store", get_session_state_store().stats())
+
+    for model, health in get_model_router().stats().items():
+        yield from gauges("model_router", "Model router", health, labels={"model": model})
+
+
+get_registry().register_collector(_collect_pipeline_stats)
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """Simple health check endpoint"""
-    return {"status": "healthy", "version": "2.1.0"}
\ No newline at end of file
+    return {"status": "healthy", "version": "2.1.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text exposition of latency histograms and pipeline gauges."""
+    return Response(content=get_registry().render(), media_type=CONTENT_TYPE)
\ No newline at end of file
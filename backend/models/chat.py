@@ -49,6 +49,8 @@ class SessionResponse(BaseModel):
     title: str
     chat_model: Optional[str] = Field(default=None, alias="model")
     created_at: datetime
+    message_count: Optional[int] = None
+    last_message: Optional[str] = None
 
 class ChatRequest(BaseModel):
     session_id: str
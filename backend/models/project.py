@@ -1,11 +1,19 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 from pydantic import BaseModel
 
+class MemoryStrategy(str, Enum):
+    SUMMARIZATION = "summarization"
+    RETRIEVAL = "retrieval"
+
 class ProjectBase(BaseModel):
     project_name: str 
     project_description: Optional[str] = None
     system_prompt: Optional[str] = ""
+    enable_response_cache: bool = False
+    memory_strategy: MemoryStrategy = MemoryStrategy.SUMMARIZATION
+    allow_model_fallback: bool = False
 
 class ProjectCreate(ProjectBase):
     pass
@@ -14,6 +22,9 @@ class ProjectUpdate(BaseModel):
     project_name: Optional[str] = None
     project_description: Optional[str] = None
     system_prompt: Optional[str] = None
+    enable_response_cache: Optional[bool] = None
+    memory_strategy: Optional[MemoryStrategy] = None
+    allow_model_fallback: Optional[bool] = None
     updated_at: Optional[datetime] = None
 
 class ProjectResponse(ProjectBase):
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional
+
+from backend.core.database import run_query
+from backend.core.interfaces.base_storage import BaseMessageRepository
+from backend.core.supabase_client import get_supabase_client
+
+
+class MessageRepository(BaseMessageRepository):
+    """Async data access for the messages table"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def insert(self, data: Dict[str, Any]) -> None:
+        await run_query(self.client.table("messages").insert(data))
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Bulk insert in a single request; rows keep their given order."""
+        if rows:
+            await run_query(self.client.table("messages").insert(rows))
+
+    async def after_seq(self, session_id: str, seq: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest user/assistant messages with a sequence above seq, newest first."""
+        res = await run_query(
+            self.client.table("messages")
+            .select("role, content, seq")
+            .eq("session_id", session_id)
+            .in_("role", ["user", "assistant"])
+            .gt("seq", seq)
+            .order("seq", desc=True)
+            .limit(limit)
+        )
+        return res.data or []
+
+    async def page(
+        self,
+        session_id: str,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+        descending: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of user/assistant messages ordered by seq. cursor is
+        the seq of the last row of the previous page and is excluded.
+        """
+        query = (
+            self.client.table("messages")
+            .select("role, content, seq, timestamp")
+            .eq("session_id", session_id)
+            .in_("role", ["user", "assistant"])
+        )
+        if cursor is not None:
+            query = query.lt("seq", cursor) if descending else query.gt("seq", cursor)
+        res = await run_query(query.order("seq", desc=descending).limit(limit))
+        return res.data or []
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await run_query(self.client.table("messages").delete().eq("session_id", session_id))
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.database import run_query
+from backend.core.interfaces.base_storage import BaseProjectRepository
+from backend.core.pagination import quote_filter_value
+from backend.core.supabase_client import get_supabase_client
+
+PROJECT_COLUMNS = "id,user_id,project_name,project_description,system_prompt,enable_response_cache,memory_strategy,allow_model_fallback,created_at"
+
+
+class ProjectRepository(BaseProjectRepository):
+    """Async data access for the Projects table"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        res = await run_query(self.client.table("Projects").insert(data))
+        return res.data or []
+
+    async def update(self, project_id: str, user_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("Projects")
+            .update(data)
+            .eq("id", project_id)
+            .eq("user_id", user_id)
+        )
+        return res.data or []
+
+    async def delete(self, project_id: str, user_id: str) -> List[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("Projects")
+            .delete()
+            .eq("id", project_id)
+            .eq("user_id", user_id)
+        )
+        return res.data or []
+
+    async def list_page(
+        self,
+        user_id: str,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_total: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One keyset page of a user's projects, newest first, ordered by
+        (created_at, id). after is the (created_at, id) of the previous page's
+        last row. The total is counted in the same request when with_total.
+        """
+        query = (
+            self.client.table("Projects")
+            .select(PROJECT_COLUMNS, count="exact" if with_total else None)  # type: ignore
+            .eq("user_id", user_id)
+        )
+        if after:
+            created_at, project_id = (quote_filter_value(v) for v in after)
+            query = query.or_(
+                f"created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{project_id})"
+            )
+        res = await run_query(
+            query.order("created_at", desc=True).order("id", desc=True).limit(limit)
+        )
+        return res.data or [], res.count
+
+    async def get(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("Projects")
+            .select(PROJECT_COLUMNS)
+            .eq("id", project_id)
+            .eq("user_id", user_id)
+            .limit(1)
+        )
+        return res.data[0] if res.data else None
+
+    async def get_owner(self, project_id: str) -> Optional[str]:
+        res = await run_query(
+            self.client.table("Projects")
+            .select("user_id")
+            .eq("id", project_id)
+            .limit(1)
+        )
+        return res.data[0].get("user_id") if res.data else None
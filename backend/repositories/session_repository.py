@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.database import run_query
+from backend.core.interfaces.base_storage import BaseSessionRepository
+from backend.core.pagination import quote_filter_value
+from backend.core.supabase_client import get_supabase_client
+
+
+class SessionRepository(BaseSessionRepository):
+    """Async data access for the sessions table"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        res = await run_query(self.client.table("sessions").insert(data))
+        return res.data or []
+
+    async def get_with_owner(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a session joined with Projects to resolve its owner and memory strategy."""
+        res = await run_query(
+            self.client.table("sessions")
+            .select("project_id, model, Projects(user_id, memory_strategy)")
+            .eq("id", session_id)
+            .limit(1)
+        )
+        # limit(1) rather than single() so a missing row is None, not an error
+        if not res.data:
+            return None
+        row = res.data[0]
+        project = row.pop("Projects", None) or {}
+        row["user_id"] = project.get("user_id")
+        row["memory_strategy"] = project.get("memory_strategy")
+        return row
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("sessions").select("*").eq("id", session_id)
+        )
+        return res.data[0] if res.data else None
+
+    async def list_page(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_counts: bool = False,
+        with_preview: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of a user's sessions, newest first, ordered by
+        (created_at, id). after is the (created_at, id) of the previous page's
+        last row. Counts and the last-message preview are embedded in the same
+        request, so a page is always a single query.
+        """
+        columns = "id, title, created_at, model, project_id, Projects!inner(user_id)"
+        if with_counts:
+            columns += ", message_count:messages(count)"
+        if with_preview:
+            columns += ", last_message:messages(role, content, seq)"
+
+        query = (
+            self.client.table("sessions")
+            .select(columns)
+            .eq("Projects.user_id", user_id)
+        )
+        if project_id:
+            query = query.eq("project_id", project_id)
+        if after:
+            created_at, session_id = (quote_filter_value(v) for v in after)
+            query = query.or_(
+                f"created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{session_id})"
+            )
+        if with_preview:
+            query = (
+                query.order("seq", desc=True, foreign_table="last_message")
+                .limit(1, foreign_table="last_message")
+            )
+
+        res = await run_query(
+            query.order("created_at", desc=True).order("id", desc=True).limit(limit)
+        )
+        return [self._flatten(row) for row in res.data or []]
+
+    @staticmethod
+    def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+        row.pop("Projects", None)
+        if "message_count" in row:
+            counts = row["message_count"] or [{"count": 0}]
+            row["message_count"] = counts[0]["count"]
+        if "last_message" in row:
+            last = row["last_message"]
+            row["last_message"] = last[0]["content"] if last else None
+        return row
+
+    async def update(self, session_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("sessions").update(data).eq("id", session_id)
+        )
+        return res.data or []
+
+    async def delete(self, session_id: str) -> None:
+        await run_query(self.client.table("sessions").delete().eq("id", session_id))
@@ -0,0 +1,28 @@
+from typing import Any, Dict, List, Optional
+
+from backend.core.database import run_query
+from backend.core.interfaces.base_storage import BaseSnapshotRepository
+from backend.core.supabase_client import get_supabase_client
+
+
+class SnapshotRepository(BaseSnapshotRepository):
+    """Async data access for the session_snapshots table"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        res = await run_query(
+            self.client.table("session_snapshots")
+            .select("session_id, summary, summary_seq, next_seq, recent")
+            .eq("session_id", session_id)
+            .limit(1)
+        )
+        return res.data[0] if res.data else None
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            await run_query(self.client.table("session_snapshots").upsert(rows, on_conflict="session_id"))
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await run_query(self.client.table("session_snapshots").delete().eq("session_id", session_id))
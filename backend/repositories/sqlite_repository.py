@@ -0,0 +1,487 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from backend.core.config import settings
+from backend.core.database import run_timed
+from backend.core.interfaces.base_storage import (
+    BaseMessageRepository,
+    BaseProjectRepository,
+    BaseSessionRepository,
+    BaseSnapshotRepository,
+    BaseSummaryRepository,
+)
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    user_id TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    project_description TEXT,
+    system_prompt TEXT DEFAULT '',
+    enable_response_cache INTEGER NOT NULL DEFAULT 0,
+    memory_strategy TEXT NOT NULL DEFAULT 'summarization',
+    allow_model_fallback INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_user_created_idx ON projects (user_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    title TEXT DEFAULT 'New Chat',
+    model TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS sessions_project_created_idx ON sessions (project_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    seq INTEGER,
+    timestamp TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS messages_session_seq_idx ON messages (session_id, seq);
+
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    from_seq INTEGER NOT NULL,
+    to_seq INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS summaries_session_to_seq_idx ON summaries (session_id, to_seq DESC);
+
+CREATE TABLE IF NOT EXISTS session_snapshots (
+    session_id TEXT PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_seq INTEGER NOT NULL DEFAULT 0,
+    next_seq INTEGER NOT NULL DEFAULT 1,
+    recent TEXT NOT NULL DEFAULT '[]',
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+"""
+
+# Writable columns per table. Column names cannot be bound as parameters,
+# so anything interpolated into SQL must come from here.
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "projects": (
+        "id", "user_id", "project_name", "project_description", "system_prompt",
+        "enable_response_cache", "memory_strategy", "allow_model_fallback", "created_at", "updated_at",
+    ),
+    "sessions": ("id", "project_id", "title", "model", "created_at"),
+    "messages": ("session_id", "role", "content", "seq", "timestamp"),
+    "summaries": ("session_id", "content", "from_seq", "to_seq", "created_at"),
+    "session_snapshots": ("session_id", "summary", "summary_seq", "next_seq", "recent", "updated_at"),
+}
+
+_PROJECT_BOOLEANS = ("enable_response_cache", "allow_model_fallback")
+
+
+def _writable(table: str, data: Dict[str, Any]) -> List[str]:
+    unknown = set(data) - set(COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    return list(data)
+
+
+def _project_row(row: sqlite3.Row) -> Dict[str, Any]:
+    project = dict(row)
+    for column in _PROJECT_BOOLEANS:
+        if column in project:
+            project[column] = bool(project[column])
+    return project
+
+
+class SQLiteDatabase:
+    """
+    One SQLite file shared by the repositories. Each database worker thread
+    keeps its own connection; WAL lets readers proceed while a write
+    commits. Statements are parameterized and the sqlite3 module caches
+    their compiled form per connection.
+    """
+
+    def __init__(self, path: str = settings.SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; multi-statement writes open their own transaction
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+
+    @contextmanager
+    def transaction(self, conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    async def run(self, table: str, operation: str, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run func with this thread's connection on the database pool."""
+        return await run_timed(table, operation, lambda: func(self.connection()))
+
+
+_sqlite_database: Optional[SQLiteDatabase] = None
+
+
+def get_sqlite_database() -> SQLiteDatabase:
+    """Get the shared SQLite database."""
+    global _sqlite_database
+
+    if _sqlite_database is None:
+        _sqlite_database = SQLiteDatabase()
+    return _sqlite_database
+
+
+class SQLiteProjectRepository(BaseProjectRepository):
+    """Projects stored in SQLite"""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_sqlite_database()
+
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = _writable("projects", data)
+        sql = (
+            f"INSERT INTO projects ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) RETURNING *"
+        )
+        rows = await self.db.run(
+            "projects", "insert", lambda conn: conn.execute(sql, [data[c] for c in columns]).fetchall()
+        )
+        return [_project_row(row) for row in rows]
+
+    async def update(self, project_id: str, user_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = _writable("projects", data)
+        if not columns:
+            return []
+        sql = (
+            f"UPDATE projects SET {', '.join(f'{c} = ?' for c in columns)} "
+            "WHERE id = ? AND user_id = ? RETURNING *"
+        )
+        params = [data[c] for c in columns] + [project_id, user_id]
+        rows = await self.db.run("projects", "update", lambda conn: conn.execute(sql, params).fetchall())
+        return [_project_row(row) for row in rows]
+
+    async def delete(self, project_id: str, user_id: str) -> List[Dict[str, Any]]:
+        rows = await self.db.run(
+            "projects", "delete",
+            lambda conn: conn.execute(
+                "DELETE FROM projects WHERE id = ? AND user_id = ? RETURNING *", (project_id, user_id)
+            ).fetchall(),
+        )
+        return [_project_row(row) for row in rows]
+
+    async def list_page(
+        self,
+        user_id: str,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_total: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        def query(conn: sqlite3.Connection) -> Tuple[List[sqlite3.Row], Optional[int]]:
+            if after:
+                rows = conn.execute(
+                    "SELECT * FROM projects WHERE user_id = ? AND (created_at, id) < (?, ?) "
+                    "ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (user_id, after[0], after[1], limit),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM projects WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (user_id, limit),
+                ).fetchall()
+            total = None
+            if with_total:
+                total = conn.execute("SELECT COUNT(*) FROM projects WHERE user_id = ?", (user_id,)).fetchone()[0]
+            return rows, total
+
+        rows, total = await self.db.run("projects", "select", query)
+        return [_project_row(row) for row in rows], total
+
+    async def get(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(
+            "projects", "select",
+            lambda conn: conn.execute(
+                "SELECT * FROM projects WHERE id = ? AND user_id = ?", (project_id, user_id)
+            ).fetchone(),
+        )
+        return _project_row(row) if row else None
+
+    async def get_owner(self, project_id: str) -> Optional[str]:
+        row = await self.db.run(
+            "projects", "select",
+            lambda conn: conn.execute("SELECT user_id FROM projects WHERE id = ?", (project_id,)).fetchone(),
+        )
+        return row["user_id"] if row else None
+
+
+class SQLiteSessionRepository(BaseSessionRepository):
+    """Sessions stored in SQLite"""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_sqlite_database()
+
+    async def insert(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = _writable("sessions", data)
+        sql = (
+            f"INSERT INTO sessions ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) RETURNING *"
+        )
+        rows = await self.db.run(
+            "sessions", "insert", lambda conn: conn.execute(sql, [data[c] for c in columns]).fetchall()
+        )
+        return [dict(row) for row in rows]
+
+    async def get_with_owner(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(
+            "sessions", "select",
+            lambda conn: conn.execute(
+                "SELECT s.project_id, s.model, p.user_id, p.memory_strategy "
+                "FROM sessions s JOIN projects p ON p.id = s.project_id WHERE s.id = ?",
+                (session_id,),
+            ).fetchone(),
+        )
+        return dict(row) if row else None
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(
+            "sessions", "select",
+            lambda conn: conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone(),
+        )
+        return dict(row) if row else None
+
+    async def list_page(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        with_counts: bool = False,
+        with_preview: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # A handful of fixed statement shapes, each cached once compiled
+        columns = "s.id, s.title, s.created_at, s.model, s.project_id"
+        if with_counts:
+            columns += ", (SELECT COUNT(*) FROM messages m WHERE m.session_id = s.id) AS message_count"
+        if with_preview:
+            columns += (
+                ", (SELECT m.content FROM messages m WHERE m.session_id = s.id "
+                "ORDER BY m.seq DESC LIMIT 1) AS last_message"
+            )
+
+        where = ["p.user_id = ?"]
+        params: List[Any] = [user_id]
+        if project_id:
+            where.append("s.project_id = ?")
+            params.append(project_id)
+        if after:
+            where.append("(s.created_at, s.id) < (?, ?)")
+            params.extend(after)
+        params.append(limit)
+
+        sql = (
+            f"SELECT {columns} FROM sessions s JOIN projects p ON p.id = s.project_id "
+            f"WHERE {' AND '.join(where)} ORDER BY s.created_at DESC, s.id DESC LIMIT ?"
+        )
+        rows = await self.db.run("sessions", "select", lambda conn: conn.execute(sql, params).fetchall())
+        return [dict(row) for row in rows]
+
+    async def update(self, session_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        columns = _writable("sessions", data)
+        if not columns:
+            return []
+        sql = f"UPDATE sessions SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ? RETURNING *"
+        params = [data[c] for c in columns] + [session_id]
+        rows = await self.db.run("sessions", "update", lambda conn: conn.execute(sql, params).fetchall())
+        return [dict(row) for row in rows]
+
+    async def delete(self, session_id: str) -> None:
+        await self.db.run(
+            "sessions", "delete", lambda conn: conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        )
+
+
+class SQLiteMessageRepository(BaseMessageRepository):
+    """Messages stored in SQLite"""
+
+    INSERT = "INSERT INTO messages (session_id, role, content, seq, timestamp) VALUES (?, ?, ?, ?, COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')))"
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_sqlite_database()
+
+    @staticmethod
+    def _params(row: Dict[str, Any]) -> Tuple[Any, ...]:
+        _writable("messages", row)
+        return (row["session_id"], row["role"], row["content"], row.get("seq"), row.get("timestamp"))
+
+    async def insert(self, data: Dict[str, Any]) -> None:
+        params = self._params(data)
+        await self.db.run("messages", "insert", lambda conn: conn.execute(self.INSERT, params))
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        params = [self._params(row) for row in rows]
+
+        def write(conn: sqlite3.Connection) -> None:
+            with self.db.transaction(conn):
+                conn.executemany(self.INSERT, params)
+
+        await self.db.run("messages", "insert", write)
+
+    async def after_seq(self, session_id: str, seq: int, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = await self.db.run(
+            "messages", "select",
+            lambda conn: conn.execute(
+                "SELECT role, content, seq FROM messages "
+                "WHERE session_id = ? AND role IN ('user', 'assistant') AND seq > ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (session_id, seq, limit),
+            ).fetchall(),
+        )
+        return [dict(row) for row in rows]
+
+    async def page(
+        self,
+        session_id: str,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+        descending: bool = True,
+    ) -> List[Dict[str, Any]]:
+        if descending:
+            sql = (
+                "SELECT role, content, seq, timestamp FROM messages "
+                "WHERE session_id = ? AND role IN ('user', 'assistant') AND seq < ? "
+                "ORDER BY seq DESC LIMIT ?"
+            )
+            bound = cursor if cursor is not None else 2 ** 62
+        else:
+            sql = (
+                "SELECT role, content, seq, timestamp FROM messages "
+                "WHERE session_id = ? AND role IN ('user', 'assistant') AND seq > ? "
+                "ORDER BY seq ASC LIMIT ?"
+            )
+            bound = cursor if cursor is not None else -(2 ** 62)
+
+        rows = await self.db.run(
+            "messages", "select", lambda conn: conn.execute(sql, (session_id, bound, limit)).fetchall()
+        )
+        return [dict(row) for row in rows]
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await self.db.run(
+            "messages", "delete",
+            lambda conn: conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,)),
+        )
+
+
+class SQLiteSummaryRepository(BaseSummaryRepository):
+    """Summaries stored in SQLite"""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_sqlite_database()
+
+    async def insert(self, data: Dict[str, Any]) -> None:
+        columns = _writable("summaries", data)
+        sql = f"INSERT INTO summaries ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        await self.db.run("summaries", "insert", lambda conn: conn.execute(sql, [data[c] for c in columns]))
+
+    async def latest(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(
+            "summaries", "select",
+            lambda conn: conn.execute(
+                "SELECT content, from_seq, to_seq FROM summaries WHERE session_id = ? "
+                "ORDER BY to_seq DESC LIMIT 1",
+                (session_id,),
+            ).fetchone(),
+        )
+        return dict(row) if row else None
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await self.db.run(
+            "summaries", "delete",
+            lambda conn: conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,)),
+        )
+
+
+class SQLiteSnapshotRepository(BaseSnapshotRepository):
+    """Session snapshots stored in SQLite, with recent kept as JSON text"""
+
+    UPSERT = (
+        "INSERT INTO session_snapshots (session_id, summary, summary_seq, next_seq, recent, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))) "
+        "ON CONFLICT (session_id) DO UPDATE SET summary = excluded.summary, summary_seq = excluded.summary_seq, "
+        "next_seq = excluded.next_seq, recent = excluded.recent, updated_at = excluded.updated_at"
+    )
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_sqlite_database()
+
+    @staticmethod
+    def _params(row: Dict[str, Any]) -> Tuple[Any, ...]:
+        _writable("session_snapshots", row)
+        return (
+            row["session_id"], row.get("summary", ""), row.get("summary_seq", 0), row.get("next_seq", 1),
+            json.dumps(row.get("recent", []), separators=(",", ":")), row.get("updated_at"),
+        )
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(
+            "session_snapshots", "select",
+            lambda conn: conn.execute(
+                "SELECT session_id, summary, summary_seq, next_seq, recent FROM session_snapshots "
+                "WHERE session_id = ?",
+                (session_id,),
+            ).fetchone(),
+        )
+        if row is None:
+            return None
+        snapshot = dict(row)
+        snapshot["recent"] = json.loads(snapshot["recent"])
+        return snapshot
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        params = [self._params(row) for row in rows]
+
+        def write(conn: sqlite3.Connection) -> None:
+            with self.db.transaction(conn):
+                conn.executemany(self.UPSERT, params)
+
+        await self.db.run("session_snapshots", "upsert", write)
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await self.db.run(
+            "session_snapshots", "delete",
+            lambda conn: conn.execute("DELETE FROM session_snapshots WHERE session_id = ?", (session_id,)),
+        )
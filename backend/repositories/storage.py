@@ -0,0 +1,94 @@
+from typing import Optional
+
+from backend.core.config import settings
+from backend.core.interfaces.base_storage import (
+    BaseMessageRepository,
+    BaseProjectRepository,
+    BaseSessionRepository,
+    BaseSnapshotRepository,
+    BaseSummaryRepository,
+)
+
+# Repositories hold no per-request state, so one instance of each is shared
+_projects: Optional[BaseProjectRepository] = None
+_sessions: Optional[BaseSessionRepository] = None
+_messages: Optional[BaseMessageRepository] = None
+_summaries: Optional[BaseSummaryRepository] = None
+_snapshots: Optional[BaseSnapshotRepository] = None
+
+
+def _use_sqlite() -> bool:
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend not in ("supabase", "sqlite"):
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+    return backend == "sqlite"
+
+
+def get_project_repository() -> BaseProjectRepository:
+    """Get the project repository for the configured storage backend."""
+    global _projects
+
+    if _projects is None:
+        if _use_sqlite():
+            from backend.repositories.sqlite_repository import SQLiteProjectRepository
+            _projects = SQLiteProjectRepository()
+        else:
+            from backend.repositories.project_repository import ProjectRepository
+            _projects = ProjectRepository()
+    return _projects
+
+
+def get_session_repository() -> BaseSessionRepository:
+    """Get the session repository for the configured storage backend."""
+    global _sessions
+
+    if _sessions is None:
+        if _use_sqlite():
+            from backend.repositories.sqlite_repository import SQLiteSessionRepository
+            _sessions = SQLiteSessionRepository()
+        else:
+            from backend.repositories.session_repository import SessionRepository
+            _sessions = SessionRepository()
+    return _sessions
+
+
+def get_message_repository() -> BaseMessageRepository:
+    """Get the message repository for the configured storage backend."""
+    global _messages
+
+    if _messages is None:
+        if _use_sqlite():
+            from backend.repositories.sqlite_repository import SQLiteMessageRepository
+            _messages = SQLiteMessageRepository()
+        else:
+            from backend.repositories.message_repository import MessageRepository
+            _messages = MessageRepository()
+    return _messages
+
+
+def get_summary_repository() -> BaseSummaryRepository:
+    """Get the summary repository for the configured storage backend."""
+    global _summaries
+
+    if _summaries is None:
+        if _use_sqlite():
+            from backend.repositories.sqlite_repository import SQLiteSummaryRepository
+            _summaries = SQLiteSummaryRepository()
+        else:
+            from backend.repositories.summary_repository import SummaryRepository
+            _summaries = SummaryRepository()
+    return _summaries
+
+
+def get_snapshot_repository() -> BaseSnapshotRepository:
+    """Get the session snapshot repository for the configured storage backend."""
+    global _snapshots
+
+    if _snapshots is None:
+        if _use_sqlite():
+            from backend.repositories.sqlite_repository import SQLiteSnapshotRepository
+            _snapshots = SQLiteSnapshotRepository()
+        else:
+            from backend.repositories.snapshot_repository import SnapshotRepository
+            _snapshots = SnapshotRepository()
+    return _snapshots
@@ -0,0 +1,29 @@
+from typing import Any, Dict, Optional
+
+from backend.core.database import run_query
+from backend.core.interfaces.base_storage import BaseSummaryRepository
+from backend.core.supabase_client import get_supabase_client
+
+
+class SummaryRepository(BaseSummaryRepository):
+    """Async data access for the summaries table"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def insert(self, data: Dict[str, Any]) -> None:
+        await run_query(self.client.table("summaries").insert(data))
+
+    async def latest(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent summary of a session with the message range it covers."""
+        res = await run_query(
+            self.client.table("summaries")
+            .select("content, from_seq, to_seq")
+            .eq("session_id", session_id)
+            .order("to_seq", desc=True)
+            .limit(1)
+        )
+        return res.data[0] if res.data else None
+
+    async def delete_for_session(self, session_id: str) -> None:
+        await run_query(self.client.table("summaries").delete().eq("session_id", session_id))
@@ -1,6 +1,7 @@
 import logging
 from typing import Any
 
+from backend.core.database import run_sync
 from backend.core.messages import ErrorMessages, LogMessages
 from backend.core.supabase_client import get_supabase_client
 from backend.models.auth import UserCreate, UserLogin
@@ -19,7 +20,8 @@ class AuthService:
     async def signup(self, user_data: UserCreate) -> dict[str, Any]:
         """Register a new user in Supabase Auth"""
         try:
-            auth_response = self.client.auth.sign_up(
+            auth_response = await run_sync(
+                self.client.auth.sign_up,
                 {
                     "email": user_data.email,
                     "password": user_data.password,
@@ -47,7 +49,8 @@ class AuthService:
     async def login(self, user_data: UserLogin) -> dict[str, Any]:
         """Authenticate a user with email and password"""
         try:
-            auth_response = self.client.auth.sign_in_with_password(
+            auth_response = await run_sync(
+                self.client.auth.sign_in_with_password,
                 {
                     "email": user_data.email,
                     "password": user_data.password,
@@ -74,7 +77,7 @@ class AuthService:
 
     async def logout(self, user_id: str) -> bool:
         try:
-            self.client.auth.admin.sign_out(user_id)
+            await run_sync(self.client.auth.admin.sign_out, user_id)
             logger.info(LogMessages.USER_LOGGED_OUT)
             return True
         except Exception as e:
@@ -83,7 +86,7 @@ class AuthService:
 
     async def request_password_reset(self, email: str) -> bool:
         try:
-            self.client.auth.reset_password_for_email(email)
+            await run_sync(self.client.auth.reset_password_for_email, email)
             return True
         except Exception as e:
             logger.error(f"Password reset error: {e!s}")
@@ -1,10 +1,61 @@
+import asyncio
+import time
 from backend.services.memory.summarization_memory import SummarizationMemory
+from backend.services.memory.summarization_scheduler import get_summarization_scheduler
+from backend.services.llm.response_cache import get_response_cache
+from backend.services.llm.router import get_model_router
 from backend.core.openai_client import get_openai_client
+from backend.core.rate_limiter import RateLimitedError, get_rate_limit_governor
+from backend.core.metrics import LLM_COMPLETION_TOKENS, LLM_TOKENS_PER_SECOND, LLM_TTFT
 from backend.core.interfaces.base_llm_manager import BaseLLMManager
+from backend.core.interfaces.base_memory_manager import BaseMemoryStrategy
 from backend.core.messages import ErrorMessages
-from backend.core.config import DEFAULT_MODEL
+from backend.core.config import DEFAULT_MODEL, settings
+from backend.core.tokens import MESSAGE_OVERHEAD_TOKENS, estimate_tokens, get_context_window
+from backend.core.tracing import record, span
 from uuid import uuid4
-from typing import Union, List, Dict, AsyncGenerator
+from typing import Optional, Union, List, Dict, AsyncGenerator, Tuple
+
+# Appended to answers cut short by a client disconnect before they are stored
+INTERRUPTED_MARKER = "\n\n[interrupted]"
+
+STREAM_STYLE_INSTRUCTION = " Keep the output strictly factual and direct. Do not use conversational fillers, greetings, or sign-offs. Provide only the requested information."
+
+class CancellationStats:
+    """Counters for streams cancelled because the client disconnected."""
+
+    def __init__(self):
+        self.cancelled_streams = 0
+        self.generated_tokens_at_cancel = 0
+        self.max_tokens_unspent = 0
+
+    def record(self, generated: int, max_tokens: int) -> None:
+        self.cancelled_streams += 1
+        self.generated_tokens_at_cancel += generated
+        # Upper bound on what the model could still have produced, not a measured saving
+        self.max_tokens_unspent += max(max_tokens - generated, 0)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cancelled_streams": self.cancelled_streams,
+            "generated_tokens_at_cancel": self.generated_tokens_at_cancel,
+            "max_tokens_unspent": self.max_tokens_unspent,
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+class _FirstToken:
+    """A streamed completion that has produced its first content token."""
+
+    def __init__(self, model: str, stream, chunks, token: str, ttft: float):
+        self.model = model
+        self.stream = stream
+        self.chunks = chunks
+        self.token = token
+        self.ttft = ttft
+
 
 class OpenAIProvider(BaseLLMManager):
     """
@@ -19,7 +70,8 @@ class OpenAIProvider(BaseLLMManager):
         user_id: str = "",
         chat_model: str = DEFAULT_MODEL, 
         summary_model: str = DEFAULT_MODEL,
-        enable_db: bool = True
+        enable_db: bool = True,
+        memory: Optional[BaseMemoryStrategy] = None
         ):
 
         super().__init__(session_id or str(uuid4()), project_id, user_id)
@@ -27,8 +79,10 @@ class OpenAIProvider(BaseLLMManager):
         self.chat_model = chat_model
         self.ai_client = get_openai_client()
         self.summary_model = summary_model
-        # Initialize memory strategy
-        self.memory = SummarizationMemory(
+        # Which model served the last turn and how it was chosen
+        self.last_route: Optional[Dict] = None
+        # Initialize memory strategy; summarization unless one is supplied
+        self.memory = memory or SummarizationMemory(
             session_id=self.session_id,
             project_id=project_id,
             user_id=user_id,
@@ -40,11 +94,52 @@ class OpenAIProvider(BaseLLMManager):
 
     def get_provider_name(self) -> str:
         return f"({self.chat_model})"
+
+    def _build_messages(self, user_input: str, system_prompt: str) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Assemble the prompt within the chat model's context window.
+        Returns the messages and the max_tokens left for the completion.
+        """
+        window = get_context_window(self.chat_model)
+        prompt_tokens = (
+            estimate_tokens(system_prompt) + estimate_tokens(user_input) + 3 * MESSAGE_OVERHEAD_TOKENS
+        )
+        context_budget = min(
+            settings.MEMORY_CONTEXT_MAX_TOKENS,
+            window - prompt_tokens - settings.CHAT_MAX_TOKENS,
+        )
+        with span("context"):
+            context = self.memory.get_context(max_tokens=max(context_budget, 0), query=user_input)
+
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        if context and context != "No conversation history available.":
+            messages.append({
+                "role": "system",
+                "content": f"Context from previous conversation:\n{context}"
+            })
+            prompt_tokens += self.memory.get_context_tokens()
+
+        messages.append({"role": "user", "content": user_input})
+
+        max_tokens = max(min(settings.CHAT_MAX_TOKENS, window - prompt_tokens), 1)
+        return messages, max_tokens
     
 
-    async def chat(self, message: Union[str, List[str], List[Dict]], system_prompt: str = "") -> str:
+    async def chat(
+        self,
+        message: Union[str, List[str], List[Dict]],
+        system_prompt: str = "",
+        use_cache: bool = False,
+        allow_fallback: bool = False,
+    ) -> str:
         """
-        Main chat method with low latency for OpenAI
+        Main chat method with low latency for OpenAI.
+        With use_cache, an identical prompt is answered from the response cache.
+        With allow_fallback, a failing model is retried on the next healthy one.
         """
         
         user_input_str = ""
@@ -57,84 +152,250 @@ class OpenAIProvider(BaseLLMManager):
             else:
                 user_input_str = "\n".join(str(x) for x in message)
 
-        context = self.memory.get_context()
-        
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        if context and context != "No conversation history available.":
-            messages.append({
-                "role": "system", 
-                "content": f"Context from previous conversation:\n{context}"
-            })
-    
-        messages.append({"role": "user", "content": user_input_str})
-        
-        try:
-            response = await self.ai_client.chat.completions.create(
-                model=self.chat_model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            ai_response = response.choices[0].message.content
-            
-            if not ai_response:
-                ai_response = ""
-                raise ValueError(ErrorMessages.LLM_EMPTY_RESPONSE)
+        messages, max_tokens = self._build_messages(user_input_str, system_prompt)
+
+        if use_cache:
+            cached = get_response_cache().get(get_response_cache().make_key(self.project_id, self.chat_model, messages))
+            if cached is not None:
+                with span("persist"):
+                    await self.memory.add_message(user_input_str, cached)
+                return cached
+
+        router = get_model_router()
+        last_error: Exception = ValueError(ErrorMessages.LLM_MODEL_UNAVAILABLE)
+
+        for attempt, model in enumerate(router.candidates(self.chat_model, allow_fallback)):
+            try:
+                async with get_summarization_scheduler().interactive():
+                    with span("llm"):
+                        response = await get_rate_limit_governor().call(
+                            model,
+                            lambda: self.ai_client.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                temperature=0.7,
+                                max_tokens=max_tokens
+                            ),
+                        )
+                
+                ai_response = response.choices[0].message.content
+                
+                if not ai_response:
+                    raise ValueError(ErrorMessages.LLM_EMPTY_RESPONSE)
+
+            except RateLimitedError as e:
+                # Local backpressure, not a sign the model is unhealthy
+                last_error = e
+                continue
+            except Exception as e:
+                router.record_failure(model)
+                last_error = e
+                continue
+
+            router.record_success(model)
+            self._record_route(model, hedged=False, failovers=attempt)
 
-            await self.memory.add_message(user_input_str, ai_response)
+            with span("persist"):
+                await self.memory.add_message(user_input_str, ai_response)
+            if use_cache:
+                # Keyed by the model that answered, so a fallback's reply is never served as the requested model's
+                get_response_cache().set(get_response_cache().make_key(self.project_id, model, messages), ai_response)
 
             return ai_response
             
-        except Exception as e:
-            return f"{ErrorMessages.LLM_RESPONSE_FAILED}: {e}"
+        return f"{ErrorMessages.LLM_RESPONSE_FAILED}: {last_error}"
+
+
+    def _record_route(self, model: str, hedged: bool, failovers: int, ttft: Optional[float] = None) -> None:
+        self.last_route = {
+            "requested_model": self.chat_model,
+            "model": model,
+            "hedged": hedged,
+            "failovers": failovers,
+            "ttft": round(ttft, 3) if ttft is not None else None,
+        }
+        get_model_router().record_decision(self.session_id, self.last_route)
 
+    async def _open_stream(self, model: str, messages: List[Dict[str, str]], max_tokens: int) -> "_FirstToken":
+        """Start a streamed completion and wait for its first content token."""
+        started = 0.0
 
-    async def chat_stream(self, message: str, system_prompt: str = "") -> AsyncGenerator[str, None]:
+        async def create():
+            nonlocal started
+            # TTFT is measured from admission, so rate-limit queueing does not skew the hedge delay
+            started = time.monotonic()
+            return await self.ai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.5,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+        stream = await get_rate_limit_governor().call(model, create)
+        try:
+            chunks = stream.__aiter__()
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    token = chunk.choices[0].delta.content
+                    return _FirstToken(model, stream, chunks, token, time.monotonic() - started)
+        except BaseException:
+            await stream.close()
+            raise
+
+        await stream.close()
+        raise ValueError(ErrorMessages.LLM_EMPTY_RESPONSE)
+
+    async def _race_first_token(
+        self, candidates: List[str], messages: List[Dict[str, str]], max_tokens: int, hedge: bool
+    ) -> "_FirstToken":
+        """
+        Open a stream on the first candidate. With hedge, a fallback is started
+        if no token arrived within the router's hedge delay, and whichever
+        produces a token first wins. A failed attempt fails over to the next
+        candidate. Losing streams are closed.
+        """
+        router = get_model_router()
+        remaining = list(candidates)
+        tasks: Dict[asyncio.Task, str] = {}
+        hedged = False
+        failovers = 0
+        last_error: Exception = ValueError(ErrorMessages.LLM_MODEL_UNAVAILABLE)
+
+        def start(model: str) -> None:
+            tasks[asyncio.create_task(self._open_stream(model, messages, max_tokens))] = model
+
+        try:
+            if remaining:
+                start(remaining.pop(0))
+
+            while tasks:
+                timeout = None
+                if hedge and not hedged and remaining:
+                    timeout = router.hedge_delay(candidates[0])
+
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    start(remaining.pop(0))
+                    continue
+
+                for task in done:
+                    model = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        first = task.result()
+                        router.record_success(model, first.ttft)
+                        LLM_TTFT.observe(first.ttft, model=model)
+                        record("ttft", first.ttft)
+                        self._record_route(model, hedged=hedged, failovers=failovers, ttft=first.ttft)
+                        return first
+                    if not isinstance(error, RateLimitedError):
+                        router.record_failure(model)
+                    last_error = error  # type: ignore
+                    failovers += 1
+
+                if not tasks and remaining and hedge:
+                    start(remaining.pop(0))
+
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, _FirstToken):
+                    await result.stream.close()
+
+
+    async def chat_stream(
+        self,
+        message: str,
+        system_prompt: str = "",
+        use_cache: bool = False,
+        allow_fallback: bool = False,
+    ) -> AsyncGenerator[str, None]:
         """
         Stream chat response token by token for real-time display.
+        A cached answer is replayed in one piece instead of re-generated.
+        With allow_fallback, a slow first token is hedged on a fallback model.
         """
-        context = self.memory.get_context()
-        
-        messages = []
-        
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt+ " Keep the output strictly factual and direct. Do not use conversational fillers, greetings, or sign-offs. Provide only the requested information."})
+            system_prompt += STREAM_STYLE_INSTRUCTION
 
-        if context and context != "No conversation history available.":
-            messages.append({
-                "role": "system", 
-                "content": f"Context from previous conversation:\n{context}"
-            })
-        
-        messages.append({"role": "user", "content": message})
+        messages, max_tokens = self._build_messages(message, system_prompt)
+
+        if use_cache:
+            cached = get_response_cache().get(get_response_cache().make_key(self.project_id, self.chat_model, messages))
+            if cached is not None:
+                with span("persist"):
+                    await self.memory.add_message(message, cached)
+                yield cached
+                return
         
-        full_response = ""
+        # Collected as parts and joined once, avoiding quadratic string building
+        response_parts: List[str] = []
+        stream = None
+        interrupted = False
+        # Set before the write starts, so a cancel landing mid-write cannot save the turn twice
+        persisted = False
+        router = get_model_router()
         
         try:
-            stream = await self.ai_client.chat.completions.create(
-                model=self.chat_model,
-                messages=messages,
-                temperature=0.5,
-                max_tokens=1000,
-                stream=True
-            )
-            
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    token = chunk.choices[0].delta.content
-                    full_response += token
-                    yield token
+            async with get_summarization_scheduler().interactive():
+                first = await self._race_first_token(
+                    router.candidates(self.chat_model, allow_fallback),
+                    messages,
+                    max_tokens,
+                    hedge=allow_fallback,
+                )
+                stream = first.stream
+                first_token_at = time.monotonic()
+                response_parts.append(first.token)
+                yield first.token
+
+                try:
+                    async for chunk in first.chunks:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            token = chunk.choices[0].delta.content
+                            response_parts.append(token)
+                            yield token
+                except Exception:
+                    router.record_failure(first.model)
+                    raise
             
-            if full_response:
-                await self.memory.add_message(message, full_response)
-                
+            if response_parts:
+                ai_response = "".join(response_parts)
+                generated = estimate_tokens(ai_response)
+                LLM_COMPLETION_TOKENS.inc(generated, model=first.model)
+                elapsed = time.monotonic() - first_token_at
+                record("generate", elapsed)
+                if elapsed > 0:
+                    LLM_TOKENS_PER_SECOND.observe(generated / elapsed, model=first.model)
+
+                persisted = True
+                with span("persist"):
+                    await self.memory.add_message(message, ai_response)
+                if use_cache:
+                    get_response_cache().set(get_response_cache().make_key(self.project_id, first.model, messages), ai_response)
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-answer
+            interrupted = True
+            raise
         except Exception as e:
             yield f"{ErrorMessages.LLM_RESPONSE_FAILED}: {e}"
+        finally:
+            if stream is not None:
+                # Drops the upstream HTTP response so generation stops being billed
+                await stream.close()
+            if interrupted:
+                partial = "".join(response_parts)
+                cancellation_stats.record(estimate_tokens(partial), max_tokens)
+                # Nothing reached the client before it left; there is no turn to keep
+                if partial and not persisted:
+                    persisted = True
+                    await self.memory.add_message(message, f"{partial}{INTERRUPTED_MARKER}")
     
 
     def reset_conversation(self):
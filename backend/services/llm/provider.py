@@ -1,6 +1,8 @@
 from backend.core.interfaces.base_llm_manager import BaseLLMManager
 from backend.core.config import settings, DEFAULT_MODEL
 from backend.services.llm.openai_service import OpenAIProvider
+from backend.services.memory.retrieval_memory import RetrievalMemory
+from backend.models.project import MemoryStrategy
 
 
 def get_llm_provider(
@@ -9,10 +11,12 @@ def get_llm_provider(
     project_id: str, 
     user_id: str,
     summary_model: str,
-    enable_db: bool = True
+    enable_db: bool = True,
+    memory_strategy: str = MemoryStrategy.SUMMARIZATION.value
 ) -> BaseLLMManager:
     """
-    Factory: Decides which AI Provider class to use based on the model name.
+    Factory: Decides which AI Provider class to use based on the model name,
+    and which memory strategy it gets from the project's setting.
     """
     
     # Ensure we never send an empty model to the provider
@@ -26,11 +30,21 @@ def get_llm_provider(
     if not provider:
          raise ValueError(f"Unknown model: {chat_model}. Available models: {settings.FREE_MODELS}")
     
+    memory = None
+    if memory_strategy == MemoryStrategy.RETRIEVAL.value:
+        memory = RetrievalMemory(
+            session_id=session_id,
+            project_id=project_id,
+            user_id=user_id,
+            enable_db_persistence=enable_db
+        )
+
     return provider(
             session_id=session_id,
             project_id=project_id,
             user_id=user_id,
             summary_model=summary_model,
             chat_model=chat_model,
-            enable_db=enable_db
+            enable_db=enable_db,
+            memory=memory
         )  
\ No newline at end of file
@@ -0,0 +1,66 @@
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of chat completions for projects that opt in.
+
+    Keys are (project_id, digest) where the digest covers the model and the
+    fully built prompt (system prompt, memory context, user message) with
+    whitespace normalized, so the same question in the same conversation
+    state maps to the same answer. Replies are stored under the model that
+    produced them, which after a router fallback is not the one requested.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: float = settings.RESPONSE_CACHE_TTL,
+    ):
+        self._cache: TTLCache[str] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def make_key(project_id: str, model: str, messages: List[Dict[str, str]]) -> tuple:
+        digest = hashlib.sha256()
+        digest.update(model.encode())
+        for message in messages:
+            digest.update(b"\x1e")
+            digest.update(message["role"].encode())
+            digest.update(b"\x1f")
+            digest.update(_normalize(message["content"]).encode())
+        return (project_id, digest.hexdigest())
+
+    def get(self, key: tuple) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: tuple, response: str) -> None:
+        self._cache.set(key, response)
+
+    def invalidate_project(self, project_id: str) -> int:
+        return self._cache.invalidate_where(lambda key: key[0] == project_id)  # type: ignore
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache."""
+    global _response_cache
+
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
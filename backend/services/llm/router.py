@@ -0,0 +1,166 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHealth:
+    """Rolling time-to-first-token samples and a circuit breaker for one model."""
+
+    def __init__(self, window: int):
+        self.ttft: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.times_opened = 0
+
+    def is_open(self, now: float) -> bool:
+        # Once the cooldown has passed, requests flow again (half-open) and
+        # the first failure re-opens the circuit
+        return now < self.open_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.ttft:
+            return None
+        ordered = sorted(self.ttft)
+        index = min(int(len(ordered) * q / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class ModelRouter:
+    """
+    Picks which model serves a turn and when to hedge.
+
+    Each model has a rolling window of TTFT samples and outcomes. A model
+    whose consecutive failures or windowed error rate cross the thresholds
+    has its circuit opened for circuit_cooldown seconds and is skipped.
+    hedge_delay is the model's TTFT percentile, clamped, after which the
+    caller may race a fallback model for the first token.
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[str]] = None,
+        window: int = settings.ROUTER_WINDOW,
+        failure_threshold: int = settings.ROUTER_FAILURE_THRESHOLD,
+        error_rate_threshold: float = settings.ROUTER_ERROR_RATE_THRESHOLD,
+        circuit_cooldown: float = settings.ROUTER_CIRCUIT_COOLDOWN,
+        hedge_percentile: float = settings.ROUTER_HEDGE_PERCENTILE,
+        hedge_min_delay: float = settings.ROUTER_HEDGE_MIN_DELAY,
+        hedge_max_delay: float = settings.ROUTER_HEDGE_MAX_DELAY,
+    ):
+        self.models = list(models if models is not None else settings.FREE_MODELS)
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.circuit_cooldown = circuit_cooldown
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+
+        self._health: Dict[str, ModelHealth] = {}
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=settings.ROUTER_DECISION_LOG_SIZE)
+
+    def _get(self, model: str) -> ModelHealth:
+        health = self._health.get(model)
+        if health is None:
+            health = ModelHealth(self.window)
+            self._health[model] = health
+        return health
+
+    def candidates(self, preferred: str, allow_fallback: bool) -> List[str]:
+        """
+        Models to try for a turn, in order. Open circuits are skipped; with
+        allow_fallback the healthy alternatives follow, fastest first.
+        """
+        now = time.monotonic()
+        ordered = [preferred] if not self._get(preferred).is_open(now) else []
+        if not allow_fallback:
+            return ordered
+
+        fallbacks = [
+            model for model in self.models
+            if model != preferred and not self._get(model).is_open(now)
+        ]
+        fallbacks.sort(key=lambda model: self._get(model).percentile(50) or self.hedge_max_delay)
+        return ordered + fallbacks
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for the first token before racing a fallback."""
+        health = self._get(model)
+        if len(health.ttft) < settings.ROUTER_MIN_SAMPLES:
+            return self.hedge_max_delay
+        delay = health.percentile(self.hedge_percentile) or self.hedge_max_delay
+        return min(max(delay, self.hedge_min_delay), self.hedge_max_delay)
+
+    def record_success(self, model: str, ttft: Optional[float] = None) -> None:
+        health = self._get(model)
+        health.outcomes.append(True)
+        health.consecutive_failures = 0
+        if health.open_until and not health.is_open(time.monotonic()):
+            # Trial request after the cooldown went through: close the circuit
+            health.open_until = 0.0
+        if ttft is not None:
+            health.ttft.append(ttft)
+
+    def record_failure(self, model: str) -> None:
+        health = self._get(model)
+        health.outcomes.append(False)
+        health.consecutive_failures += 1
+
+        now = time.monotonic()
+        tripped = (
+            health.consecutive_failures >= self.failure_threshold
+            or (
+                len(health.outcomes) >= settings.ROUTER_MIN_SAMPLES
+                and health.error_rate() >= self.error_rate_threshold
+            )
+        )
+        # A failure right after the cooldown (half-open) re-opens immediately
+        half_open = health.open_until and now >= health.open_until
+        if tripped or half_open:
+            health.open_until = now + self.circuit_cooldown
+            health.times_opened += 1
+            health.consecutive_failures = 0
+            health.outcomes.clear()
+            logger.warning(f"Circuit opened for {model} for {self.circuit_cooldown}s")
+
+    def record_decision(self, session_id: str, decision: Dict[str, Any]) -> None:
+        self.decisions.append({"session_id": session_id, **decision})
+        logger.info(f"Routing {session_id}: {decision}")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            model: {
+                "circuit_open": health.is_open(now),
+                "times_opened": health.times_opened,
+                "error_rate": health.error_rate(),
+                "ttft_p50": health.percentile(50),
+                "ttft_p90": health.percentile(90),
+                "hedge_delay": self.hedge_delay(model),
+                "samples": len(health.ttft),
+            }
+            for model, health in self._health.items()
+        }
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get the shared model router."""
+    global _router
+
+    if _router is None:
+        _router = ModelRouter()
+    return _router
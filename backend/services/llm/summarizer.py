@@ -1,6 +1,6 @@
 from backend.core.interfaces.base_summarizer_memory import BaseSummarizer
 from backend.core.openai_client import get_openai_client
-from backend.core.messages import ErrorMessages
+from backend.core.rate_limiter import get_rate_limit_governor
 from backend.core.config import DEFAULT_MODEL
 
 
@@ -20,20 +20,19 @@ class OpenRouterSummarizer(BaseSummarizer):
         
         messages.append({"role": "user", "content": prompt})
         
-        try:
-            response = await self.client.chat.completions.create(
+        # Errors reach the caller, which decides whether the summary is retried
+        response = await get_rate_limit_governor().call(
+            self.model,
+            lambda: self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.5,
                 max_tokens=500
-            )
-            
-            result = response.choices[0].message.content
-            return result.strip() if result else ""
-            
-        except Exception as e:
-            print(f"{ErrorMessages.LLM_RESPONSE_FAILED}: {e}")
-            return ""
+            ),
+        )
+
+        result = response.choices[0].message.content
+        return result.strip() if result else ""
 
 
 def get_summarizer(model: str = DEFAULT_MODEL) -> BaseSummarizer:
@@ -0,0 +1,99 @@
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from backend.core.tokens import CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+SUMMARY_HEADER = "## Previous Conversation Summary:\n"
+RECENT_HEADER = "## Recent Messages:\n"
+SECTION_SEPARATOR = "\n\n"
+
+
+class ContextWindow:
+    """
+    Incrementally maintained rendering of a summary plus recent messages.
+
+    Each message is formatted and token-counted once when appended. Rendering
+    picks the newest messages that fit the token budget, and the result is
+    cached until the window changes or a different budget is asked for.
+    """
+
+    def __init__(self):
+        self._summary = ""
+        self._summary_tokens = 0
+        self._entries: Deque[Tuple[str, int]] = deque()
+        self._entry_tokens = 0
+
+        self._version = 0
+        self._cache_key: Optional[Tuple[int, Optional[int]]] = None
+        self._cache: Tuple[str, int] = ("", 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of the full, untrimmed window."""
+        return self._summary_tokens + self._entry_tokens
+
+    def set_summary(self, summary: str) -> None:
+        self._summary = summary
+        self._summary_tokens = estimate_tokens(SUMMARY_HEADER + summary) if summary else 0
+        self._version += 1
+
+    def append(self, role: str, content: str) -> None:
+        line = f"{role.capitalize()}: {content}"
+        tokens = estimate_tokens(line) + MESSAGE_OVERHEAD_TOKENS
+        self._entries.append((line, tokens))
+        self._entry_tokens += tokens
+        self._version += 1
+
+    def drop_oldest(self, count: int) -> None:
+        for _ in range(min(count, len(self._entries))):
+            _, tokens = self._entries.popleft()
+            self._entry_tokens -= tokens
+        self._version += 1
+
+    def clear(self) -> None:
+        self._summary = ""
+        self._summary_tokens = 0
+        self._entries.clear()
+        self._entry_tokens = 0
+        self._version += 1
+
+    def render(self, max_tokens: Optional[int] = None) -> Tuple[str, int]:
+        """Return (text, token_count), trimming oldest content to fit max_tokens."""
+        key = (self._version, max_tokens)
+        if key == self._cache_key:
+            return self._cache
+
+        budget = max_tokens if max_tokens is not None else self.total_tokens
+        parts = []
+        used = 0
+
+        if self._summary:
+            summary = self._summary
+            if self._summary_tokens > budget:
+                # Summary alone is over budget: keep its beginning
+                summary = summary[:max(budget * CHARS_PER_TOKEN - len(SUMMARY_HEADER), 0)]
+            if summary:
+                parts.append(SUMMARY_HEADER + summary)
+                used += min(self._summary_tokens, budget)
+
+        header_tokens = estimate_tokens(RECENT_HEADER)
+        kept = []
+        remaining = budget - used - header_tokens
+        for line, tokens in reversed(self._entries):
+            if tokens > remaining:
+                break
+            kept.append(line)
+            remaining -= tokens
+            used += tokens
+
+        if kept:
+            kept.reverse()
+            parts.append(RECENT_HEADER + "\n".join(kept))
+            used += header_tokens
+
+        self._cache_key = key
+        self._cache = (SECTION_SEPARATOR.join(parts), used)
+        return self._cache
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.core.config import settings
+from backend.core.messages import ErrorMessages
+from backend.core.interfaces.base_storage import (
+    BaseMessageRepository,
+    BaseSessionRepository,
+    BaseSnapshotRepository,
+)
+from backend.repositories.storage import (
+    get_message_repository,
+    get_session_repository,
+    get_snapshot_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+# (message row or None, session snapshot or None, completion)
+_Item = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], asyncio.Future]
+
+
+class MessageWriter:
+    """
+    Process-wide write-behind queue for the messages table.
+
+    Rows from every session are coalesced into bulk inserts, flushed when a
+    batch is full or the flush interval elapses. A single consumer keeps rows
+    in enqueue order, so per-session ordering is preserved. When the queue is
+    full, enqueue() waits, pushing backpressure onto the chat turn.
+
+    A failed batch is retried split by session, so one bad session (e.g.
+    deleted while its turn was queued) cannot take the others down with it.
+
+    Session snapshots ride along: after a batch's rows are inserted, only the
+    newest snapshot of each session in the batch is upserted, so a busy
+    session costs one snapshot write per batch rather than per message.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[BaseMessageRepository] = None,
+        snapshots: Optional[BaseSnapshotRepository] = None,
+        sessions: Optional[BaseSessionRepository] = None,
+        max_batch_size: int = settings.MESSAGE_WRITER_BATCH_SIZE,
+        flush_interval: float = settings.MESSAGE_WRITER_FLUSH_INTERVAL,
+        max_queue_size: int = settings.MESSAGE_WRITER_QUEUE_SIZE,
+    ):
+        self.repository = repository or get_message_repository()
+        self.snapshots = snapshots or get_snapshot_repository()
+        self.sessions = sessions or get_session_repository()
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue[_Item]] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.rows_dropped = 0
+        self.batches_written = 0
+        self.batches_split = 0
+        self.snapshots_written = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the worker."""
+        if not self.running or self._queue is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()  # type: ignore
+        try:
+            await self._worker  # type: ignore
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def enqueue(
+        self,
+        row: Optional[Dict[str, Any]],
+        snapshot: Optional[Dict[str, Any]] = None,
+    ) -> asyncio.Future:
+        """
+        Queue a row for insertion and/or a session snapshot for upsert.
+        Returns a future resolved once the batch has been written (True) or
+        has failed (False).
+        """
+        self.start()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, snapshot, future))  # type: ignore
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "rows_dropped": self.rows_dropped,
+            "batches_written": self.batches_written,
+            "batches_split": self.batches_split,
+            "snapshots_written": self.snapshots_written,
+        }
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+
+        while True:
+            batch: List[_Item] = [await queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            except Exception:
+                logger.exception(ErrorMessages.MEMORY_SAVE_FAILED)
+            finally:
+                for _, _, future in batch:
+                    # Left unresolved only if _write itself broke; flush() must not wait forever
+                    if not future.done():
+                        future.set_result(False)
+                    queue.task_done()
+
+    async def _write(self, batch: List[_Item]) -> None:
+        rows = [row for row, _, _ in batch if row is not None]
+        failed: Set[str] = set()
+        try:
+            await self.repository.insert_many(rows)
+            self.rows_written += len(rows)
+            self.batches_written += 1
+        except Exception as e:
+            logger.warning(f"{ErrorMessages.MEMORY_SAVE_FAILED}, retrying per session: {e}")
+            self.batches_split += 1
+            failed = await self._write_per_session(self.repository.insert_many, rows, count_rows=True)
+
+        # Later snapshots of a session replace earlier ones. A snapshot must
+        # not reference turns whose rows failed to land.
+        snapshots = {
+            snapshot["session_id"]: snapshot
+            for _, snapshot, _ in batch
+            if snapshot is not None and snapshot["session_id"] not in failed
+        }
+        if snapshots:
+            try:
+                await self.snapshots.upsert_many(list(snapshots.values()))
+                self.snapshots_written += len(snapshots)
+            except Exception as e:
+                logger.warning(f"{ErrorMessages.MEMORY_SAVE_FAILED}, retrying per session: {e}")
+                failed |= await self._write_per_session(self.snapshots.upsert_many, list(snapshots.values()))
+
+        for row, snapshot, future in batch:
+            if not future.done():
+                session_id = (row or snapshot or {}).get("session_id")
+                future.set_result(session_id not in failed)
+
+    async def _write_per_session(
+        self,
+        write: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        rows: List[Dict[str, Any]],
+        count_rows: bool = False,
+    ) -> Set[str]:
+        """Write rows one session at a time; returns the sessions whose write failed."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(row["session_id"], []).append(row)
+
+        failed: Set[str] = set()
+        for session_id, group in groups.items():
+            try:
+                await write(group)
+            except Exception as e:
+                failed.add(session_id)
+                if await self._session_exists(session_id):
+                    if count_rows:
+                        self.rows_failed += len(group)
+                    logger.error(f"{ErrorMessages.MEMORY_SAVE_FAILED}: {e}")
+                elif count_rows:
+                    # Session was deleted while its turn was queued; nothing to keep
+                    self.rows_dropped += len(group)
+                continue
+
+            if count_rows:
+                self.rows_written += len(group)
+            else:
+                self.snapshots_written += len(group)
+        return failed
+
+    async def _session_exists(self, session_id: str) -> bool:
+        try:
+            return await self.sessions.get(session_id) is not None
+        except Exception:
+            # Unknown, so report the failure rather than silently dropping rows
+            return True
+
+
+_message_writer: Optional[MessageWriter] = None
+
+
+def get_message_writer() -> MessageWriter:
+    """Get the shared message writer."""
+    global _message_writer
+
+    if _message_writer is None:
+        _message_writer = MessageWriter()
+    return _message_writer
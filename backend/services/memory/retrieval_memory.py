@@ -0,0 +1,341 @@
+import asyncio
+import logging
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.repositories.storage import get_message_repository
+from backend.services.memory.message_writer import get_message_writer
+from backend.services.memory.session_state import get_session_state_store
+from backend.core.interfaces.base_memory_manager import BaseMemoryStrategy
+from backend.core.messages import ErrorMessages
+from backend.core.config import settings
+from backend.core.tokens import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+RECENT_HEADER = "## Recent Messages:\n"
+RELEVANT_HEADER = "## Relevant Earlier Messages:\n"
+SECTION_SEPARATOR = "\n\n"
+
+_WORD = re.compile(r"\w+")
+
+
+class HashedNgramEmbedder:
+    """
+    Dependency-light text embedding: word unigrams and character trigrams are
+    hashed into a fixed number of signed buckets and L2-normalized, so cosine
+    similarity is a plain dot product.
+    """
+
+    def __init__(self, dim: int = settings.RETRIEVAL_EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[int]:
+        features = []
+        for word in _WORD.findall(text.lower()):
+            features.append(zlib.crc32(word.encode()))
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                features.append(zlib.crc32(b"3" + padded[i:i + 3].encode()))
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text)
+        if not features:
+            return vector
+
+        hashes = np.asarray(features, dtype=np.uint32)
+        # Low bits pick the bucket, the top bit the sign, to spread collisions
+        buckets = hashes % self.dim
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets, signs)
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed(text) for text in texts])
+
+
+class RetrievalMemory(BaseMemoryStrategy):
+    """
+    Memory that keeps every turn of a session and retrieves the relevant ones.
+
+    The last few turns are always sent verbatim. Older turns live in a NumPy
+    matrix of hashed n-gram embeddings and the top-k most similar to the
+    current message are added to the context. New turns are embedded in a
+    worker thread after the reply has been sent, so indexing never sits on the
+    request path.
+
+    Sequence numbers are claimed through the shared session state store, so
+    workers serving the same session never hand out the same seq; turns
+    another worker served are read back from the database on sync().
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        project_id: str,
+        user_id: str,
+        top_k: int = settings.RETRIEVAL_TOP_K,
+        recent_turns: int = settings.RETRIEVAL_RECENT_TURNS,
+        min_score: float = settings.RETRIEVAL_MIN_SCORE,
+        enable_db_persistence: bool = True
+    ):
+        super().__init__()
+        self.session_id = session_id
+        self.project_id = project_id
+        self.user_id = user_id
+        self.top_k = top_k
+        self.recent_turns = recent_turns
+        self.min_score = min_score
+        self.enable_db_persistence = enable_db_persistence
+
+        self.db = get_message_repository() if enable_db_persistence else None
+        self.embedder = HashedNgramEmbedder()
+
+        # Every turn as (user, assistant); row i of the matrix embeds turns[i]
+        self.turns: List[Tuple[str, str]] = []
+        self._matrix = np.zeros((16, self.embedder.dim), dtype=np.float32)
+        self._indexed = 0
+        # Turns whose embedding failed; their rows stay zero and never match
+        self._unindexable = 0
+        self._index_task: Optional[asyncio.Task] = None
+        # Bumped by clear() so an in-flight embedding batch is discarded
+        self._generation = 0
+
+        # Next seq to claim (shared across workers through state_store), the
+        # highest seq read back from storage, and user seqs of turns this
+        # worker added above it, so reading back never duplicates them
+        self.state_store = get_session_state_store()
+        self._next_seq = 1
+        self._read_seq = 0
+        self._own_seqs: Set[int] = set()
+        self._context_tokens = 0
+        self._last_write: Optional[asyncio.Future] = None
+
+    async def load_memory(self):
+        if not self.enable_db_persistence or not self.db:
+            return
+
+        try:
+            # Every past turn is indexed, read a batch at a time
+            rows = [
+                row async for row in self.db.iter_all(
+                    self.session_id, settings.RETRIEVAL_HYDRATE_BATCH_SIZE
+                )
+            ]
+            self._append_rows(rows)
+            await self._index_pending()
+
+        except Exception as e:
+            logger.error(f"{ErrorMessages.MEMORY_LOAD_FAILED}: {e}")
+
+    def _append_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Pair user/assistant rows, oldest first, into turns, skipping turns this worker added."""
+        pending_user = None
+        for msg in rows:
+            if msg['role'] == "user":
+                pending_user = None if msg['seq'] in self._own_seqs else msg['content']
+            elif pending_user is not None:
+                self.turns.append((pending_user, msg['content']))
+                pending_user = None
+        if rows:
+            self._read_seq = max(self._read_seq, rows[-1]['seq'])
+            self._next_seq = max(self._next_seq, self._read_seq + 1)
+            self._own_seqs = {seq for seq in self._own_seqs if seq > self._read_seq}
+
+    async def sync(self) -> None:
+        """Read back turns other workers stored since this one last looked."""
+        if not self.state_store.shared or not self.enable_db_persistence or not self.db:
+            return
+        try:
+            state, _ = await self.state_store.get(self.session_id)
+            last_seq = int(state.get("next_seq", 1)) - 1 if state else 0
+            if last_seq > self._read_seq:
+                rows = await self.db.after_seq(self.session_id, self._read_seq, limit=last_seq - self._read_seq)
+                self._append_rows(list(reversed(rows)))
+        except Exception as e:
+            logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
+
+    async def _claim_seqs(self, count: int) -> int:
+        """
+        Claim count consecutive seqs and return the first. With a shared store
+        the claim is a compare-and-set on next_seq; if the store is
+        unreachable the local counter is used and the session runs locally.
+        """
+        if self.state_store.shared:
+            try:
+                for _ in range(max(settings.SESSION_STATE_MAX_RETRIES, 1)):
+                    state, version = await self.state_store.get(self.session_id)
+                    if state is not None:
+                        self._next_seq = max(self._next_seq, int(state.get("next_seq", 1)))
+                    # Fixed before the await: another turn of this session may move _next_seq meanwhile
+                    seq = self._next_seq
+                    if await self.state_store.compare_and_set(self.session_id, {"next_seq": seq + count}, version) is not None:
+                        self._next_seq = max(self._next_seq, seq + count)
+                        return seq
+                logger.warning(f"{ErrorMessages.SESSION_STATE_CONFLICT}: {self.session_id}")
+            except Exception as e:
+                logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
+
+        seq = self._next_seq
+        self._next_seq += count
+        return seq
+
+    async def _save_to_db_async(self, role: str, content: str, seq: int) -> None:
+        if not self.enable_db_persistence or not self.db:
+            return
+
+        data = {
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+            "seq": seq,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        self._last_write = await get_message_writer().enqueue(data)
+
+    async def add_message(self, user_input: str, ai_response: str):
+        user_seq = await self._claim_seqs(2)
+        if self.state_store.shared:
+            self._own_seqs.add(user_seq)
+        self.turns.append((user_input, ai_response))
+
+        await self._save_to_db_async("user", user_input, user_seq)
+        await self._save_to_db_async("assistant", ai_response, user_seq + 1)
+
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self._index_pending())
+
+    async def _index_pending(self) -> None:
+        """Embed turns added since the last run; loops until caught up."""
+        while self._indexed < len(self.turns):
+            start, end = self._indexed, len(self.turns)
+            generation = self._generation
+            texts = [f"{user}\n{assistant}" for user, assistant in self.turns[start:end]]
+            try:
+                vectors = await asyncio.to_thread(self.embedder.embed_many, texts)
+            except Exception as e:
+                logger.error(f"{ErrorMessages.MEMORY_SAVE_FAILED}: embedding turns {start}-{end}: {e}")
+                # One at a time, so a turn that cannot be embedded does not hold up the rest
+                vectors = await asyncio.to_thread(self._embed_each, texts)
+
+            if generation != self._generation:
+                return
+            self._ensure_capacity(end)
+            self._matrix[start:end] = vectors
+            self._indexed = end
+
+    def _embed_each(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.embedder.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            try:
+                vectors[i] = self.embedder.embed(text)
+            except Exception as e:
+                self._unindexable += 1
+                logger.error(f"{ErrorMessages.MEMORY_SAVE_FAILED}: embedding a turn: {e}")
+        return vectors
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        grown = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        grown[:self._indexed] = self._matrix[:self._indexed]
+        self._matrix = grown
+
+    def _retrieve(self, query: str, limit: int) -> List[int]:
+        """Indices of the indexed turns most similar to query, best first."""
+        if limit <= 0 or not query:
+            return []
+
+        scores = self._matrix[:limit] @ self.embedder.embed(query)
+        k = min(self.top_k, limit)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [int(i) for i in top if scores[i] >= self.min_score]
+
+    @staticmethod
+    def _format_turn(turn: Tuple[str, str]) -> str:
+        return f"User: {turn[0]}\nAssistant: {turn[1]}"
+
+    def get_context(self, max_tokens: Optional[int] = None, query: Optional[str] = None) -> str:
+        budget = max_tokens if max_tokens is not None else float("inf")
+        used = 0
+
+        recent_start = max(len(self.turns) - self.recent_turns, 0)
+        recent: List[str] = []
+        remaining = budget - estimate_tokens(RECENT_HEADER)
+        for turn in reversed(self.turns[recent_start:]):
+            text = self._format_turn(turn)
+            tokens = estimate_tokens(text) + 2 * MESSAGE_OVERHEAD_TOKENS
+            if tokens > remaining:
+                break
+            recent.append(text)
+            remaining -= tokens
+            used += tokens
+        recent.reverse()
+
+        # Only turns older than the verbatim window are worth retrieving
+        relevant: List[str] = []
+        remaining -= estimate_tokens(RELEVANT_HEADER)
+        for i in sorted(self._retrieve(query or "", min(self._indexed, recent_start))):
+            text = self._format_turn(self.turns[i])
+            tokens = estimate_tokens(text) + 2 * MESSAGE_OVERHEAD_TOKENS
+            if tokens > remaining:
+                continue
+            relevant.append(text)
+            remaining -= tokens
+            used += tokens
+
+        parts = []
+        if relevant:
+            parts.append(RELEVANT_HEADER + "\n".join(relevant))
+            used += estimate_tokens(RELEVANT_HEADER)
+        if recent:
+            parts.append(RECENT_HEADER + "\n".join(recent))
+            used += estimate_tokens(RECENT_HEADER)
+
+        self._context_tokens = used if parts else 0
+        if not parts:
+            return "No conversation history available."
+        return SECTION_SEPARATOR.join(parts)
+
+    def get_context_tokens(self) -> int:
+        return self._context_tokens
+
+    def clear(self) -> None:
+        self.turns = []
+        self._indexed = 0
+        self._generation += 1
+        self._context_tokens = 0
+
+    async def flush(self) -> bool:
+        if self._index_task is not None:
+            await self._index_task
+        if self._last_write is not None:
+            return await self._last_write
+        return True
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        text_bytes = sum(len(user) + len(assistant) for user, assistant in self.turns)
+        return {
+            "strategy_type": self.__class__.__name__,
+            "memory_size": self._matrix.nbytes + text_bytes,
+            "turns": len(self.turns),
+            "indexed_turns": self._indexed,
+            "unindexable_turns": self._unindexable,
+            "pending_writes": self._last_write is not None and not self._last_write.done(),
+        }
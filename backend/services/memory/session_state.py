@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.interfaces.base_session_state import BaseSessionStateStore
+
+logger = logging.getLogger(__name__)
+
+# Line limit for the TCP protocol; a state carries at most a summary and a short buffer
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+class LocalSessionStateStore(BaseSessionStateStore):
+    """
+    Store for a single worker. The session cache already holds the only copy
+    of each session's state, so nothing is kept here and every write wins.
+    """
+
+    shared = False
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        return None, 0
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        return expected_version + 1
+
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class InMemorySessionStateStore(BaseSessionStateStore):
+    """
+    In-process store, as held by the session state server. States are kept
+    JSON-encoded so callers never share mutable objects, matching what a
+    networked store returns. Idle entries expire after ttl; a worker that
+    finds its state gone republishes it.
+    """
+
+    def __init__(self, maxsize: int = settings.SESSION_STATE_MAX_ENTRIES, ttl: float = settings.SESSION_STATE_TTL):
+        self._entries: TTLCache[Tuple[int, str]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # One counter for all keys, starting from the clock, so a version is
+        # never handed out twice: not after expiry, delete or a restart
+        self._last_version = time.time_ns() // 1000
+
+        self.writes = 0
+        self.conflicts = 0
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, 0
+        version, encoded = entry
+        return json.loads(encoded), version
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        # No await between the check and the write, so this is atomic on the event loop
+        entry = self._entries.get(key)
+        current = entry[0] if entry else 0
+        if current != expected_version:
+            self.conflicts += 1
+            return None
+
+        self._last_version += 1
+        version = self._last_version
+        self._entries.set(key, (version, json.dumps(state, separators=(",", ":"))))
+        self.writes += 1
+        return version
+
+    async def delete(self, key: str) -> None:
+        self._entries.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._entries.stats(),
+            "writes": self.writes,
+            "conflicts": self.conflicts,
+        }
+
+
+class TCPSessionStateStore(BaseSessionStateStore):
+    """
+    Client for a session state server (see serve()), speaking one JSON
+    object per line. Connections are pooled and reused; a connection that
+    fails mid-request is dropped and the error raised to the caller.
+    """
+
+    def __init__(self, address: str = settings.SESSION_STATE_ADDRESS, pool_size: int = settings.SESSION_STATE_POOL_SIZE):
+        host, _, port = address.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+        self.requests = 0
+        self.errors = 0
+
+    async def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._slots:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE_BYTES)
+
+            self.requests += 1
+            try:
+                writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Session state server closed the connection")
+            except BaseException:
+                self.errors += 1
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"Session state server error: {response['error']}")
+        return response
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        response = await self._call({"op": "get", "key": key})
+        return response.get("state"), response.get("version", 0)
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        response = await self._call({"op": "cas", "key": key, "state": state, "version": expected_version})
+        return response.get("version")
+
+    async def delete(self, key: str) -> None:
+        await self._call({"op": "delete", "key": key})
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "idle_connections": len(self._idle),
+        }
+
+
+async def _dispatch(store: BaseSessionStateStore, request: Dict[str, Any]) -> Dict[str, Any]:
+    op = request.get("op")
+    key = str(request.get("key", ""))
+    if op == "get":
+        state, version = await store.get(key)
+        return {"state": state, "version": version}
+    if op == "cas":
+        return {"version": await store.compare_and_set(key, request["state"], int(request["version"]))}
+    if op == "delete":
+        await store.delete(key)
+        return {}
+    if op == "stats":
+        return {"stats": store.stats()}
+    return {"error": f"unknown op {op!r}"}
+
+
+async def serve(host: str, port: int, store: Optional[BaseSessionStateStore] = None) -> None:
+    """Serve an in-memory store over TCP to every worker of the deployment."""
+    store = store or InMemorySessionStateStore()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await _dispatch(store, json.loads(line))
+                except Exception as e:
+                    response = {"error": str(e)}
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, limit=MAX_LINE_BYTES)
+    async with server:
+        await server.serve_forever()
+
+
+_session_state_store: Optional[BaseSessionStateStore] = None
+
+
+def get_session_state_store() -> BaseSessionStateStore:
+    """Get the session state store for the configured backend."""
+    global _session_state_store
+
+    if _session_state_store is None:
+        backend = settings.SESSION_STATE_BACKEND.lower()
+        if backend == "local":
+            _session_state_store = LocalSessionStateStore()
+        elif backend == "memory":
+            _session_state_store = InMemorySessionStateStore()
+        elif backend == "tcp":
+            _session_state_store = TCPSessionStateStore()
+        else:
+            raise ValueError(f"Unknown SESSION_STATE_BACKEND: {settings.SESSION_STATE_BACKEND}")
+    return _session_state_store
+
+
+async def close_session_state_store() -> None:
+    """Close pooled connections of a networked store."""
+    global _session_state_store
+
+    if isinstance(_session_state_store, TCPSessionStateStore):
+        await _session_state_store.close()
+    _session_state_store = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session state server shared by API workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Session state server listening on {args.host}:{args.port}")
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,33 @@
 import asyncio
-from typing import Dict, List
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Union
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor
 from backend.services.llm.summarizer import get_summarizer
-from backend.core.supabase_client import get_supabase_client
+from backend.repositories.storage import (
+    get_message_repository,
+    get_snapshot_repository,
+    get_summary_repository,
+)
+from backend.services.memory.context_window import ContextWindow
+from backend.services.memory.message_writer import get_message_writer
+from backend.services.memory.session_state import get_session_state_store
+from backend.services.memory.summarization_scheduler import get_summarization_scheduler
 from backend.core.interfaces.base_memory_manager import BaseMemoryStrategy
 from backend.core.messages import ErrorMessages
-from backend.core.config import DEFAULT_MODEL
+from backend.core.config import DEFAULT_MODEL, settings
 
+logger = logging.getLogger(__name__)
+
+# Rough cost of the provider, memory and summarizer objects kept per session
+SESSION_OVERHEAD_BYTES = 4096
+
+# Upper bound on unsummarized messages loaded back into the buffer on hydration
+HYDRATE_LIMIT = 50
+
+# Identifies this process as the holder of a summarization lease
+WORKER_ID = uuid.uuid4().hex
 
 
 class SummarizationMemory(BaseMemoryStrategy):
@@ -34,85 +54,239 @@ class SummarizationMemory(BaseMemoryStrategy):
         self.summarizer = get_summarizer(model=self.model_name)
         
         if self.enable_db_persistence:
-            self.db = get_supabase_client()
+            self.db = get_message_repository()
+            self.summaries = get_summary_repository()
+            self.snapshots = get_snapshot_repository()
         else:
             self.db = None
+            self.summaries = None
+            self.snapshots = None
         
         self.running_summary = ""
-        self.buffer: List[Dict[str, str]] = []
+        # Unsummarized turns, each tagged with its per-session sequence number
+        self.buffer: List[Dict[str, Union[str, int]]] = []
         self._summarization_in_progress = False
-        
-        self.executor = ThreadPoolExecutor(max_workers=2)
 
-        if self.enable_db_persistence and self.db:
-            self.load_memory()
+        # Highest sequence number covered by running_summary, and the next one to assign
+        self.summary_seq = 0
+        self._next_seq = 1
+
+        # Pre-rendered view of running_summary + buffer for prompt building
+        self._window = ContextWindow()
+        self._context_tokens = 0
+
+        # Completion of the most recent queued write; the writer is FIFO so
+        # awaiting it means every earlier write of this session has landed
+        self._last_write: Optional[asyncio.Future] = None
+
+        # Summary, buffer and sequence counter are mirrored in the shared
+        # store so any worker can serve the next turn. state_version is the
+        # version this copy was read or written at.
+        self.state_store = get_session_state_store()
+        self.state_version = 0
+        # Until when another worker (or this one) holds the summarization lease
+        self._lease_owner = ""
+        self._lease_until = 0.0
+
+    async def load_memory(self):
+        try:
+            # Another worker may already hold this session's state
+            if await self._reload():
+                return
+        except Exception as e:
+            logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
+
+        if not self.enable_db_persistence or not self.db:
+            return
 
-    def load_memory(self):
         try:
-            summary_response = self.db.table("messages")\
-                .select("content")\
-                .eq("session_id", self.session_id)\
-                .eq("role", "system")\
-                .ilike("content", "[SUMMARY]%")\
-                .order("timestamp", desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if summary_response.data:
-                self.running_summary = summary_response.data[0]['content'].replace("[SUMMARY] ", "")
-
-            msgs_response = self.db.table("messages")\
-                .select("role, content")\
-                .eq("session_id", self.session_id)\
-                .in_("role", ["user", "assistant"])\
-                .order("timestamp", desc=True)\
-                .limit(10)\
-                .execute()
-            
-            if msgs_response.data:
-                for msg in reversed(msgs_response.data):
-                    self.buffer.append({"role": msg['role'], "content": msg['content']})
+            # One row, however long the session has grown
+            snapshot = await self.snapshots.get(self.session_id) # type: ignore
+            if snapshot:
+                self._apply({
+                    "running_summary": snapshot['summary'],
+                    "summary_seq": snapshot['summary_seq'],
+                    "next_seq": snapshot['next_seq'],
+                    "buffer": snapshot['recent'],
+                }, 0)
+            else:
+                await self._load_from_history()
                     
         except Exception as e:
-            print(f"{ErrorMessages.MEMORY_LOAD_FAILED}: {e}")
+            logger.error(f"{ErrorMessages.MEMORY_LOAD_FAILED}: {e}")
+            return
+
+        # Publish what was loaded; if another worker got there first, use theirs
+        await self._update(lambda: self.state_version == 0)
+
+    async def _load_from_history(self) -> None:
+        """Rebuild from summaries and messages, for sessions written before snapshots existed."""
+        summary = await self.summaries.latest(self.session_id) # type: ignore
+        if summary:
+            self.running_summary = summary['content']
+            self.summary_seq = summary['to_seq']
+            self._window.set_summary(self.running_summary)
+
+        # Only the delta past the summary's watermark needs to be in RAM
+        recent = await self.db.after_seq(self.session_id, self.summary_seq, limit=HYDRATE_LIMIT) # type: ignore
+        for msg in reversed(recent):
+            self.buffer.append({"role": msg['role'], "content": msg['content'], "seq": msg['seq']})
+            self._window.append(msg['role'], msg['content'])
+
+        last_seq = recent[0]['seq'] if recent else self.summary_seq
+        self._next_seq = last_seq + 1
 
-    def _save_to_db_async(self, role: str, content: str) -> None:
+    def _snapshot_row(self) -> Dict[str, Any]:
+        """The session_snapshots row for the current state."""
+        return {
+            "session_id": self.session_id,
+            "summary": self.running_summary,
+            "summary_seq": self.summary_seq,
+            "next_seq": self._next_seq,
+            "recent": self.buffer[-HYDRATE_LIMIT:],
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "running_summary": self.running_summary,
+            "summary_seq": self.summary_seq,
+            "next_seq": self._next_seq,
+            "buffer": self.buffer,
+            "lease_owner": self._lease_owner,
+            "lease_until": self._lease_until,
+        }
+
+    def _apply(self, state: Dict[str, Any], version: int) -> None:
+        self.running_summary = state.get("running_summary", "")
+        self.summary_seq = int(state.get("summary_seq", 0))
+        self._next_seq = int(state.get("next_seq", 1))
+        self.buffer = list(state.get("buffer", []))
+        self._lease_owner = state.get("lease_owner", "")
+        self._lease_until = float(state.get("lease_until", 0.0))
+        self.state_version = version
+
+        self._window.clear()
+        self._window.set_summary(self.running_summary)
+        for msg in self.buffer:
+            self._window.append(str(msg['role']), str(msg['content']))
+
+    async def _reload(self) -> bool:
+        """Adopt the shared state if it changed. Returns whether any exists."""
+        if not self.state_store.shared:
+            return False
+        state, version = await self.state_store.get(self.session_id)
+        if state is None:
+            # Expired or never published: the local copy is republished on the next write
+            self.state_version = 0
+            return False
+        if version != self.state_version:
+            self._apply(state, version)
+        return True
+
+    async def _update(self, change: Callable[[], bool]) -> bool:
+        """
+        Optimistic read-modify-write of the shared state. change() mutates the
+        local copy and returns False to abort. On a version conflict the
+        latest state is reloaded and change() runs again. If the store is
+        unreachable or conflicts persist, the change is applied to the local
+        copy only, the session runs locally and False is returned.
+        """
+        if not self.state_store.shared:
+            return change()
+
+        applied = False
+        try:
+            for _ in range(max(settings.SESSION_STATE_MAX_RETRIES, 1)):
+                before = {**self._snapshot(), "buffer": list(self.buffer)}
+                if not change():
+                    return False
+                applied = True
+                version = await self.state_store.compare_and_set(
+                    self.session_id, self._snapshot(), self.state_version
+                )
+                if version is not None:
+                    self.state_version = version
+                    return True
+                # Undo the change so the retry starts from the shared state,
+                # or from the unchanged local copy if the shared one is gone
+                self._apply(before, self.state_version)
+                applied = False
+                await self._reload()
+            logger.warning(f"{ErrorMessages.SESSION_STATE_CONFLICT}: {self.session_id}")
+        except Exception as e:
+            logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
+
+        if not applied:
+            # On top of whatever state was last reloaded, so e.g. new seqs follow it
+            change()
+        return False
+
+    async def sync(self) -> None:
+        try:
+            await self._reload()
+        except Exception as e:
+            logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
+
+    async def _save_to_db_async(self, role: str, content: str, seq: int, snapshot: bool = False) -> None:
         if not self.enable_db_persistence or not self.db:
             return
-        
-        def _save():
-            try:
-                data = {
-                    "session_id": self.session_id,
-                    "role": role,
-                    "content": content,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }
-                self.db.table("messages").insert(data).execute() # type: ignore
-            except Exception as e:
-                print(f"{ErrorMessages.MEMORY_SAVE_FAILED}: {e}")
-        
-        self.executor.submit(_save)
+
+        data = {
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+            "seq": seq,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        self._last_write = await get_message_writer().enqueue(data, self._snapshot_row() if snapshot else None)
+
+    def _append(self, role: str, content: str) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self.buffer.append({"role": role, "content": content, "seq": seq})
+        self._window.append(role, content)
+        return seq
     
     async def add_message(self, user_input: str, ai_response: str):
-        self.buffer.append({"role": "user", "content": user_input})
-        self.buffer.append({"role": "assistant", "content": ai_response})
+        seqs: List[int] = []
+
+        def append_turn() -> bool:
+            # Re-run after a conflict, on top of the reloaded state
+            seqs[:] = [self._append("user", user_input), self._append("assistant", ai_response)]
+            return True
+
+        await self._update(append_turn)
+        user_seq, assistant_seq = seqs
         
-        self._save_to_db_async("user", user_input)
-        self._save_to_db_async("assistant", ai_response)
+        await self._save_to_db_async("user", user_input, user_seq)
+        await self._save_to_db_async("assistant", ai_response, assistant_seq, snapshot=True)
         
-        # Fire-and-forget background summarization for lower latency
-        if len(self.buffer) >= self.summary_threshold and not self._summarization_in_progress:
-            asyncio.create_task(self._consolidate_memory_background())
+        # Background summarization through the shared scheduler; larger buffers go first
+        if (
+            len(self.buffer) >= self.summary_threshold
+            and not self._summarization_in_progress
+            and self._lease_until < time.time()
+        ):
+            get_summarization_scheduler().submit(
+                self.session_id,
+                self._consolidate_memory_background,
+                priority=-len(self.buffer),
+            )
     
 
     async def _consolidate_memory(self) -> None:
         if not self.buffer:
             return
+
+        # Summarize up to a watermark; turns appended while the call is in flight stay buffered
+        covered = list(self.buffer)
+        from_seq = int(covered[0]['seq'])
+        to_seq = int(covered[-1]['seq'])
         
         buffer_text = "\n".join([
-            f"{msg['role'].capitalize()}: {msg['content']}" 
-            for msg in self.buffer
+            f"{str(msg['role']).capitalize()}: {msg['content']}" 
+            for msg in covered
         ])
         
         if self.running_summary:
@@ -133,60 +307,113 @@ class SummarizationMemory(BaseMemoryStrategy):
             )
             user_prompt = f"Conversation:\n{buffer_text}\n\nProvide a summary:"
         
-        try:
-            response = await self.summarizer.summarize(
-                prompt=user_prompt,
-                system_prompt=system_prompt
-            )
-            
-            self.running_summary = response.strip()
-            
-            if self.enable_db_persistence:
-                self._save_to_db_async("system", f"[SUMMARY] {self.running_summary}")
-            
-        except Exception as e:
-            print(f"{ErrorMessages.MEMORY_SUMMARIZE_FAILED}: {e}")
+        # Failures propagate so the scheduler counts them
+        response = await self.summarizer.summarize(
+            prompt=user_prompt,
+            system_prompt=system_prompt
+        )
+        if not response.strip():
+            raise ValueError(ErrorMessages.LLM_EMPTY_RESPONSE)
+
+        summary = response.strip()
+
+        # The summary must not land before the messages it covers
+        if not await self.flush():
+            raise RuntimeError(f"{ErrorMessages.MEMORY_SAVE_FAILED}: messages up to seq {to_seq} not stored, summary discarded")
+
+        def commit() -> bool:
+            # Applied to the latest shared state; turns added meanwhile stay buffered
+            if self.summary_seq >= to_seq:
+                return False
+            self.running_summary = summary
+            self.summary_seq = to_seq
+            self._window.set_summary(self.running_summary)
+
+            remaining = [msg for msg in self.buffer if int(msg['seq']) > to_seq]
+            self._window.drop_oldest(len(self.buffer) - len(remaining))
+            self.buffer = remaining
+            self._lease_owner, self._lease_until = "", 0.0
+            return True
+
+        await self._update(commit)
+        if self.summary_seq != to_seq or self.running_summary != summary:
+            # Another worker summarized this range first
             return
-        
-        self.buffer = []
+
+        if self.enable_db_persistence and self.summaries:
+            try:
+                await self.summaries.insert({
+                    "session_id": self.session_id,
+                    "content": self.running_summary,
+                    "from_seq": from_seq,
+                    "to_seq": to_seq,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                })
+                self._last_write = await get_message_writer().enqueue(None, self._snapshot_row())
+            except Exception:
+                logger.exception(ErrorMessages.MEMORY_SAVE_FAILED)
 
     async def _consolidate_memory_background(self) -> None:
         """Fire-and-forget background summarization for lower latency."""
         if self._summarization_in_progress:
             return
         
+        def take_lease() -> bool:
+            # One summarization per session across all workers
+            if self._lease_until >= time.time() or len(self.buffer) < self.summary_threshold:
+                return False
+            self._lease_owner = WORKER_ID
+            self._lease_until = time.time() + settings.SUMMARY_LEASE_SECONDS
+            return True
+
         self._summarization_in_progress = True
         try:
+            await self._reload()
+            if not await self._update(take_lease):
+                return
             await self._consolidate_memory()
         finally:
             self._summarization_in_progress = False
-    
-    def get_context(self) -> str:
-        parts = []
-        
-        if self.running_summary:
-            parts.append(f"## Previous Conversation Summary:\n{self.running_summary}")
-        
-        if self.buffer:
-            buffer_text = "\n".join([
-                f"{msg['role'].capitalize()}: {msg['content']}" 
-                for msg in self.buffer
-            ])
-            parts.append(f"## Recent Messages:\n{buffer_text}")
-        
-        if not parts:
+            if self._lease_owner == WORKER_ID:
+                # Summarization failed; let the next turn retry without waiting out the lease
+                def release() -> bool:
+                    if self._lease_owner != WORKER_ID:
+                        return False
+                    self._lease_owner, self._lease_until = "", 0.0
+                    return True
+
+                await self._update(release)
+
+    def get_context(self, max_tokens: Optional[int] = None, query: Optional[str] = None) -> str:
+        text, self._context_tokens = self._window.render(max_tokens)
+        if not text:
             return "No conversation history available."
-        
-        return "\n\n".join(parts)
+        return text
+
+    def get_context_tokens(self) -> int:
+        return self._context_tokens
     
     def clear(self) -> None:
         self.running_summary = ""
         self.buffer = []
+        self._window.clear()
+        self.state_version = 0
+
+    async def flush(self) -> bool:
+        if self._last_write is not None:
+            return await self._last_write
+        return True
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        # Approximate footprint: text held in RAM plus a fixed per-session overhead
+        text_bytes = len(self.running_summary) + sum(len(str(msg['content'])) for msg in self.buffer)
+        return {
+            "strategy_type": self.__class__.__name__,
+            "memory_size": SESSION_OVERHEAD_BYTES + text_bytes,
+            "buffer_messages": len(self.buffer),
+            "pending_writes": self._last_write is not None and not self._last_write.done(),
+        }
     
     async def force_summarize(self) -> None:
         if self.buffer:
-            await self._consolidate_memory()
-    
-    def __del__(self):
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
\ No newline at end of file
+            await self._consolidate_memory()
\ No newline at end of file
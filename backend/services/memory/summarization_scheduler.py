@@ -0,0 +1,175 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.core.config import settings
+from backend.core.messages import ErrorMessages
+from backend.core.metrics import SUMMARIZATION_DURATION
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class SummarizationScheduler:
+    """
+    Process-wide queue for background summarization.
+
+    At most max_concurrency summaries run at once, and a queued job waits
+    (up to max_defer seconds) while interactive chat calls are at or above
+    interactive_threshold, so summaries yield the shared upstream to users.
+    Requests for a session that is already queued are coalesced; a request
+    arriving while that session is being summarized re-queues it once done.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.SUMMARY_MAX_CONCURRENCY,
+        interactive_threshold: int = settings.SUMMARY_INTERACTIVE_THRESHOLD,
+        max_defer: float = settings.SUMMARY_MAX_DEFER,
+    ):
+        self.max_concurrency = max_concurrency
+        self.interactive_threshold = interactive_threshold
+        self.max_defer = max_defer
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._counter = itertools.count()
+
+        self._queued: Dict[str, Job] = {}
+        self._running: Set[str] = set()
+        self._rerun: Dict[str, Tuple[Job, int]] = {}
+
+        self._interactive = 0
+        self._interactive_low = asyncio.Event()
+        self._interactive_low.set()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, session_id: str, job: Job, priority: int = 0) -> bool:
+        """
+        Queue a summarization for a session. Lower priority values run first.
+        Returns False when the request was coalesced into an existing one.
+        """
+        self._start()
+        self.submitted += 1
+
+        if session_id in self._queued:
+            self.coalesced += 1
+            return False
+        if session_id in self._running:
+            self.coalesced += 1
+            self._rerun[session_id] = (job, priority)
+            return False
+
+        self._enqueue(session_id, job, priority)
+        return True
+
+    @asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Mark a user-facing LLM call as in flight for the duration of the block."""
+        self._interactive += 1
+        if self._interactive >= self.interactive_threshold:
+            self._interactive_low.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if self._interactive < self.interactive_threshold:
+                self._interactive_low.set()
+
+    async def stop(self) -> None:
+        """Cancel workers; queued summaries are dropped and redone on a later turn."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._queued.clear()
+        self._rerun.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.failed
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "interactive_inflight": self._interactive,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": self._wait_total / started if started else 0.0,
+            "max_wait_seconds": self._wait_max,
+        }
+
+    def _enqueue(self, session_id: str, job: Job, priority: int) -> None:
+        self._queued[session_id] = job
+        self._queue.put_nowait((priority, next(self._counter), session_id, time.monotonic()))  # type: ignore
+
+    def _start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+            ]
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        assert queue is not None
+
+        while True:
+            _, _, session_id, enqueued_at = await queue.get()
+            try:
+                await self._wait_for_interactive_lull()
+
+                job = self._queued.pop(session_id)
+                self._running.add(session_id)
+
+                waited = time.monotonic() - enqueued_at
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+                started = time.monotonic()
+                try:
+                    await job()
+                    self.completed += 1
+                    SUMMARIZATION_DURATION.observe(time.monotonic() - started, outcome="ok")
+                except Exception as e:
+                    self.failed += 1
+                    SUMMARIZATION_DURATION.observe(time.monotonic() - started, outcome="error")
+                    logger.error(f"{ErrorMessages.MEMORY_SUMMARIZE_FAILED}: {e}")
+                finally:
+                    self._running.discard(session_id)
+
+                rerun = self._rerun.pop(session_id, None)
+                if rerun:
+                    self._enqueue(session_id, *rerun)
+            finally:
+                queue.task_done()
+
+    async def _wait_for_interactive_lull(self) -> None:
+        try:
+            await asyncio.wait_for(self._interactive_low.wait(), self.max_defer)
+        except asyncio.TimeoutError:
+            pass
+
+
+_scheduler: Optional[SummarizationScheduler] = None
+
+
+def get_summarization_scheduler() -> SummarizationScheduler:
+    """Get the shared summarization scheduler."""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = SummarizationScheduler()
+    return _scheduler
@@ -3,20 +3,33 @@ import datetime
 import logging
 
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
-from backend.core.supabase_client import get_supabase_client
+from pydantic import TypeAdapter
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.pagination import decode_cursor, encode_cursor
+from backend.repositories.storage import get_project_repository
+from backend.services.llm.response_cache import get_response_cache
 from backend.models.project import ProjectCreate,ProjectResponse, ProjectUpdate
 from backend.core.messages import SuccessMessages,ErrorMessages
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole page in one call instead of one model at a time
+_project_list = TypeAdapter(List[ProjectResponse])
+
 
 class ProjectService:
     """Project or Agent Service"""
 
     def __init__(self):
-        self.client = get_supabase_client()
+        self.repository = get_project_repository()
+        # Keyed by (project_id, user_id) so ownership is part of the lookup
+        self._cache: TTLCache[ProjectResponse] = TTLCache(
+            maxsize=settings.PROJECT_CACHE_MAX_ENTRIES,
+            ttl=settings.PROJECT_CACHE_TTL,
+        )
 
     async def create_project(self,proj_data:ProjectCreate,user_id:str):
         try:
@@ -27,10 +40,13 @@ class ProjectService:
                 "project_name":proj_data.project_name,
                 "project_description":proj_data.project_description,
                 "system_prompt": proj_data.system_prompt,
+                "enable_response_cache": proj_data.enable_response_cache,
+                "memory_strategy": proj_data.memory_strategy.value,
+                "allow_model_fallback": proj_data.allow_model_fallback,
                 "created_at": created_at.isoformat()
             }
 
-            self.client.table('Projects').insert(new_project).execute()
+            await self.repository.insert(new_project)
 
             logger.info(SuccessMessages.PROJECT_CREATED)
             return ProjectResponse(
@@ -39,6 +55,9 @@ class ProjectService:
                 project_name=new_project["project_name"],
                 project_description=new_project["project_description"],
                 system_prompt=new_project["system_prompt"],
+                enable_response_cache=new_project["enable_response_cache"],
+                memory_strategy=new_project["memory_strategy"],
+                allow_model_fallback=new_project["allow_model_fallback"],
                 created_at=created_at,
             )
         
@@ -52,30 +71,29 @@ class ProjectService:
             update_payload = update_data.model_dump(exclude_unset=True)
             update_payload["updated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
-            result = self.client.table('Projects')\
-            .update(update_payload).eq('id',project_id)\
-            .eq('user_id',user_id).execute()
+            result = await self.repository.update(project_id, user_id, update_payload)
+            self._cache.invalidate((project_id, user_id))
+            if "system_prompt" in update_payload or "enable_response_cache" in update_payload:
+                get_response_cache().invalidate_project(project_id)
 
-            if not result.data:
+            if not result:
                 logger.error(ErrorMessages.PROJECT_UPDATE_FAILED)
                 return None
             
             logger.info(SuccessMessages.PROJECT_UPDATED)
 
-            return ProjectResponse(**result.data[0])
+            return ProjectResponse(**result[0])
         except Exception as e:
             logger.error(f"Project Error:{e}")
             raise ValueError(f"{ErrorMessages.PROJECT_UPDATE_FAILED}:{e!s}")
 
     async def delete_project(self, project_id: str, user_id: str) -> bool:
         try:
-            result = self.client.table('Projects') \
-                .delete() \
-                .eq('id', project_id) \
-                .eq('user_id', user_id) \
-                .execute()
+            result = await self.repository.delete(project_id, user_id)
+            self._cache.invalidate((project_id, user_id))
+            get_response_cache().invalidate_project(project_id)
 
-            if not result.data:
+            if not result:
                 logger.error(ErrorMessages.PROJECT_DELETE_FAILED)
                 return False
 
@@ -86,33 +104,54 @@ class ProjectService:
             logger.error(f"Project Error:{e}")
             raise ValueError(f"{ErrorMessages.PROJECT_DELETE_FAILED}:{e!s}")
         
-    async def get_all_projects(self, user_id: str) -> List[ProjectResponse]:
+    async def get_all_projects(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = settings.PROJECT_PAGE_SIZE,
+        include_total: bool = True,
+    ) -> Tuple[List[ProjectResponse], Optional[str], Optional[int]]:
+        """
+        One page of the user's projects, newest first.
+        Returns the projects, the cursor for the next page (None at the end)
+        and the total number of projects when include_total.
+        Raises ValueError for a malformed cursor.
+        """
+        after = tuple(decode_cursor(cursor, 2)) if cursor else None
+
         try:
-            result = self.client.table('Projects') \
-                .select("id,user_id,project_name,project_description,system_prompt,created_at") \
-                .eq('user_id', user_id) \
-                .order('created_at', desc=True) \
-                .range(0,9)\
-                .execute()
-
-            return [ProjectResponse(**item) for item in result.data]
+            # One extra row tells whether another page exists
+            rows, total = await self.repository.list_page(
+                user_id, after, limit + 1, include_total  # type: ignore
+            )
         except Exception as e:
             logger.error(f"Failed to fetch projects: {e}")
             raise e
 
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        return _project_list.validate_python(rows), next_cursor, total
+
     async def get_project(self, project_id: str, user_id: str) -> Optional[ProjectResponse]:
+        cached = self._cache.get((project_id, user_id))
+        if cached:
+            return cached
+
         try:
-            result = self.client.table('Projects') \
-                .select("id,user_id,project_name,project_description,system_prompt,created_at") \
-                .eq('id', project_id) \
-                .eq('user_id', user_id) \
-                .single() \
-                .execute()
-            
-            if not result.data:
+            result = await self.repository.get(project_id, user_id)
+
+            if not result:
                 return None
-                
-            return ProjectResponse(**result.data)
+
+            project = ProjectResponse(**result)
+            self._cache.set((project_id, user_id), project)
+            return project
         except Exception as e:
             logger.error(f"Failed to fetch project: {e}")
             return None
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
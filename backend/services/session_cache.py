@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from backend.core.interfaces.base_llm_manager import BaseLLMManager
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCache:
+    """
+    Bounded LRU cache of live chatbot sessions.
+
+    Entries are evicted when the cache exceeds its session or byte budget, or
+    when they have been idle longer than the TTL. Evicted sessions stay
+    reachable while their pending writes are flushed, so a request arriving
+    mid-eviction reuses the same object instead of rehydrating stale state.
+    """
+
+    def __init__(self, max_sessions: int, max_bytes: int, idle_ttl: float):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+
+        self._entries: "OrderedDict[str, BaseLLMManager]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+
+        # Evicted sessions whose writes are still being flushed
+        self._draining: Dict[str, BaseLLMManager] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries or session_id in self._draining
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str) -> Optional[BaseLLMManager]:
+        self._expire_idle()
+
+        chatbot = self._entries.get(session_id)
+        if chatbot is None:
+            chatbot = self._draining.pop(session_id, None)
+            if chatbot is None:
+                self.misses += 1
+                return None
+            # Revive a session caught mid-eviction
+            self._insert(session_id, chatbot)
+        else:
+            self._entries.move_to_end(session_id)
+            self._last_access[session_id] = time.monotonic()
+            # Sessions grow turn by turn while cached, so the budget is rechecked on every access
+            self._resize(session_id, chatbot)
+        self._enforce_limits()
+
+        self.hits += 1
+        return chatbot
+
+    def put(self, session_id: str, chatbot: BaseLLMManager) -> None:
+        self._draining.pop(session_id, None)
+        if session_id in self._entries:
+            self._remove(session_id)
+        self._insert(session_id, chatbot)
+        self._expire_idle()
+        self._enforce_limits()
+
+    def pop(self, session_id: str) -> Optional[BaseLLMManager]:
+        """Remove a session without counting it as an eviction."""
+        self._draining.pop(session_id, None)
+        if session_id not in self._entries:
+            return None
+        return self._remove(session_id)
+
+    async def drain(self) -> None:
+        """Flush every cached session, e.g. on shutdown."""
+        for chatbot in list(self._entries.values()) + list(self._draining.values()):
+            if chatbot.memory:
+                await chatbot.memory.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "draining": len(self._draining),
+            "bytes": self._bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _insert(self, session_id: str, chatbot: BaseLLMManager) -> None:
+        self._entries[session_id] = chatbot
+        self._last_access[session_id] = time.monotonic()
+        self._sizes[session_id] = 0
+        self._resize(session_id, chatbot)
+
+    def _remove(self, session_id: str) -> BaseLLMManager:
+        chatbot = self._entries.pop(session_id)
+        self._last_access.pop(session_id, None)
+        self._bytes -= self._sizes.pop(session_id, 0)
+        return chatbot
+
+    def _resize(self, session_id: str, chatbot: BaseLLMManager) -> None:
+        size = 0
+        if chatbot.memory:
+            reported = chatbot.memory.get_memory_stats().get("memory_size")
+            if isinstance(reported, int):
+                size = reported
+        self._bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _expire_idle(self) -> None:
+        if self.idle_ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        # Entries are kept in access order, so idle ones sit at the front
+        while self._entries:
+            session_id = next(iter(self._entries))
+            if self._last_access[session_id] > cutoff:
+                break
+            self.expirations += 1
+            self._evict(session_id)
+
+    def _enforce_limits(self) -> None:
+        # The most recent entry is always kept, even if it alone exceeds the byte budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self.evictions += 1
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, session_id: str) -> None:
+        chatbot = self._remove(session_id)
+        if not chatbot.memory:
+            return
+
+        self._draining[session_id] = chatbot
+
+        async def _flush():
+            try:
+                await chatbot.memory.flush()  # type: ignore
+            except Exception as e:
+                logger.error(f"Failed to flush evicted session {session_id}: {e}")
+            finally:
+                if self._draining.get(session_id) is chatbot:
+                    del self._draining[session_id]
+
+        task = asyncio.create_task(_flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
@@ -1,14 +1,26 @@
+import asyncio
 from datetime import datetime, timezone
 from threading import Lock
-from typing import Optional, List, Dict, Tuple
+from typing import Any, AsyncIterator, Optional, List, Dict, Tuple
 from uuid import uuid4
 import logging
 
-from backend.core import supabase_client
+from backend.core.cache import TTLCache
+from backend.core.pagination import decode_cursor, encode_cursor
 from backend.core.interfaces.base_llm_manager import BaseLLMManager
 from backend.core.messages import ErrorMessages
-from backend.core.config import DEFAULT_MODEL
+from backend.core.config import DEFAULT_MODEL, settings
+from backend.models.project import MemoryStrategy
+from backend.repositories.storage import (
+    get_message_repository,
+    get_project_repository,
+    get_session_repository,
+    get_snapshot_repository,
+    get_summary_repository,
+)
 from backend.services.llm.provider import get_llm_provider
+from backend.services.memory.session_state import get_session_state_store
+from backend.services.session_cache import SessionCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,46 +28,68 @@ class SessionManager:
     """
     Manages multiple chatbot sessions with optimized DB handling.
     """
-    
+
     def __init__(self):
-        self.sessions: Dict[str, BaseLLMManager] = {}
-        self.db = supabase_client.get_supabase_client()
+        self.sessions = SessionCache(
+            max_sessions=settings.SESSION_CACHE_MAX_SESSIONS,
+            max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+            idle_ttl=settings.SESSION_CACHE_IDLE_TTL,
+        )
+        self.db = get_session_repository()
+        self.projects = get_project_repository()
+        self.messages = get_message_repository()
+        self.summaries = get_summary_repository()
+        self.snapshots = get_snapshot_repository()
         self._lock = Lock()
-    
-    def create_session(
-        self, 
+
+        # One hydration per session id; concurrent misses await the same task
+        self._hydrating: Dict[str, asyncio.Task] = {}
+        # Recently looked-up ids that do not exist, to spare the DB repeat misses
+        self._missing: TTLCache[bool] = TTLCache(
+            maxsize=settings.SESSION_NEGATIVE_CACHE_MAX_ENTRIES,
+            ttl=settings.SESSION_NEGATIVE_CACHE_TTL,
+        )
+        # Sidebar pages, keyed by user first so one user's entries drop together
+        self._listings: TTLCache[Tuple[List[Dict], Optional[str]]] = TTLCache(
+            maxsize=settings.SESSION_LIST_CACHE_MAX_ENTRIES,
+            ttl=settings.SESSION_LIST_CACHE_TTL,
+        )
+
+    async def create_session(
+        self,
         project_id: str,
         session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
         chat_model: str = DEFAULT_MODEL,
         summary_model: str = DEFAULT_MODEL,
-        enable_db: bool = True
+        enable_db: bool = True,
+        memory_strategy: str = MemoryStrategy.SUMMARIZATION.value
     ) -> Tuple[str, BaseLLMManager]:
         """
         Create a new chatbot session and persist configuration.
+        Callers that already verified the project owner pass user_id to skip the lookup.
         """
         if session_id is None:
             session_id = str(uuid4())
 
-        proj_res = self.db.table("Projects")\
-                        .select("user_id")\
-                        .eq("id",project_id)\
-                        .single()\
-                        .execute()
-        user_id = proj_res.data.get("user_id")
-        
+        if user_id is None:
+            user_id = await self.projects.get_owner(project_id)
+
         # Check RAM cache first
-        if session_id in self.sessions:
-            return session_id, self.sessions[session_id]
-        
+        cached = self.sessions.get(session_id)
+        if cached:
+            return session_id, cached
+
         chatbot = get_llm_provider(
             session_id=session_id,
             project_id=project_id,
             user_id=user_id,
             chat_model=chat_model,
             summary_model=summary_model,
-            enable_db=enable_db
+            enable_db=enable_db,
+            memory_strategy=memory_strategy
         )
-        
+
         if enable_db and self.db:
             try:
                 data = {
@@ -63,138 +97,220 @@ class SessionManager:
                     "project_id": project_id,
                     "created_at": datetime.now(timezone.utc).isoformat(),
                     "title": "New Chat",
-                    "model": chat_model 
+                    "model": chat_model
                 }
-                self.db.table("sessions").insert(data).execute()
+                await self.db.insert(data)
             except Exception as e:
                 logger.error(f"{ErrorMessages.SESSION_CREATE_FAILED}: {e}")
 
         # Update Cache
         with self._lock:
-            self.sessions[session_id] = chatbot
-            
+            self.sessions.put(session_id, chatbot)
+        self._missing.invalidate(session_id)
+        self._invalidate_listings(user_id)
+
         return session_id, chatbot
-    
-    def get_session(self, session_id: str) -> Optional[BaseLLMManager]:
+
+    async def get_session(self, session_id: str) -> Optional[BaseLLMManager]:
         """Get existing session, lazy-loading from DB if missing from RAM."""
-        if session_id in self.sessions:
-            return self.sessions[session_id]
-            
-        if not self.db:
+        cached = self.sessions.get(session_id)
+        if cached:
+            # Pick up turns other workers served since this one last did
+            if cached.memory:
+                await cached.memory.sync()
+            return cached
+
+        if not self.db or self._missing.get(session_id):
             return None
 
+        task = self._hydrating.get(session_id)
+        if task is None:
+            task = asyncio.create_task(self._hydrate(session_id))
+            self._hydrating[session_id] = task
+            task.add_done_callback(lambda _: self._hydrating.pop(session_id, None))
+
+        # shield so a cancelled caller does not abort hydration for the others
+        return await asyncio.shield(task)
+
+    async def _hydrate(self, session_id: str) -> Optional[BaseLLMManager]:
         try:
             # Join with Projects to get user_id since it's not stored in sessions anymore
-            res = self.db.table("sessions")\
-                .select("project_id, model, Projects(user_id)")\
-                .eq("id", session_id)\
-                .single()\
-                .execute()
-            
-            
-            if res.data:
-                project_id = res.data.get("project_id")
-                chat_model = res.data.get("model", "meta-llama/llama-3.3-70b-instruct:free")
-                
-                # Get user_id from the joined Projects table
-                projects_data = res.data.get("Projects")
-                user_id = projects_data.get("user_id") if projects_data else ""
+            data = await self.db.get_with_owner(session_id)
+
+            if data:
+                project_id = data.get("project_id")
+                chat_model = data.get("model", "meta-llama/llama-3.3-70b-instruct:free")
+
+                # Owner and memory strategy come from the session's project
+                user_id = data.get("user_id") or ""
+                memory_strategy = data.get("memory_strategy") or MemoryStrategy.SUMMARIZATION.value
 
                 chatbot = get_llm_provider(
                     session_id=session_id,
                     project_id=project_id,
                     user_id=user_id,
                     chat_model=chat_model,
-                    summary_model=chat_model, 
-                    enable_db=True
+                    summary_model=chat_model,
+                    enable_db=True,
+                    memory_strategy=memory_strategy
                 )
-                
+                if chatbot.memory:
+                    await chatbot.memory.load_memory()
+
                 with self._lock:
-                    self.sessions[session_id] = chatbot
+                    self.sessions.put(session_id, chatbot)
                 return chatbot
-                
+
+            self._missing.set(session_id, True)
+
         except Exception as e:
             logger.error(f"{ErrorMessages.SESSION_LOAD_FAILED}: {e}")
-                
+
         return None
-    
-    def get_user_sessions(self,project_id: Optional[str] = None) -> List[Dict]:
-        """List sessions for a user, optimized for UI rendering."""
+
+    async def get_user_sessions(
+        self,
+        user_id: str,
+        project_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = settings.SESSION_LIST_PAGE_SIZE,
+        with_counts: bool = False,
+        with_preview: bool = False,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of a user's sessions, optionally within one project.
+        Returns the sessions and the cursor for the next page, or None at the end.
+        Raises ValueError for a malformed cursor.
+        """
         if not self.db:
-            return []
-        
+            return [], None
+
+        after = tuple(decode_cursor(cursor, 2)) if cursor else None
+        key = (user_id, project_id, cursor, limit, with_counts, with_preview)
+        cached = self._listings.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            query = self.db.table("sessions")\
-                .select("id, title, created_at, model, project_id")\
-                .eq("project_id", project_id)
-
-                
-            res = query.order("created_at", desc=True).execute()
-            return res.data if res.data else []
-            
+            # One extra row tells whether another page exists
+            rows = await self.db.list_page(
+                user_id, project_id, after, limit + 1, with_counts, with_preview  # type: ignore
+            )
         except Exception as e:
             logger.error(f"Failed to fetch sessions: {e}")
-            return []
+            return [], None
 
-    def get_session_history(self, session_id: str) -> List[Dict]:
-        """Get chat history optimized for frontend display."""
-        if self.db:
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        sessions = [self._listing_row(row) for row in rows]
+        self._listings.set(key, (sessions, next_cursor))
+        return sessions, next_cursor
+
+    @staticmethod
+    def _listing_row(row: Dict) -> Dict:
+        if row.get("last_message"):
+            row["last_message"] = row["last_message"][:settings.SESSION_PREVIEW_CHARS]
+        return row
+
+    def _invalidate_listings(self, user_id: Optional[str]) -> None:
+        if user_id:
+            self._listings.invalidate_where(lambda key: key[0] == user_id)  # type: ignore
+        else:
+            self._listings.clear()
+
+    async def get_session_history(
+        self,
+        session_id: str,
+        cursor: Optional[int] = None,
+        limit: int = settings.HISTORY_PAGE_SIZE,
+        descending: bool = True,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """
+        One page of chat history, newest first by default.
+        Returns the messages and the cursor for the next page, or None at the end.
+        """
+        if self.messages:
             try:
-                # Filter out system messages (including summaries) - only show user and assistant
-                res = self.db.table("messages")\
-                    .select("role, content, timestamp")\
-                    .eq("session_id", session_id)\
-                    .in_("role", ["user", "assistant"])\
-                    .order("timestamp", desc=False)\
-                    .execute()
-                return res.data or []
+                # One extra row tells whether another page exists
+                rows = await self.messages.page(session_id, cursor, limit + 1, descending)
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    return rows, rows[-1]["seq"]
+                return rows, None
             except Exception as e:
                 logger.error(f"Failed to fetch history: {e}")
-        return []
+        return [], None
 
-    def update_session(self, session_id: str, title: Optional[str] = None) -> Optional[Dict]:
-        """Update session title."""
+    async def iter_session_history(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Full chat history oldest first, streamed in bounded batches."""
+        async for row in self.messages.iter_all(session_id, settings.HISTORY_EXPORT_BATCH_SIZE):
+            yield row
+
+    async def update_session(
+        self, session_id: str, title: Optional[str] = None, user_id: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Update session title. user_id scopes the listing cache invalidation."""
         if not self.db:
             return None
-        
+
         try:
             update_data = {}
             if title is not None:
                 update_data["title"] = title
-            
+
             if not update_data:
                 return None
-            
-            self.db.table("sessions")\
-                .update(update_data)\
-                .eq("id", session_id)\
-                .execute()
-            
-            res = self.db.table("sessions").select("*").eq("id", session_id).execute()
-            if res.data and len(res.data) > 0:
-                return res.data[0]
-            return None
-            
+
+            await self.db.update(session_id, update_data)
+            self._invalidate_listings(user_id)
+
+            return await self.db.get(session_id)
+
         except Exception as e:
             logger.error(f"{ErrorMessages.SESSION_UPDATE_FAILED}: {e}")
             return None
 
-    def end_session(self, session_id: str) -> bool:
-        """End session and delete data."""
+    async def end_session(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """End session and delete data. user_id scopes the listing cache invalidation."""
+
+        with self._lock:
+            chatbot = self.sessions.pop(session_id)
+        if chatbot:
+            if chatbot.memory:
+                try:
+                    # Queued turns must land before their session row is deleted
+                    await chatbot.memory.flush()
+                except Exception as e:
+                    logger.error(f"{ErrorMessages.MEMORY_SAVE_FAILED}: {e}")
+            chatbot.reset_conversation()
+
+        try:
+            await get_session_state_store().delete(session_id)
+        except Exception as e:
+            logger.error(f"{ErrorMessages.SESSION_STATE_FAILED}: {e}")
 
-        if session_id in self.sessions:
-            with self._lock:
-                if session_id in self.sessions:
-                    self.sessions[session_id].reset_conversation()
-                    del self.sessions[session_id]
-        
         if self.db:
             try:
-                self.db.table("messages").delete().eq("session_id", session_id).execute()
-                self.db.table("sessions").delete().eq("id", session_id).execute()
+                await self.messages.delete_for_session(session_id)
+                await self.summaries.delete_for_session(session_id)
+                await self.snapshots.delete_for_session(session_id)
+                await self.db.delete(session_id)
+                # Only once it is really gone; a failed delete must not hide the session
+                self._missing.set(session_id, True)
+                self._invalidate_listings(user_id)
                 return True
             except Exception as e:
                 logger.error(f"{ErrorMessages.SESSION_DELETE_FAILED}: {e}")
                 return False
-        
-        return True
\ No newline at end of file
+
+        return True
+
+    async def shutdown(self) -> None:
+        """Flush pending writes of every live session."""
+        await self.sessions.drain()
+
+    def get_cache_stats(self) -> Dict:
+        return {**self.sessions.stats(), "listings": self._listings.stats()}
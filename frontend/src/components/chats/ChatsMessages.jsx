@@ -5,6 +5,9 @@ export default function ChatMessages({
     currentSession,
     messages,
     historyLoading,
+    hasOlder,
+    olderLoading,
+    onLoadOlder,
     messagesEndRef
 }) {
     if (!currentSession) {
@@ -21,6 +24,18 @@ export default function ChatMessages({
 
     return (
     <>
+        {hasOlder && (
+            <div className="flex justify-center">
+                <button
+                    type="button"
+                    onClick={onLoadOlder}
+                    disabled={olderLoading}
+                    className="text-xs text-muted-foreground hover:text-foreground disabled:opacity-50"
+                >
+                    {olderLoading ? 'Loading...' : 'Load earlier messages'}
+                </button>
+            </div>
+        )}
         {messages
             .filter(msg => msg.role !== 'system')
             .map((msg, idx) => (
@@ -14,7 +14,9 @@ export default function ChatSidebar({
     onRenameSession,
     error,
     onClearError,
-    loading
+    loading,
+    hasMore,
+    onLoadMore
 }) {
     const navigate = useNavigate();
 
@@ -60,6 +62,17 @@ export default function ChatSidebar({
                         onRename={onRenameSession}
                     />
                 ))}
+                {hasMore && (
+                    <Button
+                        variant="ghost"
+                        size="sm"
+                        className="w-full text-xs text-muted-foreground"
+                        onClick={onLoadMore}
+                        disabled={loading}
+                    >
+                        {loading ? 'Loading...' : 'Load more'}
+                    </Button>
+                )}
             </div>
         </div>
     );
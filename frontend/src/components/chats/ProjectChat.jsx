@@ -24,6 +24,8 @@ export default function ProjectChat() {
         loading: sessionsLoading,
         error,
         setError,
+        hasMoreSessions,
+        loadMoreSessions,
         createSession,
         deleteSession,
         renameSession
@@ -35,6 +37,9 @@ export default function ProjectChat() {
         setInput,
         sending,
         historyLoading,
+        hasOlder,
+        olderLoading,
+        loadOlder,
         messagesEndRef,
         sendMessage
     } = useChat(currentSession);
@@ -112,6 +117,8 @@ export default function ProjectChat() {
                 error={error}
                 onClearError={() => setError(null)}
                 loading={sessionsLoading}
+                hasMore={hasMoreSessions}
+                onLoadMore={loadMoreSessions}
             />
 
             {/* Main Chat Area */}
@@ -127,6 +134,9 @@ export default function ProjectChat() {
                         currentSession={currentSession}
                         messages={messages}
                         historyLoading={historyLoading}
+                        hasOlder={hasOlder}
+                        olderLoading={olderLoading}
+                        onLoadOlder={loadOlder}
                         messagesEndRef={messagesEndRef}
                     />
                 </div>
@@ -7,9 +7,17 @@ export function useChat(currentSession) {
     const [input, setInput] = useState('');
     const [sending, setSending] = useState(false);
     const [historyLoading, setHistoryLoading] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [olderLoading, setOlderLoading] = useState(false);
     const messagesEndRef = useRef(null);
+    const keepScroll = useRef(false);
 
     useEffect(() => {
+        // Prepending older messages should not jump to the bottom
+        if (keepScroll.current) {
+            keepScroll.current = false;
+            return;
+        }
         scrollToBottom();
     }, [messages]);
 
@@ -26,12 +34,21 @@ export function useChat(currentSession) {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
     };
 
+    // Pages arrive newest first; the cursor for the next (older) page is in a header
+    const fetchHistoryPage = async (sessionId, cursor) => {
+        const params = cursor != null ? { cursor } : {};
+        const historyRes = await client.get(`/sessions/${sessionId}/history`, { params });
+        const next = historyRes.headers['x-next-cursor'];
+        setNextCursor(next != null ? Number(next) : null);
+        return [...historyRes.data].reverse();
+    };
+
     const loadHistory = async (sessionId) => {
         setMessages([]);
+        setNextCursor(null);
         setHistoryLoading(true);
         try {
-            const historyRes = await client.get(`/sessions/${sessionId}/history`);
-            setMessages(historyRes.data);
+            setMessages(await fetchHistoryPage(sessionId));
         } catch (error) {
             console.error("Failed to load history:", error);
         } finally {
@@ -39,6 +56,20 @@ export function useChat(currentSession) {
         }
     };
 
+    const loadOlder = async () => {
+        if (!currentSession || nextCursor == null || olderLoading) return;
+        setOlderLoading(true);
+        try {
+            const older = await fetchHistoryPage(currentSession.id, nextCursor);
+            keepScroll.current = true;
+            setMessages(prev => [...older, ...prev]);
+        } catch (error) {
+            console.error("Failed to load history:", error);
+        } finally {
+            setOlderLoading(false);
+        }
+    };
+
     const sendMessage = async (sessionId, messageContent) => {
         if (!messageContent.trim() || sending) return;
 
@@ -69,31 +100,42 @@ export function useChat(currentSession) {
 
             const reader = response.body.getReader();
             const decoder = new TextDecoder();
+            let buffer = '';
 
             while (true) {
                 const { done, value } = await reader.read();
                 if (done) break;
 
-                const chunk = decoder.decode(value);
-                const lines = chunk.split('\n');
-
-                for (const line of lines) {
-                    if (line.startsWith('data: ')) {
-                        const data = line.slice(6);
-                        if (data === '[DONE]') continue;
-
-                        setMessages(prev => {
-                            const updated = [...prev];
-                            const lastIdx = updated.length - 1;
-                            if (lastIdx >= 0 && updated[lastIdx].role === 'assistant') {
-                                updated[lastIdx] = {
-                                    ...updated[lastIdx],
-                                    content: updated[lastIdx].content + data
-                                };
-                            }
-                            return updated;
-                        });
+                // Events are separated by a blank line and may span reads
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+
+                for (const rawEvent of events) {
+                    let eventName = 'message';
+                    const dataLines = [];
+                    for (const line of rawEvent.split('\n')) {
+                        if (line.startsWith('event: ')) {
+                            eventName = line.slice(7);
+                        } else if (line.startsWith('data: ')) {
+                            dataLines.push(line.slice(6));
+                        }
                     }
+                    // Comments (heartbeats) carry no data
+                    if (eventName !== 'message' || dataLines.length === 0) continue;
+
+                    const data = dataLines.join('\n');
+                    setMessages(prev => {
+                        const updated = [...prev];
+                        const lastIdx = updated.length - 1;
+                        if (lastIdx >= 0 && updated[lastIdx].role === 'assistant') {
+                            updated[lastIdx] = {
+                                ...updated[lastIdx],
+                                content: updated[lastIdx].content + data
+                            };
+                        }
+                        return updated;
+                    });
                 }
             }
         } catch (error) {
@@ -117,6 +159,9 @@ export function useChat(currentSession) {
         setInput,
         sending,
         historyLoading,
+        hasOlder: nextCursor != null,
+        olderLoading,
+        loadOlder,
         messagesEndRef,
         sendMessage
     };
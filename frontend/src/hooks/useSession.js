@@ -6,6 +6,7 @@ export function useSessions(projectId) {
     const [currentSession, setCurrentSession] = useState(null);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         if (projectId) {
@@ -21,6 +22,24 @@ export function useSessions(projectId) {
                 params: { project_id: projectId }
             });
             setSessions(res.data);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (err) {
+            console.error("Failed to fetch sessions:", err);
+            setError(err.response?.data?.detail || 'Failed to fetch chat sessions');
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    const loadMoreSessions = async () => {
+        if (!nextCursor || loading) return;
+        setLoading(true);
+        try {
+            const res = await client.get('/sessions/', {
+                params: { project_id: projectId, cursor: nextCursor }
+            });
+            setSessions(prev => [...prev, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error("Failed to fetch sessions:", err);
             setError(err.response?.data?.detail || 'Failed to fetch chat sessions');
@@ -95,6 +114,8 @@ export function useSessions(projectId) {
         error,
         setError,
         fetchSessions,
+        hasMoreSessions: nextCursor != null,
+        loadMoreSessions,
         createSession,
         deleteSession,
         renameSession
@@ -9,6 +9,8 @@ import { useNavigate } from 'react-router-dom';
 export default function Dashboard() {
     const [projects, setProjects] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [currentProject, setCurrentProject] = useState(null);
     const navigate = useNavigate();
@@ -28,8 +30,9 @@ export default function Dashboard() {
     const fetchProjects = async () => {
         setLoading(true);
         try {
-            const response = await client.get('/project/');
+            const response = await client.get('/project/', { params: { include_total: false } });
             setProjects(response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (error) {
             console.error('Failed to fetch projects:', error);
         } finally {
@@ -37,6 +40,22 @@ export default function Dashboard() {
         }
     };
 
+    const fetchMoreProjects = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const response = await client.get('/project/', {
+                params: { cursor: nextCursor, include_total: false }
+            });
+            setProjects(prev => [...prev, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+        } catch (error) {
+            console.error('Failed to fetch projects:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleCreateClick = () => {
         setCurrentProject(null);
         setFormData({ project_name: '', project_description: '', system_prompt: '' });
@@ -165,6 +184,13 @@ export default function Dashboard() {
                                 </div>
                             </div>
                         ))}
+                        {nextCursor && (
+                            <div className="flex justify-center p-3">
+                                <Button variant="ghost" size="sm" onClick={fetchMoreProjects} disabled={loadingMore}>
+                                    {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Load more'}
+                                </Button>
+                            </div>
+                        )}
                     </div>
                 )}
             </main>
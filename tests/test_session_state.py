@@ -0,0 +1,146 @@
+"""
+Shared session state: version handling of the in-process store, and how
+SummarizationMemory keeps a turn when the shared write keeps failing.
+
+    pytest tests/test_session_state.py
+"""
+import asyncio
+from typing import Any, Coroutine, Dict, List, Optional
+
+from backend.services.memory.session_state import InMemorySessionStateStore
+from backend.services.memory.summarization_memory import SummarizationMemory
+
+
+def run(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    return asyncio.run(coroutine)
+
+
+class ConflictingStore(InMemorySessionStateStore):
+    """Refuses every write, as if another worker always got there first."""
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        self.conflicts += 1
+        return None
+
+
+class VanishingStore(InMemorySessionStateStore):
+    """Refuses the first write, and the state is gone by the time it is reloaded."""
+
+    def __init__(self):
+        super().__init__()
+        self.refused = False
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        if not self.refused:
+            self.refused = True
+            await self.delete(key)
+            return None
+        return await super().compare_and_set(key, state, expected_version)
+
+
+class FailingReloadStore(InMemorySessionStateStore):
+    """Refuses every write and cannot be read, as if it went away mid-update."""
+
+    async def get(self, key: str):
+        raise ConnectionError("session state server went away")
+
+    async def compare_and_set(self, key: str, state: Dict[str, Any], expected_version: int) -> Optional[int]:
+        return None
+
+
+def memory(store: InMemorySessionStateStore, session_id: str = "session") -> SummarizationMemory:
+    chat_memory = SummarizationMemory(
+        session_id=session_id,
+        project_id="project",
+        user_id="user",
+        summary_threshold=1000,
+        enable_db_persistence=False,
+    )
+    chat_memory.state_store = store
+    return chat_memory
+
+
+def contents(chat_memory: SummarizationMemory) -> List[str]:
+    return [str(msg["content"]) for msg in chat_memory.buffer]
+
+
+def seqs(chat_memory: SummarizationMemory) -> List[int]:
+    return [int(msg["seq"]) for msg in chat_memory.buffer]
+
+
+def test_versions_are_not_reused_after_delete() -> None:
+    async def check() -> None:
+        store = InMemorySessionStateStore()
+        first = await store.compare_and_set("key", {"n": 1}, 0)
+        await store.delete("key")
+        second = await store.compare_and_set("key", {"n": 2}, 0)
+
+        assert first is not None and second is not None
+        assert second > first
+        # A writer still holding the old version must not overwrite the new state
+        assert await store.compare_and_set("key", {"n": 3}, first) is None
+        assert await store.get("key") == ({"n": 2}, second)
+
+    run(check())
+
+
+def test_turn_kept_locally_when_every_write_conflicts() -> None:
+    async def check() -> None:
+        store = ConflictingStore()
+        chat_memory = memory(store)
+
+        await chat_memory.add_message("first question", "first answer")
+        await chat_memory.add_message("second question", "second answer")
+
+        assert store.conflicts > 2
+        assert contents(chat_memory) == ["first question", "first answer", "second question", "second answer"]
+        assert seqs(chat_memory) == [1, 2, 3, 4]
+        assert "second answer" in chat_memory.get_context()
+
+    run(check())
+
+
+def test_turn_kept_locally_when_reload_fails() -> None:
+    async def check() -> None:
+        chat_memory = memory(FailingReloadStore())
+
+        await chat_memory.add_message("question", "answer")
+
+        assert contents(chat_memory) == ["question", "answer"]
+        assert seqs(chat_memory) == [1, 2]
+
+    run(check())
+
+
+def test_turn_appended_once_when_shared_state_vanishes() -> None:
+    async def check() -> None:
+        store = VanishingStore()
+        chat_memory = memory(store)
+
+        await chat_memory.add_message("question", "answer")
+
+        assert contents(chat_memory) == ["question", "answer"]
+        state, _ = await store.get("session")
+        assert [msg["content"] for msg in state["buffer"]] == ["question", "answer"]
+
+    run(check())
+
+
+def test_concurrent_workers_get_distinct_seqs() -> None:
+    async def check() -> None:
+        store = InMemorySessionStateStore()
+        first, second = memory(store), memory(store)
+        await first.load_memory()
+        await second.load_memory()
+
+        await asyncio.gather(
+            first.add_message("from first", "reply"),
+            second.add_message("from second", "reply"),
+        )
+        await first.sync()
+        await second.sync()
+
+        assert seqs(first) == seqs(second) == [1, 2, 3, 4]
+        assert sorted(contents(first)) == sorted(["from first", "from second", "reply", "reply"])
+
+    run(check())
@@ -0,0 +1,356 @@
+"""
+Conformance checks every storage backend must pass.
+
+Runs against SQLite and the in-process fake of the Supabase table API:
+
+    pytest tests/test_storage_conformance.py
+
+To also run against a live Supabase project, point SUPABASE_URL and
+SUPABASE_KEY at it and set CONFORMANCE_SUPABASE_USER_ID to an existing
+auth user, since Projects.user_id references auth.users. The checks only
+create rows under fresh ids and delete them afterwards.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Coroutine, Iterator, List, Optional, Tuple
+
+import pytest
+
+from backend.core.interfaces.base_storage import (
+    BaseMessageRepository,
+    BaseProjectRepository,
+    BaseSessionRepository,
+    BaseSnapshotRepository,
+    BaseSummaryRepository,
+)
+
+SUPABASE_USER_ID = os.environ.get("CONFORMANCE_SUPABASE_USER_ID")
+
+
+def run(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    return asyncio.run(coroutine)
+
+
+def stamp(offset: int) -> str:
+    """Distinct, ordered timestamps so keyset order does not depend on insert timing."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return (base + timedelta(minutes=offset)).isoformat()
+
+
+class Storage:
+    """One backend's repositories, plus helpers that create rows and remember them for cleanup."""
+
+    def __init__(
+        self,
+        projects: BaseProjectRepository,
+        sessions: BaseSessionRepository,
+        messages: BaseMessageRepository,
+        summaries: BaseSummaryRepository,
+        snapshots: BaseSnapshotRepository,
+        user_id: Optional[str] = None,
+    ):
+        self.projects = projects
+        self.sessions = sessions
+        self.messages = messages
+        self.summaries = summaries
+        self.snapshots = snapshots
+        self.user_id = user_id or str(uuid.uuid4())
+        self.project_ids: List[str] = []
+
+    async def new_project(self, offset: int, **fields) -> str:
+        project_id = str(uuid.uuid4())
+        await self.projects.insert({
+            "id": project_id,
+            "user_id": self.user_id,
+            "project_name": f"conformance-{offset}",
+            "project_description": None,
+            "system_prompt": "",
+            "created_at": stamp(offset),
+            **fields,
+        })
+        self.project_ids.append(project_id)
+        return project_id
+
+    async def new_session(self, project_id: str, offset: int) -> str:
+        session_id = str(uuid.uuid4())
+        await self.sessions.insert({
+            "id": session_id,
+            "project_id": project_id,
+            "created_at": stamp(offset),
+            "title": f"session-{offset}",
+            "model": "test-model",
+        })
+        return session_id
+
+    async def cleanup(self) -> None:
+        for project_id in self.project_ids:
+            for row in await self.sessions.list_page(self.user_id, project_id, limit=1000):
+                await self.messages.delete_for_session(row["id"])
+                await self.summaries.delete_for_session(row["id"])
+                await self.snapshots.delete_for_session(row["id"])
+                await self.sessions.delete(row["id"])
+            await self.projects.delete(project_id, self.user_id)
+
+
+def sqlite_storage(path: str) -> Storage:
+    from backend.repositories.sqlite_repository import (
+        SQLiteDatabase,
+        SQLiteMessageRepository,
+        SQLiteProjectRepository,
+        SQLiteSessionRepository,
+        SQLiteSnapshotRepository,
+        SQLiteSummaryRepository,
+    )
+
+    db = SQLiteDatabase(path)
+    return Storage(
+        SQLiteProjectRepository(db),
+        SQLiteSessionRepository(db),
+        SQLiteMessageRepository(db),
+        SQLiteSummaryRepository(db),
+        SQLiteSnapshotRepository(db),
+    )
+
+
+def supabase_storage(user_id: Optional[str] = None) -> Storage:
+    # Each repository picks up the client returned by get_supabase_client()
+    from backend.repositories.message_repository import MessageRepository
+    from backend.repositories.project_repository import ProjectRepository
+    from backend.repositories.session_repository import SessionRepository
+    from backend.repositories.snapshot_repository import SnapshotRepository
+    from backend.repositories.summary_repository import SummaryRepository
+
+    return Storage(
+        ProjectRepository(),
+        SessionRepository(),
+        MessageRepository(),
+        SummaryRepository(),
+        SnapshotRepository(),
+        user_id=user_id,
+    )
+
+
+@pytest.fixture(params=["sqlite", "fake", "supabase"])
+def storage(request, tmp_path) -> Iterator[Storage]:
+    if request.param == "sqlite":
+        backend = sqlite_storage(str(tmp_path / "conformance.db"))
+    elif request.param == "fake":
+        from backend.benchmarks.fake_supabase import FakeSupabaseClient, install
+        from backend.core import supabase_client
+
+        previous = supabase_client._supabase_client
+        install(FakeSupabaseClient())
+        request.addfinalizer(lambda: setattr(supabase_client, "_supabase_client", previous))
+        backend = supabase_storage()
+    else:
+        if not SUPABASE_USER_ID:
+            pytest.skip("set CONFORMANCE_SUPABASE_USER_ID to run against a live Supabase project")
+        backend = supabase_storage(SUPABASE_USER_ID)
+
+    yield backend
+    run(backend.cleanup())
+
+
+def test_projects(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(0, enable_response_cache=True, memory_strategy="retrieval")
+
+        row = await storage.projects.get(project_id, storage.user_id)
+        assert row is not None, "get returns the inserted project"
+        assert row["enable_response_cache"] is True, "booleans round-trip as bool"
+        assert row["allow_model_fallback"] is False, "unset columns take their defaults"
+        assert row["memory_strategy"] == "retrieval"
+        assert await storage.projects.get(project_id, str(uuid.uuid4())) is None, "get is scoped to the owner"
+        assert await storage.projects.get(str(uuid.uuid4()), storage.user_id) is None
+        assert await storage.projects.get_owner(project_id) == storage.user_id
+        assert await storage.projects.get_owner(str(uuid.uuid4())) is None
+
+        updated = await storage.projects.update(project_id, storage.user_id, {"project_name": "renamed"})
+        assert len(updated) == 1 and updated[0]["project_name"] == "renamed", "update returns the row"
+        assert await storage.projects.update(project_id, str(uuid.uuid4()), {"project_name": "x"}) == [], \
+            "update is scoped to the owner"
+
+    run(check())
+
+
+def test_project_pages(storage: Storage) -> None:
+    async def check() -> None:
+        for offset in range(1, 5):
+            await storage.new_project(offset)
+
+        first, total = await storage.projects.list_page(storage.user_id, limit=2, with_total=True)
+        assert total == len(storage.project_ids), "total counts every project"
+        assert [r["created_at"] for r in first] == sorted((r["created_at"] for r in first), reverse=True), \
+            "pages are newest first"
+
+        seen = [r["id"] for r in first]
+        after: Optional[Tuple[str, str]] = (first[-1]["created_at"], first[-1]["id"])
+        while after:
+            page, count = await storage.projects.list_page(storage.user_id, after=after, limit=2)
+            assert count is None, "no total unless asked"
+            seen.extend(r["id"] for r in page)
+            after = (page[-1]["created_at"], page[-1]["id"]) if len(page) == 2 else None
+        assert sorted(seen) == sorted(storage.project_ids) and len(seen) == len(set(seen)), \
+            "keyset pages cover every project exactly once"
+
+        rows, _ = await storage.projects.list_page(str(uuid.uuid4()))
+        assert rows == [], "other users see no projects"
+
+    run(check())
+
+
+def test_sessions(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(10, memory_strategy="retrieval")
+        other_project = await storage.new_project(11)
+        session_ids = [await storage.new_session(project_id, offset) for offset in range(3)]
+        await storage.new_session(other_project, 3)
+
+        owner = await storage.sessions.get_with_owner(session_ids[0])
+        assert owner is not None, "get_with_owner finds the session"
+        assert owner["user_id"] == storage.user_id, "get_with_owner resolves the owner"
+        assert owner["memory_strategy"] == "retrieval", "get_with_owner carries the memory strategy"
+        assert owner["project_id"] == project_id and owner["model"] == "test-model"
+        assert await storage.sessions.get_with_owner(str(uuid.uuid4())) is None
+
+        await storage.messages.insert_many([
+            {"session_id": session_ids[2], "role": "user", "content": "hello", "seq": 1},
+            {"session_id": session_ids[2], "role": "assistant", "content": "latest reply", "seq": 2},
+        ])
+
+        rows = await storage.sessions.list_page(storage.user_id, project_id, limit=10, with_counts=True, with_preview=True)
+        assert [r["id"] for r in rows] == list(reversed(session_ids)), "sessions are newest first"
+        assert rows[0]["message_count"] == 2 and rows[1]["message_count"] == 0, "message_count is an int"
+        assert rows[0]["last_message"] == "latest reply", "last_message is the highest-seq content"
+        assert rows[1]["last_message"] is None, "last_message is None without messages"
+
+        plain = await storage.sessions.list_page(storage.user_id, project_id, limit=10)
+        assert "message_count" not in plain[0] and "last_message" not in plain[0], "extras only on request"
+
+        everything = await storage.sessions.list_page(storage.user_id, limit=10)
+        assert len(everything) == 4, "without project_id every project's sessions are listed"
+
+        page = await storage.sessions.list_page(
+            storage.user_id, project_id, after=(rows[0]["created_at"], rows[0]["id"]), limit=1
+        )
+        assert [r["id"] for r in page] == [session_ids[1]], "keyset continues after the cursor"
+        assert await storage.sessions.list_page(str(uuid.uuid4()), limit=10) == [], "other users see no sessions"
+
+        updated = await storage.sessions.update(session_ids[0], {"title": "renamed"})
+        assert updated and updated[0]["title"] == "renamed", "update returns the row"
+        assert (await storage.sessions.get(session_ids[0]))["title"] == "renamed", "get sees the update"
+
+        await storage.messages.delete_for_session(session_ids[2])
+        await storage.sessions.delete(session_ids[0])
+        assert await storage.sessions.get(session_ids[0]) is None, "deleted session is gone"
+
+    run(check())
+
+
+def test_messages(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(20)
+        session_id = await storage.new_session(project_id, 20)
+
+        await storage.messages.insert({"session_id": session_id, "role": "user", "content": "m1", "seq": 1})
+        rows = [
+            {"session_id": session_id, "role": "assistant" if seq % 2 == 0 else "user", "content": f"m{seq}", "seq": seq}
+            for seq in range(2, 11)
+        ]
+        rows.insert(3, {"session_id": session_id, "role": "system", "content": "hidden", "seq": 100})
+        await storage.messages.insert_many(rows)
+        await storage.messages.insert_many([])
+
+        recent = await storage.messages.after_seq(session_id, 7, limit=10)
+        assert [r["seq"] for r in recent] == [10, 9, 8], "after_seq is newest first, above seq, user/assistant only"
+        assert set(recent[0]) >= {"role", "content", "seq"}
+
+        newest = await storage.messages.page(session_id, limit=3)
+        assert [r["seq"] for r in newest] == [10, 9, 8], "page defaults to newest first"
+        older = await storage.messages.page(session_id, cursor=8, limit=3)
+        assert [r["seq"] for r in older] == [7, 6, 5], "descending cursor excludes itself"
+        oldest = await storage.messages.page(session_id, cursor=2, limit=3, descending=False)
+        assert [r["seq"] for r in oldest] == [3, 4, 5], "ascending cursor excludes itself"
+        assert newest[0].get("timestamp"), "page includes timestamp"
+
+        exported = [row["seq"] async for row in storage.messages.iter_all(session_id, batch_size=4)]
+        assert exported == list(range(1, 11)), "iter_all returns every message oldest first"
+
+        await storage.messages.delete_for_session(session_id)
+        assert await storage.messages.after_seq(session_id, 0) == [], "delete_for_session removes messages"
+
+    run(check())
+
+
+def test_summaries(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(30)
+        session_id = await storage.new_session(project_id, 30)
+
+        assert await storage.summaries.latest(session_id) is None
+        for from_seq, to_seq in ((1, 4), (5, 8)):
+            await storage.summaries.insert({
+                "session_id": session_id,
+                "content": f"summary {to_seq}",
+                "from_seq": from_seq,
+                "to_seq": to_seq,
+                "created_at": stamp(to_seq),
+            })
+        latest = await storage.summaries.latest(session_id)
+        assert latest == {"content": "summary 8", "from_seq": 5, "to_seq": 8}, "latest has the highest to_seq"
+
+        await storage.summaries.delete_for_session(session_id)
+        assert await storage.summaries.latest(session_id) is None, "delete_for_session removes summaries"
+
+    run(check())
+
+
+def test_snapshots(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(40)
+        session_id = await storage.new_session(project_id, 40)
+        other_session = await storage.new_session(project_id, 41)
+
+        assert await storage.snapshots.get(session_id) is None
+        recent = [
+            {"role": "user", "content": 'quoted "text"', "seq": 5},
+            {"role": "assistant", "content": "hello", "seq": 6},
+        ]
+        await storage.snapshots.upsert_many([
+            {"session_id": session_id, "summary": "", "summary_seq": 0, "next_seq": 3, "recent": []},
+            {"session_id": other_session, "summary": "other", "summary_seq": 2, "next_seq": 3, "recent": []},
+        ])
+        await storage.snapshots.upsert_many([
+            {"session_id": session_id, "summary": "summary 4", "summary_seq": 4, "next_seq": 7, "recent": recent},
+        ])
+        await storage.snapshots.upsert_many([])
+
+        snapshot = await storage.snapshots.get(session_id)
+        assert snapshot is not None and snapshot["session_id"] == session_id
+        assert (snapshot["summary"], snapshot["summary_seq"], snapshot["next_seq"]) == ("summary 4", 4, 7), \
+            "upsert replaces the session's snapshot"
+        assert snapshot["recent"] == recent, "recent round-trips as a list of dicts"
+        other = await storage.snapshots.get(other_session)
+        assert other is not None and other["summary"] == "other", "other sessions are untouched"
+
+        await storage.snapshots.delete_for_session(session_id)
+        assert await storage.snapshots.get(session_id) is None, "delete_for_session removes the snapshot"
+
+    run(check())
+
+
+def test_cleanup(storage: Storage) -> None:
+    async def check() -> None:
+        project_id = await storage.new_project(50)
+        session_id = await storage.new_session(project_id, 50)
+        await storage.messages.insert({"session_id": session_id, "role": "user", "content": "m1", "seq": 1})
+
+        await storage.cleanup()
+        rows, _ = await storage.projects.list_page(storage.user_id)
+        assert not {r["id"] for r in rows} & set(storage.project_ids), "projects are deleted"
+        assert await storage.sessions.get(session_id) is None, "sessions are deleted"
+        storage.project_ids.clear()
+
+    run(check())